@@ -0,0 +1,103 @@
+"""
+턴 실행기 비교 벤치마크
+LangGraph 워크플로우와 직접 실행기의 결과 일치 여부와 턴당 프레임워크 오버헤드 측정 (오프라인)
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# 프로젝트 루트 경로 추가
+sys.path.append(str(Path(__file__).parent))
+
+from build_index import ensure_indexes
+from modules import Config, RecyclingAgent
+from modules.metrics import percentile
+
+# 오프라인 백엔드, 지연 없음 (LLM/임베딩 인스턴스가 만들어지기 전에 호출)
+Config.use_fake_backends(FAKE_LLM_LATENCY_MS=0, FAKE_EMBEDDING_LATENCY_MS=0)
+
+
+CONVERSATION = [
+    "안녕하세요!",
+    "관악구에서 페트병 어떻게 버려요?",
+    "스티로폼은요?",
+    "건전지 어떻게 버려요?",
+    "성동구",
+    "고마워요",
+    "오늘 날씨 좋네요",
+    "성동구에서 폐형광등은 어떻게 버리나요?",
+]
+
+
+def check_parity() -> bool:
+    """두 실행기로 같은 대화를 진행해 매 턴 응답과 상태가 같은지 확인"""
+    graph_agent = RecyclingAgent(executor="graph")
+    direct_agent = RecyclingAgent(executor="direct")
+    ok = True
+    
+    for user_input in CONVERSATION:
+        graph_answer = graph_agent.get_response(user_input)
+        direct_answer = direct_agent.get_response(user_input)
+        same = (
+            graph_answer == direct_answer
+            and graph_agent.state == direct_agent.state
+            and graph_agent.last_context_stats == direct_agent.last_context_stats
+        )
+        ok = ok and same
+        print(f"  {'일치' if same else '불일치'}: {user_input}")
+    return ok
+
+
+def measure(executor: str, rounds: int) -> list:
+    """턴별 소요 시간 측정"""
+    timings = []
+    for _ in range(rounds):
+        agent = RecyclingAgent(executor=executor)
+        for user_input in CONVERSATION:
+            start = time.perf_counter()
+            agent.get_response(user_input)
+            timings.append(time.perf_counter() - start)
+    return timings
+
+
+def parse_args():
+    """명령행 인자 파싱"""
+    parser = argparse.ArgumentParser(description="턴 실행기 비교 벤치마크")
+    parser.add_argument("--rounds", type=int, default=20, help="대화 반복 횟수")
+    return parser.parse_args()
+
+
+def main():
+    """메인 실행 함수"""
+    args = parse_args()
+    
+    if not ensure_indexes():
+        return
+    
+    print("결과 일치 확인")
+    if not check_parity():
+        print("실행기 결과가 다릅니다.")
+        sys.exit(1)
+    
+    # 예열
+    measure("graph", 1)
+    measure("direct", 1)
+    
+    results = {executor: measure(executor, args.rounds) for executor in ("graph", "direct")}
+    
+    print(f"\n{'실행기':<8} {'평균(ms)':>9} {'p50(ms)':>9} {'p95(ms)':>9}")
+    for executor, timings in results.items():
+        mean = sum(timings) / len(timings)
+        print(
+            f"{executor:<8} {mean*1000:>9.2f} {percentile(timings, 50)*1000:>9.2f} "
+            f"{percentile(timings, 95)*1000:>9.2f}"
+        )
+    
+    overhead = (sum(results["graph"]) - sum(results["direct"])) / len(results["graph"])
+    print(f"\n턴당 프레임워크 오버헤드: {overhead*1000:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+여러 품목 질문 분할 검색 벤치마크
+품목 2~3개를 묻는 질문으로 단일 검색(질문 전체로 k=3)과 품목별 동시 검색을 비교해
+컨텍스트에 담긴 품목 비율(커버리지), 검색/답변 지연, LLM 호출 수 측정 (오프라인)
+"""
+
+import argparse
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+# 프로젝트 루트 경로 추가
+sys.path.append(str(Path(__file__).parent))
+
+from build_index import ensure_indexes
+from modules import Config, VectorStoreManager
+from modules.context_builder import build_context
+from modules.metrics import percentile
+from modules.multi_item import get_item_vocabulary, search_items
+from modules.prompt_stats import get_prompt_ledger, turn_label
+from modules.tools import get_retriever, process_recycling_query
+
+# 오프라인 백엔드와 현실적인 지연 분포 (LLM/임베딩 인스턴스가 만들어지기 전에 호출)
+Config.use_fake_backends(FAKE_LLM_LATENCY_MS=600, FAKE_EMBEDDING_LATENCY_MS=80)
+
+
+QUESTION_TEMPLATES = [
+    "{region}에서 {items} 어떻게 버려요?",
+    "{region} {items} 분리수거 방법 알려주세요",
+]
+JOINERS = [", ", "랑 ", " 그리고 "]
+
+
+def parse_args():
+    """명령행 인자 파싱"""
+    parser = argparse.ArgumentParser(description="여러 품목 질문 분할 검색 벤치마크")
+    parser.add_argument("--queries", type=int, default=40, help="지역별 질문 수")
+    parser.add_argument("--concurrency", type=int, default=8, help="동시 질문 수")
+    parser.add_argument("--seed", type=int, default=7, help="난수 시드")
+    return parser.parse_args()
+
+
+def build_queries(per_region: int, seed: int) -> List[Tuple[str, str, List[str]]]:
+    """지역별 품목명 2~3개를 묶은 질문 -> (지역, 질문, 물어본 품목 목록)"""
+    rng = random.Random(seed)
+    queries = []
+    for region in Config.get_supported_regions():
+        manifest = VectorStoreManager.load_manifest(region)
+        # 사람이 그대로 말할 법한 짧은 품목명만 사용
+        items = sorted(
+            item for item in manifest["items"]
+            if 2 <= len(item) <= 8 and not any(ch in item for ch in ",·()/ ")
+        )
+        for _ in range(per_region):
+            asked = rng.sample(items, rng.choice([2, 3]))
+            joined = asked[0]
+            for item in asked[1:]:
+                joined += rng.choice(JOINERS) + item
+            question = rng.choice(QUESTION_TEMPLATES).format(region=region, items=joined)
+            queries.append((region, question, asked))
+    return queries
+
+
+def coverage(context: str, docs: List[Any], asked: List[str]) -> float:
+    """컨텍스트에 실제로 담긴 문서 중 물어본 품목이 차지하는 비율"""
+    used = {doc.metadata.get("품목") for doc in docs if doc.page_content in context}
+    return sum(item in used for item in asked) / len(asked)
+
+
+def run_retrieval(queries: List[Tuple[str, str, List[str]]], fan_out: bool, concurrency: int) -> Dict[str, Any]:
+    """검색 + 컨텍스트 구성까지 (LLM 제외)"""
+    retriever = get_retriever()
+    vocabulary = get_item_vocabulary()
+
+    def run(query: Tuple[str, str, List[str]]):
+        region, question, asked = query
+        start = time.perf_counter()
+        mentions = vocabulary.find_mentions(region, question)[:Config.MULTI_ITEM_MAX_ITEMS] if fan_out else []
+        if len(mentions) > 1:
+            docs = search_items(retriever, region, mentions)
+        else:
+            docs = retriever.search(region, question, k=3)
+        context, stats = build_context(docs)
+        return time.perf_counter() - start, coverage(context, docs, asked), stats["context_tokens"], len(mentions)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        rows = list(executor.map(run, queries))
+    latencies = [r[0] for r in rows]
+    return {
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "coverage": sum(r[1] for r in rows) / len(rows),
+        "full_coverage": sum(r[1] == 1.0 for r in rows) / len(rows),
+        "context_tokens": sum(r[2] for r in rows) / len(rows),
+        "detected": sum(r[3] > 1 for r in rows) / len(rows)
+    }
+
+
+def run_answers(queries: List[Tuple[str, str, List[str]]], fan_out: bool, concurrency: int) -> Dict[str, Any]:
+    """process_recycling_query 전체 (검색 + 답변 생성 LLM 호출)"""
+    Config.MULTI_ITEM_ENABLED = fan_out
+    label = "fan_out" if fan_out else "single"
+
+    def run(query: Tuple[str, str, List[str]]):
+        turn_label.set(label)
+        start = time.perf_counter()
+        result = process_recycling_query.func(query[1], query[0], [], answer_mode="llm")
+        return time.perf_counter() - start, result.get("answer_mode")
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        rows = list(executor.map(run, queries))
+    latencies = [r[0] for r in rows]
+    calls = get_prompt_ledger().summary()["by_label"].get(label, {}).get("recycling", {}).get("calls", 0)
+    return {
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "llm_calls": calls / len(rows),
+        "errors": sum(r[1] != "llm" for r in rows)
+    }
+
+
+def main():
+    """메인 실행 함수"""
+    args = parse_args()
+
+    if not ensure_indexes():
+        return
+
+    # 사전 생성 답변은 두 경로 모두 건너뜀
+    Config.PRECOMPUTED_ANSWERS_ENABLED = False
+    queries = build_queries(args.queries, args.seed)
+    print(f"여러 품목 질문 {len(queries)}개, 동시 {args.concurrency} (LLM={Config.LLM_BACKEND}, 임베딩={Config.EMBEDDING_BACKEND})")
+    print(f"예: {queries[0][1]}")
+
+    print(f"\n{'경로':<10} {'품목 감지':>9} {'커버리지':>9} {'전부 포함':>9} {'컨텍스트':>9} {'p50(ms)':>9} {'p95(ms)':>9}")
+    for name, fan_out in [("단일 검색", False), ("품목별", True)]:
+        row = run_retrieval(queries, fan_out, args.concurrency)
+        print(
+            f"{name:<10} {row['detected']:>9.0%} {row['coverage']:>9.1%} {row['full_coverage']:>9.1%} "
+            f"{row['context_tokens']:>9.0f} {row['p50']*1000:>9.1f} {row['p95']*1000:>9.1f}"
+        )
+
+    print(f"\n답변 생성 포함 (process_recycling_query)")
+    for name, fan_out in [("단일 검색", False), ("품목별", True)]:
+        row = run_answers(queries, fan_out, args.concurrency)
+        print(
+            f"{name:<10} 질문당 LLM 호출 {row['llm_calls']:.2f}회, 실패 {row['errors']}건, "
+            f"p50 {row['p50']*1000:.0f}ms / p95 {row['p95']*1000:.0f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+프리포크 워커 처리량 벤치마크
+가짜 LLM/임베딩으로 워커 수에 따른 처리량 변화 측정 (오프라인)
+
+- 기준: 단일 프로세스 + 스레드 (워커 1개에 세션 수만큼 스레드) -> LLM 대기 겹치기만으로 얻는 처리량
+- 가짜 LLM의 응답당 CPU 작업(FAKE_LLM_CPU_MS)이 0이면 대기만 있으므로 워커를 늘려도 기준과 비슷해야 하고,
+  CPU 작업이 있을 때 워커 수만큼 코어를 더 쓰는 효과가 나타남
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# 프로젝트 루트 경로 추가
+sys.path.append(str(Path(__file__).parent))
+
+from build_index import ensure_indexes
+from modules import Config
+from modules.prefork import PreforkServer, preload
+
+# 오프라인 백엔드 (LLM/임베딩 인스턴스가 만들어지기 전에 호출)
+Config.use_fake_backends()
+
+
+SESSION_TURNS = [
+    "안녕하세요!",
+    "관악구에서 페트병 어떻게 버려요?",
+    "스티로폼은요?",
+    "성동구에서 폐형광등은 어떻게 버리나요?",
+]
+
+
+def parse_args():
+    """명령행 인자 파싱"""
+    parser = argparse.ArgumentParser(description="프리포크 워커 처리량 벤치마크")
+    parser.add_argument("--workers", default=None, help="측정할 워커 수 목록 (예: 1,2,4)")
+    parser.add_argument("--sessions", type=int, default=32, help="동시 세션 수")
+    parser.add_argument("--rounds", type=int, default=2, help="세션당 대화 반복 횟수")
+    parser.add_argument("--cpu-ms", default="0,20", help="측정할 가짜 LLM 응답당 CPU 작업 시간 목록 (ms)")
+    return parser.parse_args()
+
+
+def run_load(server: PreforkServer, sessions: int, rounds: int) -> float:
+    """모든 세션의 대화를 동시에 실행하고 경과 시간 반환"""
+    def run_session(session_index: int):
+        session_id = f"session-{session_index}"
+        for _ in range(rounds):
+            for user_input in SESSION_TURNS:
+                server.get_response(session_id, user_input, timeout=60)
+    
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sessions) as executor:
+        list(executor.map(run_session, range(sessions)))
+    return time.perf_counter() - start
+
+
+def set_llm_cpu_ms(cpu_ms: float):
+    """가짜 LLM 응답당 CPU 작업 시간 변경 (이미 만든 인스턴스 포함, fork 전에 호출)"""
+    Config.FAKE_LLM_CPU_MS = cpu_ms
+    for llm in Config._llm_instances.values():
+        llm.cpu_ms = cpu_ms
+
+
+def measure(workers: int, threads: int, sessions: int, rounds: int) -> float:
+    """워커 workers개 x 워커당 스레드 threads개로 부하를 실행하고 경과 시간 반환"""
+    Config.SERVE_WORKER_THREADS = threads
+    with PreforkServer(workers) as server:
+        # 워커 예열 (세션 라우팅 확인 겸)
+        for i in range(workers * 2):
+            server.get_response(f"warmup-{i}", "안녕", timeout=60)
+        return run_load(server, sessions, rounds)
+
+
+def main():
+    """메인 실행 함수"""
+    args = parse_args()
+    cpu_count = os.cpu_count() or 1
+    if args.workers:
+        worker_counts = [int(w) for w in args.workers.split(",")]
+    else:
+        worker_counts = sorted({1, 2, max(1, cpu_count // 2), cpu_count})
+    threads = Config.SERVE_WORKER_THREADS
+    
+    if not ensure_indexes():
+        return
+    
+    print("인덱스/그래프 사전 로드 중...")
+    preload()
+    
+    total = args.sessions * args.rounds * len(SESSION_TURNS)
+    print(f"\nCPU {cpu_count}개, 세션 {args.sessions}개, 요청 {total}개, LLM 지연 {Config.FAKE_LLM_LATENCY_MS:.0f}ms")
+    
+    for cpu_ms in [float(c) for c in args.cpu_ms.split(",")]:
+        set_llm_cpu_ms(cpu_ms)
+        print(f"\n[LLM 응답당 CPU {cpu_ms:.0f}ms]")
+        print(f"{'구성':<22} {'경과(초)':>9} {'처리량(req/s)':>14} {'배율':>6}")
+        
+        # 기준: 프로세스 1개가 세션 수만큼 스레드로 동시에 처리
+        elapsed = measure(1, args.sessions, args.sessions, args.rounds)
+        baseline = total / elapsed
+        print(f"{'단일 프로세스 x ' + str(args.sessions) + '스레드':<22} {elapsed:>9.2f} {baseline:>14.1f} {1.0:>5.2f}x")
+        
+        for workers in worker_counts:
+            elapsed = measure(workers, threads, args.sessions, args.rounds)
+            throughput = total / elapsed
+            label = f"워커 {workers} x {threads}스레드"
+            print(f"{label:<22} {elapsed:>9.2f} {throughput:>14.1f} {throughput / baseline:>5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+지역 샤딩 벤치마크
+로컬에서 샤드 노드 프로세스(지역별 주/복제본)를 띄워 라우터 검색 결과가 단일 프로세스 검색과
+같은지, 주 노드를 종료해도 복제본으로 전환되는지, 노드별 메모리가 얼마나 줄어드는지 측정 (오프라인)
+"""
+
+import argparse
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+# 프로젝트 루트 경로 추가
+sys.path.append(str(Path(__file__).parent))
+
+from build_index import ensure_indexes
+from modules import Config, DocumentLoader, VectorStoreManager
+from modules.metrics import percentile
+from modules.retrieval import LocalRetriever
+from modules.sharding import ShardRouter
+
+# 오프라인 백엔드 (LLM/임베딩 인스턴스가 만들어지기 전에 호출, 노드 프로세스는 환경 변수로 상속)
+Config.use_fake_backends(FAKE_EMBEDDING_LATENCY_MS=20)
+
+
+NODE_SCRIPT = Path(__file__).parent / "shard_node.py"
+QUERY_TEMPLATES = ["{item} 어떻게 버려요?", "{item} 분리수거 방법 알려주세요"]
+
+
+def parse_args():
+    """명령행 인자 파싱"""
+    parser = argparse.ArgumentParser(description="지역 샤딩 벤치마크")
+    parser.add_argument("--base-port", type=int, default=7101, help="노드 포트 시작 번호")
+    parser.add_argument("--replicas", type=int, default=2, help="지역별 노드 수 (주 노드 포함)")
+    parser.add_argument("--queries", type=int, default=40, help="지역별 질의 수")
+    parser.add_argument("--concurrency", type=int, default=32, help="동시 검색 수")
+    return parser.parse_args()
+
+
+def start_node(regions: List[str], port: int) -> subprocess.Popen:
+    """샤드 노드 프로세스 시작"""
+    return subprocess.Popen(
+        [sys.executable, str(NODE_SCRIPT), "--regions", ",".join(regions), "--listen", f"127.0.0.1:{port}"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+
+
+def read_rss_mb(pid: int) -> float:
+    """프로세스 RSS (MB, /proc 미지원 OS에서는 0)"""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0.0
+
+
+def wait_ready(router: ShardRouter, expected: Dict[str, int], timeout: float = 60.0) -> bool:
+    """모든 지역이 기대한 수의 노드에서 응답할 때까지 대기"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        owners = router.discover()
+        if all(len(owners.get(region, [])) >= count for region, count in expected.items()):
+            return True
+        time.sleep(0.5)
+    return False
+
+
+def build_queries(per_region: int) -> List[Tuple[str, str]]:
+    """지역별 실제 품목명으로 질의 생성"""
+    queries = []
+    for region in Config.get_supported_regions():
+        items = sorted({doc.metadata["품목"] for doc in DocumentLoader.iter_documents(Config.DATA_DIR / region)})
+        for i in range(per_region):
+            item = items[i * len(items) // per_region]
+            queries.append((region, QUERY_TEMPLATES[i % len(QUERY_TEMPLATES)].format(item=item)))
+    return queries
+
+
+def run_queries(retriever, queries: List[Tuple[str, str]], concurrency: int) -> Tuple[List[List[str]], List[float], int]:
+    """동시 검색 실행 -> (질의별 문서 내용, 지연 목록, 실패 수)"""
+    def search(query: Tuple[str, str]):
+        start = time.perf_counter()
+        try:
+            docs = retriever.search(query[0], query[1], k=3)
+            return [doc.page_content for doc in docs], time.perf_counter() - start, False
+        except Exception:
+            return [], time.perf_counter() - start, True
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        rows = list(executor.map(search, queries))
+    return [r[0] for r in rows], [r[1] for r in rows], sum(r[2] for r in rows)
+
+
+def print_run(title: str, results: List[List[str]], latencies: List[float], errors: int, expected: List[List[str]]):
+    matched = sum(a == b for a, b in zip(results, expected))
+    print(
+        f"{title:<18} 일치 {matched}/{len(expected)}, 실패 {errors}, "
+        f"p50 {percentile(latencies, 50)*1000:.1f}ms / p95 {percentile(latencies, 95)*1000:.1f}ms"
+    )
+
+
+def main():
+    """메인 실행 함수"""
+    args = parse_args()
+
+    if not ensure_indexes():
+        return
+
+    regions = Config.get_supported_regions()
+    nodes: List[Tuple[List[str], int, subprocess.Popen]] = []
+    port = args.base_port
+    # 지역마다 주 노드 + 복제본 (같은 지역의 노드끼리는 설정 순서가 우선순위)
+    for region in regions:
+        for _ in range(args.replicas):
+            nodes.append(([region], port, start_node([region], port)))
+            port += 1
+    # 비교용: 모든 지역을 가진 노드 하나
+    full_node = start_node(regions, port)
+
+    router = ShardRouter([f"127.0.0.1:{p}" for _, p, _ in nodes])
+    try:
+        print(f"샤드 노드 {len(nodes)}개 시작 (지역 {len(regions)}개 x {args.replicas}) + 전체 지역 노드 1개")
+        if not wait_ready(router, {region: args.replicas for region in regions}):
+            print("노드가 준비되지 않았습니다.")
+            return
+        if not wait_ready(ShardRouter([f"127.0.0.1:{port}"]), {region: 1 for region in regions}):
+            print("전체 지역 노드가 준비되지 않았습니다.")
+            return
+
+        queries = build_queries(args.queries)
+        expected, local_latencies, local_errors = run_queries(
+            LocalRetriever(VectorStoreManager()), queries, args.concurrency
+        )
+        print(f"\n질의 {len(queries)}개, 동시 {args.concurrency}")
+        print_run("단일 프로세스", expected, local_latencies, local_errors, expected)
+
+        results, latencies, errors = run_queries(router, queries, args.concurrency)
+        print_run("샤드 라우터", results, latencies, errors, expected)
+
+        # 첫 지역의 주 노드를 종료해 복제본 전환 확인
+        victim_regions, victim_port, victim = nodes[0]
+        victim.terminate()
+        victim.wait()
+        results, latencies, errors = run_queries(router, queries, args.concurrency)
+        print_run(f"주 노드 종료 후", results, latencies, errors, expected)
+        print(f"  종료한 노드: 127.0.0.1:{victim_port} ({', '.join(victim_regions)})")
+
+        metrics = router.metrics()
+        print(f"\n라우터: 검색 {metrics['searches']}건 -> 노드 요청 {metrics['batches']}건, 복제본 전환 {metrics['failovers']}건")
+        for group, batcher in metrics["groups"].items():
+            print(f"  [{group}] 배치 크기 {batcher['batch_size']}")
+
+        print("\n노드 메모리 (RSS)")
+        for node_regions, node_port, process in nodes[1:]:
+            print(f"  127.0.0.1:{node_port} {','.join(node_regions):<10} {read_rss_mb(process.pid):7.1f}MB")
+        print(f"  127.0.0.1:{port} {'전체 지역':<10} {read_rss_mb(full_node.pid):7.1f}MB")
+    finally:
+        router.close()
+        for _, _, process in nodes:
+            process.terminate()
+        full_node.terminate()
+        for _, _, process in nodes:
+            process.wait()
+        full_node.wait()
+
+
+if __name__ == "__main__":
+    main()
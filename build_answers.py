@@ -0,0 +1,130 @@
+"""
+사전 생성 답변 빌드 스크립트
+인덱스에 들어 있는 모든 (지역, 품목)에 대해 ANSWER_PROMPT로 답변을 미리 생성
+변경된 품목만 다시 생성
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# 프로젝트 루트 경로 추가
+sys.path.append(str(Path(__file__).parent))
+
+from modules import Config, VectorStoreManager
+from modules.answer_store import AnswerStore
+from modules.context_builder import build_context
+from modules.exceptions import APIError, VectorStoreError
+from modules.llm_client import get_resilient_llm
+from modules.prompts import ANSWER_PROMPT, PRECOMPUTE_QUESTION_TEMPLATES
+from modules.vector_store import build_manifest, get_store_documents
+
+
+def build_answers_for_region(region_name: str, vector_manager: VectorStoreManager, store: AnswerStore) -> bool:
+    """특정 지역의 답변 저장소 빌드"""
+    print(f"\n{'='*50}")
+    print(f"{region_name} 답변 생성 시작")
+    print(f"{'='*50}")
+    
+    vector_store = vector_manager.load_vector_store(region_name)
+    if not vector_store:
+        print(f"{region_name}: 인덱스가 없습니다. build_index.py를 먼저 실행하세요.")
+        return False
+    
+    documents = get_store_documents(vector_store)
+    manifest = VectorStoreManager.load_manifest(region_name) or build_manifest(documents)
+    index_version = manifest["version"]
+    
+    # 품목별 문서 묶기
+    item_docs = {}
+    for doc in documents:
+        item_docs.setdefault(doc.metadata.get("품목", ""), []).append(doc)
+    item_docs.pop("", None)
+    
+    # 이전 저장소에서 해시가 같은 답변은 재사용
+    previous = store.load(region_name, index_version) or store.load_latest(region_name)
+    previous_entries = previous["entries"] if previous else {}
+    
+    entries = {}
+    stale = []
+    for item in item_docs:
+        old = previous_entries.get(item)
+        if old and old.get("item_hash") == manifest["items"].get(item):
+            entries[item] = old
+        else:
+            stale.append(item)
+    
+    print(f"품목 {len(item_docs)}개 중 재사용 {len(entries)}개, 생성 대상 {len(stale)}개 (인덱스 버전 {index_version})")
+    
+    # 오프라인 일괄 생성은 실시간 답변보다 뒤로 (스케줄러 batch 우선순위)
+    llm = get_resilient_llm("batch")
+    failed = 0
+    for i, item in enumerate(stale, 1):
+        question = f"{region_name}에서 " + PRECOMPUTE_QUESTION_TEMPLATES[0].format(item=item)
+        context, _ = build_context(item_docs[item])
+        try:
+            response = llm.invoke(
+                ANSWER_PROMPT.format_prompt(
+                    region=region_name,
+                    question=question,
+                    context=context
+                ).to_messages()
+            )
+        except APIError as e:
+            print(f"  [{i}/{len(stale)}] {item} 생성 실패: {e}")
+            failed += 1
+            continue
+        
+        entries[item] = {
+            "item_hash": manifest["items"].get(item),
+            "answer": response.content
+        }
+        print(f"  [{i}/{len(stale)}] {item} 생성 완료")
+        
+        # API 속도 제한 대응
+        if i < len(stale):
+            time.sleep(Config.ANSWER_BUILD_SLEEP_TIME)
+    
+    path = store.save(region_name, index_version, entries)
+    print(f"{region_name} 답변 저장 완료: {path} ({len(entries)}개, 실패 {failed}개)")
+    return failed == 0
+
+
+def run() -> bool:
+    """답변 빌드 실행 (성공 여부 반환)"""
+    print("사전 생성 답변 빌드 시작\n")
+    
+    # 설정 검증
+    if not Config.validate():
+        return False
+    
+    try:
+        vector_manager = VectorStoreManager()
+    except VectorStoreError as e:
+        print(f"초기화 실패: {e}")
+        return False
+    
+    store = AnswerStore()
+    regions = [r for r in sys.argv[1:] if not r.startswith("--")] or Config.get_supported_regions()
+    
+    success_count = 0
+    for region_name in regions:
+        if build_answers_for_region(region_name, vector_manager, store):
+            success_count += 1
+    
+    # 결과 요약
+    print(f"\n{'='*50}")
+    print("답변 빌드 완료")
+    print(f"성공: {success_count}/{len(regions)} 지역")
+    print(f"{'='*50}")
+    return success_count == len(regions)
+
+
+def main():
+    """메인 실행 함수 (실패한 지역이 있으면 종료 코드 1)"""
+    if not run():
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
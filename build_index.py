@@ -3,18 +3,48 @@
 재활용 정보 JSON 파일들을 벡터 데이터베이스로 변환
 """
 
+import argparse
 import sys
+from contextlib import nullcontext
 from pathlib import Path
 
 # 프로젝트 루트 경로 추가
 sys.path.append(str(Path(__file__).parent))
 
-from modules import Config, DocumentLoader, VectorStoreManager
+from modules import Config, DocumentLoader, LoadReport, VectorStoreManager
 from modules.exceptions import VectorStoreError
+from modules.vector_store import build_manifest
+from modules.profiler import Profiler
 
 
-def build_index_for_region(region_name: str, vector_manager: VectorStoreManager):
-    """특정 지역의 인덱스 빌드"""
+def report_changed_items(region_name: str, previous: dict):
+    """이전 인덱스 대비 변경된 품목 수 출력"""
+    current = VectorStoreManager.load_manifest(region_name)
+    if not current or not previous:
+        return
+    
+    old_items = previous.get("items", {})
+    new_items = current.get("items", {})
+    changed = [item for item, h in new_items.items() if old_items.get(item) != h]
+    removed = [item for item in old_items if item not in new_items]
+    
+    print(f"변경된 품목 {len(changed)}개, 삭제된 품목 {len(removed)}개")
+    if changed:
+        print("사전 생성 답변 갱신: python build_answers.py " + region_name)
+
+
+def build_index_for_region(
+    region_name: str,
+    vector_manager: VectorStoreManager,
+    resume: bool = False,
+    continue_on_error: bool = False
+):
+    """특정 지역의 인덱스 빌드
+
+    resume=True면 중단된 빌드의 임베딩 저널을 이어서 사용하고,
+    게시된 인덱스가 이미 현재 문서와 같은 버전이면(중단 전에 끝난 지역) 다시 임베딩하지 않고 건너뜁니다.
+    파싱에 실패한 JSON 파일이 있으면 인덱스를 게시하지 않습니다 (continue_on_error=True면 실패 파일을 빼고 게시).
+    """
     print(f"\n{'='*50}")
     print(f"{region_name} 처리 시작")
     print(f"{'='*50}")
@@ -26,21 +56,42 @@ def build_index_for_region(region_name: str, vector_manager: VectorStoreManager)
         return False
     
     try:
-        # 문서 로드
+        # 문서 스트림 (파싱과 임베딩이 배치 단위로 겹쳐서 진행)
         print("문서 로드 중...")
-        documents = DocumentLoader.load_all_documents(region_path)
+        report = LoadReport()
+        documents = DocumentLoader.iter_documents(region_path, report=report)
         
-        if not documents:
-            print(f"{region_name}: 문서가 없습니다.")
-            return False
-        
-        print(f"총 {len(documents)}개 문서 로드 완료")
+        if resume:
+            # 문서 로드는 스냅샷 덕분에 싸므로 먼저 모두 읽어 게시된 버전과 비교
+            documents = list(documents)
+            published = VectorStoreManager.load_manifest(region_name)
+            if (
+                published and not report.error_count
+                and published["version"] == build_manifest(documents)["version"]
+            ):
+                vector_manager.get_journal(region_name).clear()
+                print(f"{region_name}: 게시된 인덱스(버전 {published['version']})가 현재 문서와 같아 건너뜁니다.")
+                return True
         
         # 벡터 스토어 생성
-        vector_store = vector_manager.create_vector_store(documents)
+        vector_store = vector_manager.create_vector_store(documents, region_name=region_name, resume=resume)
+        
+        print(f"문서 {report.document_count}개 로드, 실패 파일 {report.error_count}개, 스키마 경고 {report.warning_count}개")
+        for warning in report.warnings:
+            print(f"  스키마 경고: {warning}")
+        if report.error_count:
+            for error in report.errors:
+                print(f"  실패: {error}")
+            if not continue_on_error:
+                # 임베딩 저널은 남겨 두므로 파일을 고친 뒤 --resume으로 이어서 빌드 가능
+                print(f"{region_name}: 로드 실패 파일이 있어 인덱스를 게시하지 않습니다. (--continue-on-error로 무시)")
+                return False
         
-        # 저장
+        # 저장 (이전 매니페스트와 비교해 바뀐 품목 보고)
+        previous = VectorStoreManager.load_manifest(region_name)
         vector_manager.save_vector_store(vector_store, region_name)
+        vector_manager.get_journal(region_name).clear()
+        report_changed_items(region_name, previous)
         
         print(f"{region_name} 인덱스 생성 완료!")
         return True
@@ -53,25 +104,97 @@ def build_index_for_region(region_name: str, vector_manager: VectorStoreManager)
         return False
 
 
-def main():
-    """메인 실행 함수"""
-    print("벡터 인덱스 빌드 시작\n")
+def ensure_indexes() -> bool:
+    """인덱스가 없는 지역만 빌드 (오프라인 벤치마크/부하 테스트용)
+
+    게시된 인덱스가 없는 지역은 첫 빌드가 중단된 상태일 수 있으므로 임베딩 저널을 이어서 사용합니다.
+    """
+    missing = [
+        region_name for region_name in Config.get_supported_regions()
+        if not VectorStoreManager.get_current_index_path(region_name)
+    ]
+    if not missing:
+        return True
+    
+    try:
+        vector_manager = VectorStoreManager()
+    except VectorStoreError as e:
+        print(f"초기화 실패: {e}")
+        return False
+    return all(build_index_for_region(region_name, vector_manager, resume=True) for region_name in missing)
+
+
+def parse_args():
+    """명령행 인자 파싱"""
+    parser = argparse.ArgumentParser(description="재활용 정보 벡터 인덱스 빌드")
+    parser.add_argument("--rollback", action="store_true", help="각 지역의 인덱스를 직전 버전으로 되돌림")
+    parser.add_argument("--list", action="store_true", help="지역별 인덱스 버전 목록 출력")
+    parser.add_argument("--resume", action="store_true", help="중단된 빌드의 임베딩 저널을 이어서 사용 (이미 최신인 지역은 건너뜀)")
+    parser.add_argument("--fresh", action="store_true", help="중단된 빌드의 임베딩 저널을 지우고 처음부터 빌드")
+    parser.add_argument("--continue-on-error", action="store_true", help="로드에 실패한 JSON 파일을 빼고 인덱스 게시")
+    parser.add_argument("--profile", action="store_true", help="벽시계/CPU 시간과 할당 위치 프로파일 저장")
+    return parser.parse_args()
+
+
+def show_versions():
+    """지역별 인덱스 버전 목록 출력"""
+    for region_name in Config.get_supported_regions():
+        current = VectorStoreManager.get_current_version(region_name)
+        print(f"{region_name}:")
+        for version in VectorStoreManager.list_versions(region_name):
+            marker = " (current)" if version == current else ""
+            print(f"  {version}{marker}")
+
+
+def run(args: argparse.Namespace) -> bool:
+    """명령 실행 (성공 여부 반환)"""
+    if args.list:
+        show_versions()
+        return True
     
     # 설정 검증
     if not Config.validate():
-        return
+        return False
     
     # 벡터 스토어 매니저 생성
     try:
         vector_manager = VectorStoreManager()
     except VectorStoreError as e:
         print(f"초기화 실패: {e}")
-        return
+        return False
+    
+    if args.rollback:
+        for region_name in Config.get_supported_regions():
+            version = vector_manager.rollback(region_name)
+            if version:
+                print(f"{region_name}: {version}(으)로 되돌림")
+            else:
+                print(f"{region_name}: 되돌릴 이전 버전이 없습니다.")
+        return True
+    
+    if args.resume and args.fresh:
+        print("--resume과 --fresh는 함께 사용할 수 없습니다.")
+        return False
+    
+    # 중단된 빌드의 저널을 말없이 지우지 않도록, 저널이 있으면 --resume/--fresh 중 하나를 요구
+    if not args.resume and not args.fresh:
+        interrupted = [
+            region_name for region_name in Config.get_supported_regions()
+            if vector_manager.get_journal(region_name).exists()
+        ]
+        if interrupted:
+            print(f"중단된 빌드의 임베딩 저널이 있습니다: {', '.join(interrupted)}")
+            print("이어서 빌드하려면 --resume, 저널을 지우고 처음부터 빌드하려면 --fresh를 지정하세요.")
+            return False
+    
+    print("벡터 인덱스 빌드 시작\n")
     
     # 각 지역별로 인덱스 빌드
     success_count = 0
     for region_name in Config.get_supported_regions():
-        if build_index_for_region(region_name, vector_manager):
+        if build_index_for_region(
+            region_name, vector_manager, resume=args.resume, continue_on_error=args.continue_on_error
+        ):
             success_count += 1
     
     # 결과 요약
@@ -79,6 +202,17 @@ def main():
     print("빌드 완료")
     print(f"성공: {success_count}/{len(Config.get_supported_regions())} 지역")
     print(f"{'='*50}")
+    return success_count == len(Config.get_supported_regions())
+
+
+def main():
+    """메인 실행 함수 (실패한 지역이 있으면 종료 코드 1)"""
+    args = parse_args()
+    
+    with Profiler("build_index") if args.profile else nullcontext():
+        ok = run(args)
+    if not ok:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
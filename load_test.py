@@ -0,0 +1,331 @@
+"""
+대화 트레이스 재생 부하 테스트
+멀티턴 세션을 동시에 재생해 턴 유형별 지연 백분위수, 처리량, 오류율, 메모리 증가량 측정
+가짜 LLM/임베딩으로 완전히 오프라인에서 실행
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List
+
+# 프로젝트 루트 경로 추가
+sys.path.append(str(Path(__file__).parent))
+
+from build_index import ensure_indexes
+from modules import Config, DocumentLoader, RecyclingAgent
+from modules.metrics import percentile
+from modules.prompt_stats import get_prompt_ledger, turn_label
+from modules.scheduler import get_scheduler
+from modules.tools import get_vector_store_manager
+
+# 오프라인 백엔드와 현실적인 지연 분포 (LLM/임베딩 인스턴스가 만들어지기 전에 호출)
+Config.use_fake_backends(FAKE_LLM_LATENCY_MS=600, FAKE_EMBEDDING_LATENCY_MS=80)
+
+
+# 오류/저하로 보는 턴 결과 경로 (RecyclingAgent.last_answer_mode / last_intent_mode)
+ERROR_ANSWER_MODES = {"error"}
+DEGRADED_ANSWER_MODES = {"degraded"}
+ERROR_INTENT_MODES = {"error"}
+DEGRADED_INTENT_MODES = {"fallback"}
+
+GREETINGS = ["안녕하세요!", "안녕 버링아", "반가워요", "고마워요!", "오늘 날씨 좋네요"]
+ITEM_QUESTIONS = ["{region}에서 {item} 어떻게 버려요?", "{region} {item} 분리수거 방법 알려주세요", "{region}에서 {item}은 어떻게 배출하나요?"]
+NO_REGION_QUESTIONS = ["{item} 어떻게 버려요?", "{item} 버리는 법 알려주세요"]
+FOLLOWUPS = ["{item}은요?", "그럼 {item}는요?"]
+
+
+def generate_sessions(count: int, seed: int) -> List[List[Dict[str, Any]]]:
+    """실제 트래픽 비율을 흉내 낸 합성 세션 생성 (품목은 실제 데이터에서 선택)"""
+    rng = random.Random(seed)
+    items = {
+        region: sorted({
+            doc.metadata["품목"]
+            for doc in DocumentLoader.iter_documents(Config.DATA_DIR / region)
+            if len(doc.metadata["품목"]) <= 10
+        })
+        for region in Config.get_supported_regions()
+    }
+
+    sessions = []
+    for _ in range(count):
+        region = rng.choice(Config.get_supported_regions())
+        pick = lambda: rng.choice(items[region])
+        turns = []
+        if rng.random() < 0.6:
+            turns.append({"type": "greeting", "input": rng.choice(GREETINGS)})
+
+        kind = rng.random()
+        if kind < 0.5:
+            # 지역 포함 질문 + 후속 품목 질문
+            turns.append({"type": "item_question", "input": rng.choice(ITEM_QUESTIONS).format(region=region, item=pick())})
+            for _ in range(rng.randint(0, 2)):
+                turns.append({"type": "item_followup", "input": rng.choice(FOLLOWUPS).format(item=pick())})
+        elif kind < 0.8:
+            # 지역 없이 묻고 지역명만 이어서 입력
+            turns.append({"type": "item_question", "input": rng.choice(NO_REGION_QUESTIONS).format(item=pick())})
+            turns.append({"type": "region_followup", "input": region})
+        else:
+            # 잡담 위주 세션
+            for _ in range(rng.randint(1, 3)):
+                turns.append({"type": "casual", "input": rng.choice(GREETINGS)})
+
+        for turn in turns:
+            turn["think_time"] = round(rng.uniform(0.5, 3.0), 2)
+        sessions.append(turns)
+    return sessions
+
+
+def load_sessions(path: Path) -> List[List[Dict[str, Any]]]:
+    """트레이스 파일 로드 ([[{"type", "input", "think_time"}, ...], ...])"""
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def read_rss_kb() -> int:
+    """현재 RSS (KB, /proc 미지원 OS에서는 0)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError):
+        return 0
+
+
+def embedding_metrics() -> Dict[str, Any]:
+    """질의 임베딩 마이크로 배치 지표 (업스트림 요청 수는 가짜 임베딩에서만 집계)"""
+    embeddings = get_vector_store_manager().embeddings
+    metrics = embeddings.batcher.metrics() if embeddings.batcher else {}
+    metrics["upstream_requests"] = getattr(embeddings.embeddings, "request_count", None)
+    return metrics
+
+
+class LoadTest:
+    """세션 트레이스 재생기"""
+
+    def __init__(self, sessions: List[List[Dict[str, Any]]], concurrency: int, rate: float, think_scale: float, seed: int, trace_alloc: bool = False):
+        """
+        Args:
+            sessions: 재생할 세션 목록
+            concurrency: 동시에 진행할 최대 세션 수
+            rate: 초당 세션 도착률 (포아송 도착, 0이면 한꺼번에 시작)
+            think_scale: 트레이스의 사용자 입력 대기 시간 배율 (0이면 대기 없음)
+            seed: 도착 간격 난수 시드
+            trace_alloc: tracemalloc으로 Python 할당량 추적 (지연 측정에 오버헤드가 있음)
+        """
+        self.sessions = sessions
+        self.concurrency = concurrency
+        self.rate = rate
+        self.think_scale = think_scale
+        self.rng = random.Random(seed)
+        self.trace_alloc = trace_alloc
+        self.results: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def classify(agent: RecyclingAgent) -> str:
+        """턴 결과 분류 (ok | degraded | error): 응답 문자열이 아니라 턴 상태의 답변/의도 경로로 판단"""
+        if agent.last_answer_mode in ERROR_ANSWER_MODES or agent.last_intent_mode in ERROR_INTENT_MODES:
+            return "error"
+        if agent.last_answer_mode in DEGRADED_ANSWER_MODES or agent.last_intent_mode in DEGRADED_INTENT_MODES:
+            return "degraded"
+        return "ok"
+
+    def _run_session(self, turns: List[Dict[str, Any]], arrived_at: float):
+        """
+        세션 재생
+
+        첫 턴 지연은 예정 도착 시각부터 잽니다 (동시 세션 한도에 막혀 기다린 시간 포함).
+        이후 턴은 앞 턴 응답 후 사용자 대기 시간이 지난 시점에 도착합니다.
+        """
+        agent = RecyclingAgent()
+        for i, turn in enumerate(turns):
+            if i:
+                if self.think_scale:
+                    time.sleep(turn.get("think_time", 0) * self.think_scale)
+                arrived_at = time.perf_counter()
+
+            turn_label.set(turn.get("type", "unknown"))
+            queued = time.perf_counter() - arrived_at
+            try:
+                agent.get_response(turn["input"])
+                outcome = self.classify(agent)
+            except Exception:
+                outcome = "error"
+            elapsed = time.perf_counter() - arrived_at
+
+            with self._lock:
+                self.results.append({
+                    "type": turn.get("type", "unknown"),
+                    "latency": elapsed,
+                    "queued": queued,
+                    "outcome": outcome,
+                    "answer_mode": agent.last_answer_mode
+                })
+
+    def run(self) -> Dict[str, Any]:
+        """부하 실행 후 요약 반환"""
+        if self.trace_alloc:
+            tracemalloc.start()
+        rss_start = read_rss_kb()
+        start = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            for turns in self.sessions:
+                executor.submit(self._run_session, turns, time.perf_counter())
+                if self.rate > 0:
+                    time.sleep(self.rng.expovariate(self.rate))
+
+        elapsed = time.perf_counter() - start
+        traced_current, traced_peak = (0, 0)
+        if self.trace_alloc:
+            traced_current, traced_peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+        by_type: Dict[str, List[Dict[str, Any]]] = {}
+        for result in self.results:
+            by_type.setdefault(result["type"], []).append(result)
+
+        return {
+            "elapsed": elapsed,
+            "turns": len(self.results),
+            "throughput": len(self.results) / elapsed if elapsed else 0.0,
+            "error_rate": sum(r["outcome"] == "error" for r in self.results) / max(1, len(self.results)),
+            "degraded_rate": sum(r["outcome"] == "degraded" for r in self.results) / max(1, len(self.results)),
+            "queued": {
+                "p95": percentile([r["queued"] for r in self.results], 95),
+                "max": max((r["queued"] for r in self.results), default=0.0)
+            },
+            "memory": {
+                "rss_start_kb": rss_start,
+                "rss_end_kb": read_rss_kb(),
+                "python_alloc_kb": traced_current // 1024,
+                "python_peak_kb": traced_peak // 1024
+            },
+            "scheduler": get_scheduler().metrics(),
+            "embedding": embedding_metrics(),
+            "prompts": get_prompt_ledger().summary(),
+            "by_type": {
+                turn_type: {
+                    "count": len(rows),
+                    "p50": percentile([r["latency"] for r in rows], 50),
+                    "p95": percentile([r["latency"] for r in rows], 95),
+                    "p99": percentile([r["latency"] for r in rows], 99),
+                    "error_rate": sum(r["outcome"] == "error" for r in rows) / len(rows),
+                    "degraded_rate": sum(r["outcome"] == "degraded" for r in rows) / len(rows),
+                    "answer_modes": {
+                        mode: sum(r["answer_mode"] == mode for r in rows)
+                        for mode in sorted({str(r["answer_mode"]) for r in rows})
+                    }
+                }
+                for turn_type, rows in sorted(by_type.items())
+            }
+        }
+
+
+def print_report(report: Dict[str, Any]):
+    """요약 출력"""
+    print(f"\n{'='*70}")
+    print(f"{'턴 유형':<16} {'건수':>6} {'p50(ms)':>9} {'p95(ms)':>9} {'p99(ms)':>9} {'오류율':>7} {'저하율':>7}")
+    print(f"{'-'*70}")
+    for turn_type, row in report["by_type"].items():
+        print(
+            f"{turn_type:<16} {row['count']:>6} {row['p50']*1000:>9.0f} "
+            f"{row['p95']*1000:>9.0f} {row['p99']*1000:>9.0f} {row['error_rate']:>7.1%} {row['degraded_rate']:>7.1%}"
+        )
+    print(f"{'-'*70}")
+    print(f"전체 오류율 {report['error_rate']:.1%}, 저하율 {report['degraded_rate']:.1%} (답변/의도 경로 기준)")
+    print(f"도착 후 처리 시작까지 대기: p95 {report['queued']['p95']*1000:.0f}ms, 최대 {report['queued']['max']*1000:.0f}ms")
+    memory = report["memory"]
+    print(f"총 {report['turns']}턴 / {report['elapsed']:.1f}초, 처리량 {report['throughput']:.1f} turn/s")
+    print(f"메모리: RSS {memory['rss_start_kb']/1024:.1f}MB -> {memory['rss_end_kb']/1024:.1f}MB")
+    if memory["python_peak_kb"]:
+        print(f"Python 할당 증가 {memory['python_alloc_kb']/1024:.1f}MB (최대 {memory['python_peak_kb']/1024:.1f}MB)")
+    scheduler = report["scheduler"]
+    print(
+        f"스케줄러: 요청 {scheduler['submitted']}건, 업스트림 {scheduler['dispatched']}건, "
+        f"병합 {scheduler['coalesced']}건, 만료 {scheduler['expired']}건"
+    )
+    for cls, wait in scheduler["wait_time"].items():
+        print(f"  {cls:<10} 대기 p50 {wait['p50']*1000:.0f}ms / p95 {wait['p95']*1000:.0f}ms (대기열 {scheduler['queue_depth'].get(cls, 0)})")
+    embedding = report["embedding"]
+    if embedding.get("batches"):
+        print(
+            f"임베딩 마이크로 배치: 질의 {embedding['queries']}건 -> 배치 {embedding['batches']}건 "
+            f"(병합 {embedding['coalesced']}건, 추가 대기 p95 {embedding['added_wait']['p95']*1000:.1f}ms)"
+        )
+        print(f"  배치 크기 {embedding['batch_size']}")
+        print(f"  추가 대기(ms) {embedding['added_wait_ms']}")
+    if embedding["upstream_requests"] is not None:
+        print(f"임베딩 업스트림 요청 {embedding['upstream_requests']}건")
+    print_prompt_report(report)
+    print(f"{'='*70}")
+
+
+def print_prompt_report(report: Dict[str, Any]):
+    """턴 유형별 프롬프트 토큰 (호출당 구역별 평균)과 턴당 절감 토큰/추정 지연"""
+    prompts = report["prompts"]
+    if not prompts["by_label"]:
+        return
+    print(f"{'-'*70}")
+    print(f"프롬프트 토큰 (근사치, 입력 1K 토큰당 {Config.PROMPT_PREFILL_MS_PER_1K_TOKENS:g}ms 가정)")
+    for turn_type, purposes in prompts["by_label"].items():
+        turns = report["by_type"].get(turn_type, {}).get("count") or 1
+        saved_tokens = sum(row["saved_tokens"] for row in purposes.values()) / turns
+        saved_ms = sum(row["saved_ms"] for row in purposes.values()) / turns
+        total = sum(row["total_tokens"] for row in purposes.values()) / turns
+        print(f"  {turn_type}: 턴당 입력 {total:.0f}토큰, 절감 {saved_tokens:.0f}토큰 (~{saved_ms:.1f}ms)")
+        for purpose, row in purposes.items():
+            sections = ", ".join(f"{name} {value:.0f}" for name, value in row["tokens"].items() if name != "total")
+            cache = "캐시 가능" if row["cacheable"] else f"캐시 최소 {Config.PROMPT_CACHE_MIN_TOKENS} 미만"
+            print(f"    {purpose:<10} {row['calls']}회, 호출당 {row['tokens']['total']:.0f}토큰 ({sections}; 접두부 {cache})")
+    variants = ", ".join(f"{purpose} {count}" for purpose, count in prompts["prefix_variants"].items())
+    print(f"  목적별 고정 접두부 종류: {variants} (1이면 호출 간 바이트 단위로 동일)")
+
+
+def parse_args():
+    """명령행 인자 파싱"""
+    parser = argparse.ArgumentParser(description="대화 트레이스 재생 부하 테스트")
+    parser.add_argument("--trace", type=Path, help="세션 트레이스 JSON (없으면 합성 세션 생성)")
+    parser.add_argument("--sessions", type=int, default=50, help="합성 세션 수")
+    parser.add_argument("--concurrency", type=int, default=16, help="동시 세션 수")
+    parser.add_argument("--rate", type=float, default=5.0, help="초당 세션 도착률 (0이면 한꺼번에 시작)")
+    parser.add_argument("--think-scale", type=float, default=0.0, help="사용자 입력 대기 시간 배율")
+    parser.add_argument("--seed", type=int, default=7, help="난수 시드")
+    parser.add_argument("--save-trace", type=Path, help="사용한 세션 트레이스를 파일로 저장")
+    parser.add_argument("--trace-alloc", action="store_true", help="tracemalloc으로 Python 할당량 추적")
+    parser.add_argument("--json", type=Path, help="결과를 JSON으로 저장")
+    return parser.parse_args()
+
+
+def main():
+    """메인 실행 함수"""
+    args = parse_args()
+
+    if not ensure_indexes():
+        return
+
+    sessions = load_sessions(args.trace) if args.trace else generate_sessions(args.sessions, args.seed)
+    if args.save_trace:
+        with open(args.save_trace, "w", encoding="utf-8") as f:
+            json.dump(sessions, f, ensure_ascii=False, indent=1)
+
+    print(f"세션 {len(sessions)}개 재생 (동시 {args.concurrency}, 도착률 {args.rate}/s, LLM={Config.LLM_BACKEND}, 임베딩={Config.EMBEDDING_BACKEND})")
+    report = LoadTest(
+        sessions, args.concurrency, args.rate, args.think_scale, args.seed, args.trace_alloc
+    ).run()
+    print_report(report)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,8 +2,10 @@
 재활용 도우미
 """
 
+import json
 import os
 import sys
+import threading
 from pathlib import Path
 
 sys.path.append(str(Path(__file__).parent))
@@ -56,5 +58,56 @@ def main():
         print(f"❌ 오류 발생: {e}")
 
 
+def serve():
+    """
+    프리포크 서빙 모드 (--serve)
+
+    표준 입력으로 받은 JSON 줄 요청을 세션 고정 워커 프로세스로 보내고, 응답을 JSON 줄로 출력합니다.
+    - 요청: {"session_id": "...", "input": "..."}
+    - 응답: {"session_id": "...", "answer": "...", "error": null}
+    같은 세션의 응답은 요청 순서대로, 다른 세션끼리는 완료 순서대로 출력됩니다.
+    워커 수는 SERVE_WORKERS, 워커당 동시 처리 턴 수는 SERVE_WORKER_THREADS로 지정합니다.
+    """
+    from modules.prefork import PreforkServer, preload
+
+    if not Config.validate():
+        return
+
+    print(f"인덱스/그래프 사전 로드 후 워커 {Config.SERVE_WORKERS}개 시작...", file=sys.stderr)
+    preload()
+
+    write_lock = threading.Lock()
+
+    def emit(session_id, answer, error):
+        with write_lock:
+            print(json.dumps({"session_id": session_id, "answer": answer, "error": error}, ensure_ascii=False), flush=True)
+
+    def on_done(session_id, future):
+        error = future.exception()
+        emit(session_id, None if error else future.result(), str(error) if error else None)
+
+    with PreforkServer() as server:
+        for line in sys.stdin:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+                session_id = str(request["session_id"])
+                user_input = str(request["input"])
+            except (ValueError, KeyError, TypeError) as e:
+                emit(None, None, f"잘못된 요청: {e}")
+                continue
+            future = server.submit(session_id, user_input)
+            future.add_done_callback(lambda f, session_id=session_id: on_done(session_id, f))
+
+
 if __name__ == "__main__":
-    main()
+    # 프로파일링 (벽시계/CPU 샘플링 + 할당 추적, 결과는 profiles/에 저장)
+    if "--profile" in sys.argv:
+        from modules.profiler import Profiler
+        with Profiler("main"):
+            main()
+    elif "--serve" in sys.argv:
+        serve()
+    else:
+        main()
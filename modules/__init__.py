@@ -2,7 +2,7 @@
 from .agent import RecyclingAgent
 from .config import Config
 from .vector_store import VectorStoreManager
-from .document_loader import DocumentLoader
+from .document_loader import DocumentLoader, LoadReport
 
 __version__ = "2.0.0"
 
@@ -10,5 +10,6 @@ __all__ = [
     "RecyclingAgent",
     "Config", 
     "VectorStoreManager",
-    "DocumentLoader"
+    "DocumentLoader",
+    "LoadReport"
 ]
@@ -3,9 +3,11 @@
 메모리 기반 대화 관리
 """
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 import uuid
 
+from .config import Config
+from .executor import direct_executor
 from .graph import recycling_graph
 from .state import RecyclingState
 
@@ -13,9 +15,15 @@ from .state import RecyclingState
 class RecyclingAgent:
     """개선된 버링이 재활용 챗봇"""
     
-    def __init__(self):
-        """에이전트 초기화"""
-        self.graph = recycling_graph
+    def __init__(self, executor: Optional[str] = None):
+        """에이전트 초기화
+        
+        Args:
+            executor: graph(LangGraph 워크플로우) 또는 direct(경량 직접 실행기)
+                      기본값은 Config.AGENT_EXECUTOR
+        """
+        executor = executor or Config.AGENT_EXECUTOR
+        self.graph = direct_executor if executor == "direct" else recycling_graph
         self.session_id = str(uuid.uuid4())
         self.reset()
     
@@ -26,6 +34,17 @@ class RecyclingAgent:
             "casual_count": 0,
             "total_turns": 0
         }
+        self.last_context_stats = None
+        self.last_answer_mode = None
+        self.last_intent_mode = None
+        self.total_tokens_saved = 0
+    
+    def close(self):
+        """세션 종료 (그래프 체크포인터에 쌓인 이 세션의 기록 삭제)"""
+        checkpointer = getattr(self.graph, "checkpointer", None)
+        delete_thread = getattr(checkpointer, "delete_thread", None)
+        if delete_thread:
+            delete_thread(self.session_id)
     
     def get_response(self, user_input: str) -> str:
         """사용자 입력 처리 및 응답 생성"""
@@ -51,6 +70,8 @@ class RecyclingAgent:
             return answer
             
         except Exception as e:
+            self.last_answer_mode = "error"
+            self.last_intent_mode = None
             return f"처리 중 오류가 발생했습니다: {str(e)}"
     
     def _update_state(self, result: Dict[str, Any]):
@@ -64,11 +85,24 @@ class RecyclingAgent:
             self.state["casual_count"] = result["casual_count"]
         if "total_turns" in result:
             self.state["total_turns"] = result["total_turns"]
+        
+        # 턴 결과 경로 (부하 테스트 등에서 오류/저하 응답 판별)
+        self.last_answer_mode = result.get("answer_mode")
+        self.last_intent_mode = result.get("intent_mode")
+        
+        # 컨텍스트 토큰 절감 통계
+        self.last_context_stats = result.get("context_stats")
+        if self.last_context_stats:
+            self.total_tokens_saved += self.last_context_stats.get("tokens_saved", 0)
     
     def get_conversation_summary(self) -> Dict[str, Any]:
         """대화 요약 정보 반환"""
         return {
             "total_turns": self.state["total_turns"],
             "casual_count": self.state["casual_count"],
-            "history_length": len(self.state["conversation_history"])
+            "history_length": len(self.state["conversation_history"]),
+            "context_stats": self.last_context_stats,
+            "answer_mode": self.last_answer_mode,
+            "intent_mode": self.last_intent_mode,
+            "total_tokens_saved": self.total_tokens_saved
         }
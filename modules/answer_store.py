@@ -0,0 +1,172 @@
+"""
+사전 생성 답변 저장소
+인덱스 버전별 (지역, 품목) 답변을 보관하고 질문이 한 품목으로 확정되면 바로 반환
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .config import Config
+from .prompts import PRECOMPUTE_QUESTION_TEMPLATES
+from .vector_store import VectorStoreManager
+
+
+# 질문 정규화 시 제거할 문자 (공백, 문장부호)
+_STRIP_PATTERN = re.compile(r"[\s?!.,~·'\"()]+")
+
+
+def normalize_question(text: str) -> str:
+    """지역명/조사/공백/문장부호를 제거한 조회 키"""
+    for region in Config.get_supported_regions():
+        text = text.replace(f"{region}에서", "").replace(region, "")
+    return _STRIP_PATTERN.sub("", text)
+
+
+def question_aliases(item: str) -> List[str]:
+    """품목 하나에 대응하는 정규화된 질문 표현 목록"""
+    aliases = [normalize_question(item)]
+    for template in PRECOMPUTE_QUESTION_TEMPLATES:
+        alias = normalize_question(template.format(item=item))
+        if alias not in aliases:
+            aliases.append(alias)
+    return [a for a in aliases if a]
+
+
+class AnswerStore:
+    """인덱스 버전에 묶인 지역별 답변 키-값 저장소
+
+    파일 구조: ANSWER_STORE_DIR/<지역코드>/<인덱스 버전>.json
+    """
+
+    def __init__(self, base_dir: Optional[Path] = None):
+        self.base_dir = base_dir or Config.ANSWER_STORE_DIR
+        # 지역명 -> (저장소, 매니페스트 버전을 확인한 시각)
+        self._cache: Dict[str, Tuple[Optional[Dict[str, Any]], float]] = {}
+        self._lock = threading.Lock()
+
+    def get_store_path(self, region_name: str, index_version: str) -> Optional[Path]:
+        """지역/버전별 저장 파일 경로"""
+        region_code = Config.get_region_code(region_name)
+        if not region_code:
+            return None
+        return self.base_dir / region_code / f"{index_version}.json"
+
+    def load(self, region_name: str, index_version: str) -> Optional[Dict[str, Any]]:
+        """특정 버전 저장소 로드 (없으면 None)"""
+        path = self.get_store_path(region_name, index_version)
+        if not path or not path.exists():
+            return None
+        try:
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"답변 저장소 로드 실패: {e}")
+            return None
+
+    def load_latest(self, region_name: str) -> Optional[Dict[str, Any]]:
+        """가장 최근에 만든 저장소 로드 (재생성 시 재사용할 이전 답변)"""
+        region_code = Config.get_region_code(region_name)
+        region_dir = self.base_dir / region_code if region_code else None
+        if not region_dir or not region_dir.exists():
+            return None
+        files = sorted(region_dir.glob("*.json"), key=lambda p: p.stat().st_mtime)
+        if not files:
+            return None
+        return self.load(region_name, files[-1].stem)
+
+    def save(self, region_name: str, index_version: str, entries: Dict[str, Dict[str, Any]], keep: int = 3) -> Path:
+        """
+        저장소 저장 (별칭 테이블을 함께 만들어 O(1) 조회 가능하게 함)
+
+        Args:
+            region_name: 지역명
+            index_version: 인덱스 버전
+            entries: 품목별 {"item_hash", "answer"}
+            keep: 보관할 이전 버전 수
+        """
+        aliases: Dict[str, Optional[str]] = {}
+        for item in entries:
+            for alias in question_aliases(item):
+                # 두 품목이 같은 표현을 쓰면 모호하므로 조회 대상에서 제외
+                aliases[alias] = None if alias in aliases and aliases[alias] != item else item
+
+        data = {
+            "region": region_name,
+            "index_version": index_version,
+            "entries": entries,
+            "aliases": {k: v for k, v in aliases.items() if v is not None}
+        }
+
+        path = self.get_store_path(region_name, index_version)
+        path.parent.mkdir(exist_ok=True, parents=True)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, path)
+
+        # 오래된 버전 정리
+        old_files = sorted(path.parent.glob("*.json"), key=lambda p: p.stat().st_mtime)
+        for old in old_files[:-keep]:
+            old.unlink(missing_ok=True)
+
+        with self._lock:
+            self._cache.pop(region_name, None)
+        return path
+
+    def _get_current(self, region_name: str) -> Optional[Dict[str, Any]]:
+        """현재 인덱스 버전과 일치하는 저장소 (지역별 캐시)
+
+        PRECOMPUTED_RECHECK_INTERVAL마다 매니페스트 버전을 다시 확인합니다.
+        - 인덱스 감시 스레드가 없는 경우(샤드 모드 등)에도 이전 버전 답변을 계속 쓰지 않음
+        - 저장소가 없던 지역은 build_answers.py가 나중에 만든 저장소를 반영
+        """
+        with self._lock:
+            cached = self._cache.get(region_name)
+            if cached and time.monotonic() - cached[1] < Config.PRECOMPUTED_RECHECK_INTERVAL:
+                return cached[0]
+
+        manifest = VectorStoreManager.load_manifest(region_name)
+        version = manifest["version"] if manifest else None
+        if cached and cached[0] is not None and cached[0].get("index_version") == version:
+            # 버전이 그대로면 파일을 다시 읽지 않음
+            data = cached[0]
+        else:
+            data = self.load(region_name, version) if version else None
+
+        with self._lock:
+            self._cache[region_name] = (data, time.monotonic())
+        return data
+
+    def invalidate(self, region_name: Optional[str] = None):
+        """캐시 무효화 (인덱스가 바뀌었을 때)"""
+        with self._lock:
+            if region_name is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(region_name, None)
+
+    def lookup(self, region_name: str, user_input: str) -> Optional[str]:
+        """질문이 한 품목으로 확정되면 사전 생성 답변 반환"""
+        data = self._get_current(region_name)
+        if not data:
+            return None
+        item = data["aliases"].get(normalize_question(user_input))
+        if not item:
+            return None
+        entry = data["entries"].get(item)
+        return entry["answer"] if entry else None
+
+
+# 전역 인스턴스
+_answer_store = None
+
+def get_answer_store() -> AnswerStore:
+    global _answer_store
+    if not _answer_store:
+        _answer_store = AnswerStore()
+    return _answer_store
@@ -4,10 +4,10 @@
 
 import os
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Any, Dict, Optional
 
 from dotenv import load_dotenv
-from langchain_google_genai import ChatGoogleGenerativeAI
+from langchain_google_genai import ChatGoogleGenerativeAI, GoogleGenerativeAIEmbeddings
 
 # 환경 변수 로드
 load_dotenv()
@@ -19,11 +19,25 @@ class Config:
     # 기본 경로
     BASE_DIR = Path(__file__).parent.parent
     DATA_DIR = BASE_DIR / "재활용정보"
-    INDEX_DIR = BASE_DIR / "faiss_index"
+    INDEX_DIR = Path(os.getenv("INDEX_DIR", BASE_DIR / "faiss_index"))
+    CORPUS_CACHE_DIR = BASE_DIR / ".corpus_cache"  # 정규화 문서 스냅샷
+    ANSWER_STORE_DIR = BASE_DIR / "answer_store"  # 사전 생성 답변
     
     # API 설정
     GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
     
+    # LLM 백엔드 (gemini | fake: 오프라인 테스트용 가짜 LLM)
+    LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini")
+    FAKE_LLM_LATENCY_MS = float(os.getenv("FAKE_LLM_LATENCY_MS", "300"))
+    FAKE_LLM_ERROR_RATE = float(os.getenv("FAKE_LLM_ERROR_RATE", "0"))
+    FAKE_LLM_HANG_RATE = float(os.getenv("FAKE_LLM_HANG_RATE", "0"))  # 데드라인을 넘겨 응답하지 않을 확률
+    FAKE_LLM_CPU_MS = float(os.getenv("FAKE_LLM_CPU_MS", "0"))  # 응답마다 GIL을 잡는 CPU 작업 시간
+    
+    # 임베딩 백엔드 (gemini | fake: 해싱 기반 가짜 임베딩, INDEX_DIR을 별도로 지정해서 사용)
+    EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "gemini")
+    FAKE_EMBEDDING_DIM = 256
+    FAKE_EMBEDDING_LATENCY_MS = float(os.getenv("FAKE_EMBEDDING_LATENCY_MS", "0"))
+    
     # 모델 설정
     LLM_MODEL = "gemini-2.0-flash"
     EMBEDDING_MODEL = "models/gemini-embedding-exp-03-07"
@@ -34,9 +48,96 @@ class Config:
     LLM_MAX_TOKENS = 1000
     LLM_MAX_TOKENS_SHORT = 200  # 짧은 응답용
     
+    # LLM 호출 제어
+    LLM_DEADLINES: Dict[str, float] = {  # 용도별 호출 제한 시간 (초)
+        "intent": 5.0,
+        "recycling": 15.0,
+        "casual": 8.0,
+        "batch": 60.0  # 오프라인 일괄 생성 (실시간 요청 뒤에서 기다릴 수 있음)
+    }
+    LLM_MAX_RETRIES = 1  # 클라이언트 내부 재시도 횟수
+    LLM_CALL_WORKERS = 32  # 동시에 실행할 업스트림(LLM/임베딩) 요청 수
+    
+    # 전역 요청 스케줄러 (LLM + 임베딩 공유 한도)
+    GEMINI_RATE_LIMIT = float(os.getenv("GEMINI_RATE_LIMIT", "10"))  # 초당 요청 수 (0이면 제한 없음)
+    GEMINI_RATE_BURST = 10  # 순간 허용 요청 수
+    SCHEDULER_PRIORITIES: Dict[str, int] = {  # 낮을수록 먼저 처리
+        "recycling": 0,
+        "embedding": 0,
+        "intent": 1,
+        "casual": 2,
+        "batch": 3
+    }
+    
+    # 프로파일링 (--profile)
+    PROFILE_DIR = Path(os.getenv("PROFILE_DIR", BASE_DIR / "profiles"))
+    PROFILE_INTERVAL_MS = 5  # 스택 샘플링 간격
+    PROFILE_TRACE_ALLOC = os.getenv("PROFILE_TRACE_ALLOC", "true").lower() == "true"  # tracemalloc 할당 추적
+    PROFILE_IN_PROCESS = os.getenv("PROFILE_IN_PROCESS", "true").lower() == "true"  # 프로파일 중 문서 파싱을 부모 프로세스에서 직렬로, 스냅샷 없이 실행
+    PROFILE_ALLOC_FRAMES = 10  # 할당 스택 깊이
+    PROFILE_ALLOC_SNAPSHOT_SEC = 5.0  # 할당 스냅샷 간격
+    PROFILE_TOP_N = 15  # 요약에 표시할 상위 항목 수
+    
+    # 질의 임베딩 마이크로 배치 (동시에 들어온 질의를 배치 요청 1회로 전송)
+    EMBEDDING_MICROBATCH_WAIT_MS = float(os.getenv("EMBEDDING_MICROBATCH_WAIT_MS", "10"))  # 첫 질의 이후 최대 대기 (0이면 사용 안 함)
+    EMBEDDING_MICROBATCH_SIZE = int(os.getenv("EMBEDDING_MICROBATCH_SIZE", "16"))  # 배치 최대 크기
+    EMBEDDING_QUERY_DEADLINE = float(os.getenv("EMBEDDING_QUERY_DEADLINE", "5"))  # 질의 임베딩 제한 시간 (초)
+    LLM_HEDGE_ENABLED = os.getenv("LLM_HEDGE_ENABLED", "false").lower() == "true"
+    LLM_HEDGE_DEFAULT_DELAY = 3.0  # 지연 표본이 부족할 때 헤지 시점 (초)
+    LLM_HEDGE_MIN_SAMPLES = 20  # p95 계산에 필요한 최소 표본 수
+    LLM_BREAKER_FAILURE_THRESHOLD = 5  # 연속 실패 시 서킷 오픈
+    LLM_BREAKER_RESET_TIMEOUT = 30.0  # 서킷 오픈 후 시험 호출까지 대기 (초)
+    
     # 검색 설정
     SEARCH_K = 3  # 유사도 검색 시 반환할 문서 수
     
+    # 여러 품목 질문 분할 검색 (modules/multi_item.py, 품목이 2개 이상 언급되면 품목별로 동시 검색)
+    MULTI_ITEM_ENABLED = os.getenv("MULTI_ITEM_ENABLED", "true").lower() == "true"
+    MULTI_ITEM_MAX_ITEMS = 5  # 분할 검색할 최대 품목 수 (앞에서부터)
+    MULTI_ITEM_SEARCH_K = 2  # 품목별 검색 문서 수
+    MULTI_ITEM_RERANK_EXTRA = 3  # 품목명 일치 문서를 고르기 위해 품목별로 더 가져올 후보 수
+    MULTI_ITEM_SEARCH_WORKERS = 16  # 품목별 검색 스레드 수 (프로세스 전체 공유)
+    
+    # 답변 방식 (llm | extractive | auto: 품목명이 질문과 일치하면 LLM 없이 템플릿 답변)
+    ANSWER_MODE = os.getenv("ANSWER_MODE", "llm")
+    
+    # 사전 생성 답변 사용 여부 (build_answers.py로 생성)
+    PRECOMPUTED_ANSWERS_ENABLED = os.getenv("PRECOMPUTED_ANSWERS_ENABLED", "true").lower() == "true"
+    PRECOMPUTED_RECHECK_INTERVAL = 30.0  # 인덱스 버전/저장소를 다시 확인하는 주기 (초, 감시 스레드 없이도 새 버전과 새 저장소 반영)
+    ANSWER_BUILD_SLEEP_TIME = 1  # 답변 생성 호출 간격 (초)
+    
+    # 컨텍스트 구성 설정
+    CONTEXT_TOKEN_BUDGET = 800  # 답변 프롬프트에 넣을 컨텍스트 최대 토큰 (근사치)
+    CONTEXT_DEDUP_THRESHOLD = 0.8  # 유사 중복으로 판단할 문자 3-gram Jaccard 유사도
+    
+    # 프롬프트 토큰 집계 설정 (modules/prompt_stats.py)
+    PROMPT_PREFILL_MS_PER_1K_TOKENS = float(os.getenv("PROMPT_PREFILL_MS_PER_1K_TOKENS", "30"))  # 입력 1K 토큰 처리 지연 근사치 (ms)
+    PROMPT_CACHE_MIN_TOKENS = int(os.getenv("PROMPT_CACHE_MIN_TOKENS", "1024"))  # 프로바이더가 접두부를 캐시하는 최소 토큰 수
+    
+    # 인덱스 버전 관리
+    INDEX_KEEP_VERSIONS = 3  # 보관할 인덱스 버전 수
+    INDEX_WATCH_INTERVAL = 10.0  # 새 인덱스 버전 확인 주기 (초, 0이면 비활성)
+    
+    # 턴 실행기 (graph: LangGraph 워크플로우 | direct: 프레임워크 오버헤드 없는 직접 실행)
+    AGENT_EXECUTOR = os.getenv("AGENT_EXECUTOR", "graph")
+    
+    # 프리포크 서빙 설정
+    SERVE_WORKERS = int(os.getenv("SERVE_WORKERS", os.cpu_count() or 1))  # 워커 프로세스 수
+    SERVE_WORKER_THREADS = int(os.getenv("SERVE_WORKER_THREADS", "8"))  # 워커당 동시 처리 턴 수 (LLM 대기 겹치기)
+    SERVE_SESSION_IDLE_TIMEOUT = float(os.getenv("SERVE_SESSION_IDLE_TIMEOUT", "1800"))  # 이 시간 동안 요청이 없는 세션은 정리 (초)
+    SERVE_SWEEP_INTERVAL = 30.0  # 유휴 세션 확인 주기 (초)
+    
+    # 검색 백엔드 (local: 프로세스 내 FAISS | sharded: 지역별 샤드 노드로 전달)
+    RETRIEVAL_BACKEND = os.getenv("RETRIEVAL_BACKEND", "local")
+    SHARD_NODES = [node for node in os.getenv("SHARD_NODES", "").split(",") if node]  # host:port 목록 (앞쪽이 우선)
+    SHARD_AUTHKEY = os.getenv("SHARD_AUTHKEY", "").encode("utf-8")  # 노드 연결 인증 키 (루프백이 아닌 주소는 필수)
+    SHARD_BATCH_WAIT_MS = 2.0  # 샤드별 요청을 모으는 최대 대기
+    SHARD_BATCH_SIZE = 32  # 샤드 요청 1회에 담는 최대 검색 수
+    SHARD_REQUEST_TIMEOUT = 5.0  # 노드 응답 대기 (초)
+    SHARD_RETRY_INTERVAL = 5.0  # 실패한 노드를 다시 시도하기까지 대기 (초)
+    SHARD_DISCOVERY_INTERVAL = 30.0  # 노드별 담당 지역을 다시 조회하는 주기 (초)
+    SHARD_SEARCH_WORKERS = SHARD_BATCH_SIZE  # 노드에서 배치 내 검색을 동시에 처리할 스레드 수 (질의 임베딩이 한 배치로 묶이도록)
+    
     # 지역 매핑
     REGION_MAP: Dict[str, str] = {
         "관악구": "gwanakgu",
@@ -45,16 +146,21 @@ class Config:
     
     # 배치 처리 설정
     EMBEDDING_BATCH_SIZE = 5
-    API_SLEEP_TIME = 5  # 초
-    ERROR_SLEEP_TIME = 5  # 초
+    API_SLEEP_TIME = 0 if EMBEDDING_BACKEND == "fake" else 5  # 초
+    ERROR_SLEEP_TIME = 0 if EMBEDDING_BACKEND == "fake" else 5  # 초
+    
+    # 문서 로딩 설정
+    LOADER_WORKERS = min(8, os.cpu_count() or 1)  # JSON 파싱 프로세스 수
+    LOADER_USE_SNAPSHOT = True  # 정규화 스냅샷 사용 (변경되지 않은 파일은 파싱 생략)
     
     # LLM 인스턴스 캐시
-    _llm_instances: Dict[str, ChatGoogleGenerativeAI] = {}
+    _llm_instances: Dict[str, Any] = {}
     
     @classmethod
     def validate(cls) -> bool:
         """설정 유효성 검사"""
-        if not cls.GOOGLE_API_KEY:
+        uses_gemini = cls.LLM_BACKEND != "fake" or cls.EMBEDDING_BACKEND != "fake"
+        if not cls.GOOGLE_API_KEY and uses_gemini:
             print("GOOGLE_API_KEY가 설정되지 않았습니다.")
             print(".env 파일에 GOOGLE_API_KEY를 추가하세요.")
             return False
@@ -64,7 +170,30 @@ class Config:
             return False
         
         return True
-    
+
+    @classmethod
+    def use_fake_backends(cls, **overrides: Any):
+        """오프라인 가짜 LLM/임베딩 백엔드로 전환 (벤치마크/부하 테스트/테스트용)
+
+        이미 환경 변수로 지정한 값이 우선합니다. 환경 변수에도 기록하므로 자식 프로세스(샤드 노드 등)에 그대로 전달됩니다.
+        LLM/임베딩/스케줄러 인스턴스가 만들어지기 전에 호출해야 합니다.
+
+        Args:
+            overrides: 설정 이름 -> 기본값 (예: FAKE_LLM_LATENCY_MS=600)
+        """
+        defaults = {
+            "LLM_BACKEND": "fake",
+            "EMBEDDING_BACKEND": "fake",
+            "INDEX_DIR": cls.BASE_DIR / ".offline_index",
+            "GEMINI_RATE_LIMIT": 0,
+            **overrides
+        }
+        for name, value in defaults.items():
+            os.environ.setdefault(name, str(value))
+            setattr(cls, name, type(getattr(cls, name))(os.environ[name]))
+        cls.API_SLEEP_TIME = 0 if cls.EMBEDDING_BACKEND == "fake" else 5
+        cls.ERROR_SLEEP_TIME = 0 if cls.EMBEDDING_BACKEND == "fake" else 5
+
     @classmethod
     def get_region_code(cls, region_name: str) -> Optional[str]:
         """지역명으로 지역 코드 반환"""
@@ -84,12 +213,39 @@ class Config:
         return None
     
     @classmethod
-    def get_llm(cls, purpose: str = "recycling") -> ChatGoogleGenerativeAI:
+    def get_embeddings(cls) -> Any:
+        """임베딩 클라이언트 생성 (EMBEDDING_BACKEND가 fake이면 FakeEmbeddings)"""
+        if cls.EMBEDDING_BACKEND == "fake":
+            from .fake_embeddings import FakeEmbeddings
+            return FakeEmbeddings(
+                dim=cls.FAKE_EMBEDDING_DIM,
+                latency_ms=cls.FAKE_EMBEDDING_LATENCY_MS
+            )
+        
+        return GoogleGenerativeAIEmbeddings(
+            model=cls.EMBEDDING_MODEL,
+            google_api_key=cls.GOOGLE_API_KEY
+        )
+    
+    @classmethod
+    def get_llm(cls, purpose: str = "recycling") -> Any:
         """용도별 LLM 인스턴스 반환 (싱글톤)
         - recycling: 재활용 관련 (정확도 우선)
         - casual: 일상 대화 (친근함 우선)
+        
+        LLM_BACKEND가 fake이면 지연/오류를 주입하는 FakeLLM을 반환합니다.
         """
         if purpose not in cls._llm_instances:
+            if cls.LLM_BACKEND == "fake":
+                from .fake_llm import FakeLLM
+                cls._llm_instances[purpose] = FakeLLM(
+                    latency_ms=cls.FAKE_LLM_LATENCY_MS,
+                    error_rate=cls.FAKE_LLM_ERROR_RATE,
+                    hang_rate=cls.FAKE_LLM_HANG_RATE,
+                    cpu_ms=cls.FAKE_LLM_CPU_MS
+                )
+                return cls._llm_instances[purpose]
+            
             if purpose == "casual":
                 # 일상 대화용
                 temperature = cls.LLM_TEMPERATURE_CASUAL
@@ -101,6 +257,8 @@ class Config:
                 model=cls.LLM_MODEL,
                 temperature=temperature,
                 google_api_key=cls.GOOGLE_API_KEY,
-                max_tokens=cls.LLM_MAX_TOKENS
+                max_tokens=cls.LLM_MAX_TOKENS,
+                timeout=max(cls.LLM_DEADLINES.values()),
+                max_retries=cls.LLM_MAX_RETRIES
             )
         return cls._llm_instances[purpose]
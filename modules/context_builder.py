@@ -0,0 +1,134 @@
+"""
+답변 생성용 컨텍스트 구성 모듈
+유사 중복 문서 제거, 출처 병합, 토큰 예산 적용
+"""
+
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from langchain_core.documents import Document
+
+from .config import Config
+from .tokens import estimate_tokens
+
+
+def _shingles(text: str, size: int = 3) -> Set[str]:
+    """문자 n-gram 집합 (지역 줄은 모든 문서에 공통이라 제외)"""
+    body = " ".join(
+        line for line in text.split("\n") if not line.startswith("지역:")
+    )
+    body = "".join(body.split())
+    if len(body) <= size:
+        return {body}
+    return {body[i:i + size] for i in range(len(body) - size + 1)}
+
+
+def _jaccard(a: Set[str], b: Set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def _legacy_context(docs: List[Document]) -> str:
+    """기존 방식(완전 일치 중복 제거 + 문서별 출처 반복) 컨텍스트"""
+    parts = []
+    seen = set()
+    for doc in docs:
+        if doc.page_content in seen:
+            continue
+        seen.add(doc.page_content)
+        parts.append(f"[{len(seen)}] {doc.page_content}")
+        if 'source' in doc.metadata:
+            parts.append(f"출처: {doc.metadata['source']}")
+        if 'url' in doc.metadata:
+            parts.append(f"URL: {doc.metadata['url']}")
+    return "\n\n".join(parts)
+
+
+def _source_lines(doc: Document) -> List[str]:
+    lines = []
+    if 'source' in doc.metadata:
+        lines.append(f"출처: {doc.metadata['source']}")
+    if 'url' in doc.metadata:
+        lines.append(f"URL: {doc.metadata['url']}")
+    return lines
+
+
+def build_context(
+    docs: List[Document],
+    token_budget: Optional[int] = None,
+    similarity_threshold: Optional[float] = None
+) -> Tuple[str, Dict[str, Any]]:
+    """
+    검색 문서로 컨텍스트 문자열 구성
+
+    Args:
+        docs: 유사도 순으로 정렬된 검색 문서
+        token_budget: 컨텍스트 토큰 예산 (기본값: Config에서 가져옴)
+        similarity_threshold: 유사 중복 판단 기준 Jaccard 유사도 (기본값: Config에서 가져옴)
+
+    Returns:
+        (컨텍스트 문자열, 통계 dict)
+    """
+    if token_budget is None:
+        token_budget = Config.CONTEXT_TOKEN_BUDGET
+    if similarity_threshold is None:
+        similarity_threshold = Config.CONTEXT_DEDUP_THRESHOLD
+
+    # 1. 유사 중복 제거 (상위 문서 우선)
+    kept: List[Document] = []
+    kept_shingles: List[Set[str]] = []
+    duplicates = 0
+    for doc in docs:
+        shingles = _shingles(doc.page_content)
+        if any(_jaccard(shingles, s) >= similarity_threshold for s in kept_shingles):
+            duplicates += 1
+            continue
+        kept.append(doc)
+        kept_shingles.append(shingles)
+
+    # 2. 토큰 예산 내에서 문서 선택 (출처 줄은 처음 등장할 때만 비용 계산)
+    selected: List[Document] = []
+    seen_sources = set()
+    used = 0
+    over_budget = 0
+    for doc in kept:
+        source_key = tuple(_source_lines(doc))
+        cost = estimate_tokens(doc.page_content)
+        if source_key not in seen_sources:
+            cost += sum(estimate_tokens(line) for line in source_key)
+        if selected and used + cost > token_budget:
+            over_budget += 1
+            continue
+        selected.append(doc)
+        seen_sources.add(source_key)
+        used += cost
+
+    # 3. 출처별로 묶어서 출력 (출처 순서는 처음 등장한 순서)
+    groups: Dict[Tuple[str, ...], List[Document]] = {}
+    for doc in selected:
+        groups.setdefault(tuple(_source_lines(doc)), []).append(doc)
+
+    parts = []
+    index = 0
+    for source_key, group in groups.items():
+        block = []
+        for doc in group:
+            index += 1
+            block.append(f"[{index}] {doc.page_content}")
+        block.extend(source_key)
+        parts.append("\n".join(block))
+
+    context = "\n\n".join(parts)
+
+    baseline_tokens = estimate_tokens(_legacy_context(docs))
+    context_tokens = estimate_tokens(context)
+    stats = {
+        "retrieved": len(docs),
+        "used": len(selected),
+        "dropped_duplicates": duplicates,
+        "dropped_over_budget": over_budget,
+        "context_tokens": context_tokens,
+        "baseline_tokens": baseline_tokens,
+        "tokens_saved": max(0, baseline_tokens - context_tokens)
+    }
+    return context, stats
@@ -1,74 +1,284 @@
 """재활용 정보 문서 로더"""
 
 import json
+import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 from langchain_core.documents import Document
 
+from .config import Config
+
+
+# 품목별 선택 필드
+ITEM_FIELDS = ["배출방법", "배출요일", "세척여부", "주의사항"]
+
+# 스냅샷 포맷 버전 (문서 구성 방식이 바뀌면 올림)
+SNAPSHOT_VERSION = 3
+
+
+class LoadReport:
+    """문서 로드 결과 (파일 단위 실패와 스키마 경고 수집)"""
+
+    def __init__(self):
+        self.errors: List[str] = []
+        self.warnings: List[str] = []
+        self.document_count = 0
+
+    @property
+    def error_count(self) -> int:
+        return len(self.errors)
+
+    @property
+    def warning_count(self) -> int:
+        return len(self.warnings)
+
+
+def _read_source_info(folder: Path) -> Dict[str, str]:
+    """폴더의 TXT 파일에서 출처 정보 로드"""
+    source_info = {}
+    for txt in sorted(folder.glob("*.txt")):
+        with open(txt, encoding="utf-8") as f:
+            for line in f.read().strip().split('\n'):
+                if line.startswith('[경로]'):
+                    source_info['source'] = line[4:].strip()
+                elif line.startswith('[URL]'):
+                    source_info['url'] = line[5:].strip()
+    return source_info
+
+
+def _parse_json_file(json_path: str, source_info: Dict[str, str]) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """JSON 파일 하나를 정규화된 문서 목록으로 변환 (워커 프로세스에서 실행)
+
+    Returns:
+        (문서 dict 목록, 스키마 경고 목록)
+    """
+    json_file = Path(json_path)
+    with open(json_file, encoding="utf-8") as f:
+        data = json.load(f)
+
+    if not isinstance(data, dict):
+        raise ValueError("최상위 JSON이 객체가 아닙니다.")
+
+    region = data.get('지역', '')
+    docs = []
+    warnings = []
+
+    # 각 품목을 문서로 변환
+    for item_name, item_info in data.items():
+        if item_name == '지역':
+            continue
+        if not isinstance(item_info, dict):
+            warnings.append(f"{json_file.name}: '{item_name}' 항목이 객체가 아닙니다.")
+            continue
+
+        # 문서 내용 생성
+        content = f"지역: {region}\n품목: {item_name}"
+        fields = {}
+
+        unknown = [key for key in item_info if key not in ITEM_FIELDS]
+        if unknown:
+            warnings.append(f"{json_file.name}: '{item_name}'에 알 수 없는 키가 있습니다: {', '.join(unknown)}")
+
+        # 선택적 필드 추가 (있는 경우에만)
+        for field in ITEM_FIELDS:
+            value = item_info.get(field)
+            if value is None or value == "":
+                continue
+            if not isinstance(value, str):
+                warnings.append(f"{json_file.name}: '{item_name}'의 {field} 값이 문자열이 아닙니다.")
+                continue
+            content += f"\n{field}: {value}"
+            fields[field] = value
+
+        if not fields:
+            warnings.append(f"{json_file.name}: '{item_name}'에 {'/'.join(ITEM_FIELDS)} 중 어느 필드도 없습니다.")
+
+        # 메타데이터 구성
+        metadata = {
+            "품목": item_name,
+            "지역": region,
+            "파일명": json_file.name,
+            **fields
+        }
+
+        # 출처 정보 추가
+        if source_info:
+            metadata.update(source_info)
+
+        docs.append({"page_content": content, "metadata": metadata})
+
+    return docs, warnings
+
 
 class DocumentLoader:
     """JSON과 TXT 파일을 결합하여 Document 생성"""
-    
+
     @staticmethod
     def load_all_documents(directory: Path) -> List[Document]:
         """디렉토리의 모든 문서 로드"""
-        all_docs = []
-        
-        # 폴더별로 처리
-        for folder in set(f.parent for f in directory.glob("**/*.json")):
-            # TXT 파일에서 출처 정보 로드
-            source_info = {}
-            for txt in folder.glob("*.txt"):
-                with open(txt, encoding="utf-8") as f:
-                    content = f.read().strip()
-                    lines = content.split('\n')
-                    for line in lines:
-                        if line.startswith('[경로]'):
-                            source_info['source'] = line[4:].strip()
-                        elif line.startswith('[URL]'):
-                            source_info['url'] = line[5:].strip()
-            
-            # JSON 파일 처리
-            for json_file in folder.glob("*.json"):
+        return list(DocumentLoader.iter_documents(directory))
+
+    @staticmethod
+    def iter_documents(
+        directory: Path,
+        max_workers: Optional[int] = None,
+        use_snapshot: Optional[bool] = None,
+        report: Optional[LoadReport] = None
+    ) -> Iterator[Document]:
+        """
+        디렉토리의 문서를 스트림으로 생성
+
+        변경되지 않은 파일은 정규화 스냅샷에서 읽고, 나머지는 병렬로 파싱합니다.
+        파일 순서는 항상 경로 순으로 고정됩니다.
+
+        Args:
+            directory: 지역 데이터 디렉토리
+            max_workers: 파싱 프로세스 수 (기본값: Config에서 가져옴, 1이면 직렬)
+            use_snapshot: 스냅샷 사용 여부 (기본값: Config에서 가져옴)
+            report: 로드 실패/스키마 경고를 모을 LoadReport (스냅샷에서 읽은 파일의 경고도 포함)
+
+        Yields:
+            Document 객체
+        """
+        if max_workers is None:
+            max_workers = Config.LOADER_WORKERS
+        if use_snapshot is None:
+            use_snapshot = Config.LOADER_USE_SNAPSHOT
+
+        json_files = sorted(directory.glob("**/*.json"))
+
+        # 파일별 시그니처 (JSON mtime + 같은 폴더 TXT mtime)
+        source_infos: Dict[Path, Dict[str, str]] = {}
+        txt_mtimes: Dict[Path, List[int]] = {}
+        signatures: Dict[str, List[int]] = {}
+        for json_file in json_files:
+            folder = json_file.parent
+            if folder not in source_infos:
+                source_infos[folder] = _read_source_info(folder)
+                txt_mtimes[folder] = [t.stat().st_mtime_ns for t in sorted(folder.glob("*.txt"))]
+            rel = json_file.relative_to(directory).as_posix()
+            signatures[rel] = [json_file.stat().st_mtime_ns] + txt_mtimes[folder]
+
+        snapshot_path = DocumentLoader.get_snapshot_path(directory)
+        cached = DocumentLoader._read_snapshot(snapshot_path) if use_snapshot else {}
+
+        # 스냅샷에 없거나 바뀐 파일만 파싱 대상
+        stale = [
+            f for f in json_files
+            if cached.get(f.relative_to(directory).as_posix(), {}).get("signature")
+            != signatures[f.relative_to(directory).as_posix()]
+        ]
+        parsed = DocumentLoader._parse_files(stale, source_infos, max_workers)
+
+        new_entries: Dict[str, Dict[str, Any]] = {}
+        error_count = 0
+        complete = False
+        try:
+            for json_file in json_files:
+                rel = json_file.relative_to(directory).as_posix()
+                entry = cached.get(rel)
+                if entry is None or entry.get("signature") != signatures[rel]:
+                    docs, warnings, error = next(parsed)
+                    if error:
+                        # 실패한 파일은 스냅샷에 넣지 않으므로 다음 실행에서도 다시 보고됨
+                        print(f"파일 로드 실패 {json_file}: {error}")
+                        error_count += 1
+                        if report is not None:
+                            report.errors.append(f"{rel}: {error}")
+                        continue
+                    if report is None:
+                        for warning in warnings:
+                            print(f"스키마 경고: {warning}")
+                    entry = {"signature": signatures[rel], "documents": docs, "warnings": warnings}
+                new_entries[rel] = entry
+                if report is not None:
+                    report.warnings.extend(entry.get("warnings", []))
+                    report.document_count += len(entry["documents"])
+
+                for doc in entry["documents"]:
+                    yield Document(
+                        page_content=doc["page_content"],
+                        metadata=dict(doc["metadata"])
+                    )
+            complete = True
+        finally:
+            parsed.close()
+            # 끝까지 소비된 경우에만 스냅샷 갱신
+            if complete and use_snapshot and (stale or len(new_entries) != len(cached)):
+                DocumentLoader._write_snapshot(snapshot_path, new_entries)
+            if complete and error_count:
+                print(f"{error_count}개 파일 로드 실패")
+
+    @staticmethod
+    def get_snapshot_path(directory: Path) -> Path:
+        """디렉토리에 대응하는 스냅샷 파일 경로 반환"""
+        return Config.CORPUS_CACHE_DIR / f"{directory.name}.json"
+
+    @staticmethod
+    def _parse_files(
+        files: List[Path],
+        source_infos: Dict[Path, Dict[str, str]],
+        max_workers: int
+    ) -> Iterator[Tuple[List[Dict[str, Any]], List[str], Optional[str]]]:
+        """파일 목록을 순서대로 파싱 (max_workers > 1이면 프로세스 병렬)"""
+        if not files:
+            return
+
+        if max_workers <= 1 or len(files) == 1:
+            for json_file in files:
                 try:
-                    with open(json_file, encoding="utf-8") as f:
-                        data = json.load(f)
-                    
-                    region = data.get('지역', '')
-                    
-                    # 각 품목을 Document로 변환
-                    for item_name, item_info in data.items():
-                        if item_name == '지역' or not isinstance(item_info, dict):
-                            continue
-                        
-                        # 문서 내용 생성
-                        content = f"지역: {region}\n품목: {item_name}"
-                        
-                        # 선택적 필드 추가 (있는 경우에만)
-                        for field in ["배출방법", "배출요일", "세척여부", "주의사항"]:
-                            if field in item_info and item_info[field]:
-                                content += f"\n{field}: {item_info[field]}"
-                        
-                        # 메타데이터 구성
-                        metadata = {
-                            "품목": item_name,
-                            "지역": region,
-                            "파일명": json_file.name
-                        }
-                        
-                        # 출처 정보 추가
-                        if source_info:
-                            metadata.update(source_info)
-                        
-                        # Document 생성
-                        doc = Document(
-                            page_content=content,
-                            metadata=metadata
-                        )
-                        all_docs.append(doc)
-                        
+                    docs, warnings = _parse_json_file(str(json_file), source_infos[json_file.parent])
+                    yield docs, warnings, None
                 except Exception as e:
-                    print(f"Error loading {json_file}: {e}")
-        
-        return all_docs
+                    yield [], [], str(e)
+            return
+
+        with ProcessPoolExecutor(max_workers=min(max_workers, len(files))) as executor:
+            futures = [
+                executor.submit(_parse_json_file, str(f), source_infos[f.parent])
+                for f in files
+            ]
+            try:
+                for future in futures:
+                    try:
+                        docs, warnings = future.result()
+                        yield docs, warnings, None
+                    except Exception as e:
+                        yield [], [], str(e)
+            finally:
+                for future in futures:
+                    future.cancel()
+
+    @staticmethod
+    def _read_snapshot(snapshot_path: Path) -> Dict[str, Dict[str, Any]]:
+        """스냅샷 로드 (없거나 손상되면 빈 dict)"""
+        if not snapshot_path.exists():
+            return {}
+        try:
+            with open(snapshot_path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != SNAPSHOT_VERSION:
+                return {}
+            return data.get("files", {})
+        except Exception as e:
+            print(f"스냅샷 로드 실패: {e}")
+            return {}
+
+    @staticmethod
+    def _write_snapshot(snapshot_path: Path, entries: Dict[str, Dict[str, Any]]):
+        """스냅샷 저장 (임시 파일에 쓴 뒤 교체)"""
+        try:
+            snapshot_path.parent.mkdir(exist_ok=True, parents=True)
+            tmp_path = snapshot_path.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(
+                    {"version": SNAPSHOT_VERSION, "files": entries},
+                    f,
+                    ensure_ascii=False,
+                    separators=(",", ":")
+                )
+            os.replace(tmp_path, snapshot_path)
+        except Exception as e:
+            print(f"스냅샷 저장 실패: {e}")
@@ -0,0 +1,153 @@
+"""
+질의 임베딩 마이크로 배치 모듈
+짧은 시간 안에 들어온 embed_query 요청을 모아 배치 요청 1회로 보내고 결과를 나눠 전달
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from .exceptions import APIError
+from .metrics import Histogram, LatencyWindow
+
+
+# 배치 크기 / 추가 대기 시간(ms) 히스토그램 구간
+BATCH_SIZE_BOUNDS = [1, 2, 4, 8, 16, 32]
+ADDED_WAIT_BOUNDS_MS = [1, 2, 5, 10, 20, 50]
+
+
+class MicroBatcher:
+    """질의 임베딩 마이크로 배처 (샤드 검색 요청처럼 해시 가능한 다른 요청에도 사용)
+
+    - 첫 요청이 들어온 뒤 max_wait가 지나거나 max_batch개가 모이면 한 번에 전송
+    - 같은 요청이 대기/실행 중이면 새로 넣지 않고 결과를 공유
+    - 전송 함수는 Future를 반환하므로 배처 스레드는 응답을 기다리지 않고 다음 배치를 모음
+    """
+
+    def __init__(
+        self,
+        send: Callable[[List[Hashable]], Future],
+        max_batch: int,
+        max_wait: float,
+        name: str = "embedding-batcher"
+    ):
+        """
+        Args:
+            send: 요청 목록을 받아 같은 순서의 결과 목록 Future를 반환하는 함수
+            max_batch: 배치 최대 크기
+            max_wait: 첫 요청 이후 최대 대기 시간 (초)
+            name: 배처 스레드 이름
+        """
+        self.send = send
+        self.name = name
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+
+        self.batch_sizes = Histogram(BATCH_SIZE_BOUNDS)
+        self.added_wait = Histogram(ADDED_WAIT_BOUNDS_MS)
+        self.added_wait_window = LatencyWindow()
+        self.counters = {"queries": 0, "coalesced": 0, "batches": 0}
+        self._init_state()
+
+    def _init_state(self):
+        self._pid = os.getpid()
+        self._cond = threading.Condition()
+        self._queue: List[Tuple[Hashable, float]] = []
+        self._futures: Dict[Hashable, Future] = {}
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, key: Hashable) -> Future:
+        """요청 등록 후 결과 Future 반환"""
+        # fork된 자식에는 배처 스레드가 없으므로 상태를 새로 만듦
+        if self._pid != os.getpid():
+            self._init_state()
+
+        with self._cond:
+            self.counters["queries"] += 1
+            future = self._futures.get(key)
+            if future is not None:
+                self.counters["coalesced"] += 1
+                return future
+
+            future = self._futures[key] = Future()
+            self._queue.append((key, time.monotonic()))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+            self._cond.notify()
+        return future
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._queue:
+                    self._cond.wait()
+
+                # 첫 요청 기준으로 max_wait까지 또는 배치가 찰 때까지 모음
+                flush_at = self._queue[0][1] + self.max_wait
+                while len(self._queue) < self.max_batch:
+                    remaining = flush_at - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+
+                batch = self._queue[:self.max_batch]
+                del self._queue[:self.max_batch]
+                futures = [self._futures[key] for key, _ in batch]
+                self.counters["batches"] += 1
+
+            now = time.monotonic()
+            self.batch_sizes.record(len(batch))
+            for _, enqueued_at in batch:
+                self.added_wait.record((now - enqueued_at) * 1000)
+                self.added_wait_window.record(now - enqueued_at)
+
+            keys = [key for key, _ in batch]
+            try:
+                upstream = self.send(keys)
+            except Exception as e:
+                self._resolve(keys, futures, None, e)
+                continue
+            upstream.add_done_callback(
+                lambda f, k=keys, fs=futures: self._resolve(k, fs, *self._outcome(f))
+            )
+
+    @staticmethod
+    def _outcome(upstream: Future) -> Tuple[Any, Optional[BaseException]]:
+        error = upstream.exception()
+        return (None, error) if error is not None else (upstream.result(), None)
+
+    def _resolve(self, keys: List[Hashable], futures: List[Future], results: Any, error: Optional[BaseException]):
+        """대기 중인 호출자에게 결과 전달 (병합 대상에서 먼저 제거)
+
+        결과 수가 요청 수와 다르면 어느 결과가 누구 것인지 알 수 없으므로 모두 실패 처리
+        """
+        if error is None:
+            try:
+                count = len(results)
+            except TypeError:
+                count = None
+            if count != len(futures):
+                error = APIError(f"배치 결과 수가 요청 수와 다릅니다. (요청 {len(futures)}개, 결과 {count}개)")
+        with self._cond:
+            for key, future in zip(keys, futures):
+                if self._futures.get(key) is future:
+                    del self._futures[key]
+        for i, future in enumerate(futures):
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(results[i])
+
+    def metrics(self) -> Dict[str, Any]:
+        """배치 크기 / 추가 대기 시간 히스토그램과 요청 절감 통계"""
+        with self._cond:
+            counters = dict(self.counters)
+        return {
+            **counters,
+            "batch_size": self.batch_sizes.summary(),
+            "added_wait_ms": self.added_wait.summary(),
+            "added_wait": self.added_wait_window.summary()
+        }
@@ -0,0 +1,111 @@
+"""
+임베딩 저널 모듈
+인덱스 빌드 중 완료된 임베딩 배치를 디스크에 기록해 중단된 빌드를 이어서 진행
+"""
+
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+
+# 커밋 로그 파일명 (한 줄에 배치 하나)
+LOG_FILE = "log.jsonl"
+
+
+class EmbeddingJournal:
+    """배치 단위 임베딩 저널
+
+    - 배치마다 벡터 파일(batch_000001.npy)을 먼저 fsync로 기록하고
+      그다음 커밋 로그에 문서 해시와 함께 한 줄을 추가
+    - 로그에 기록된 배치만 커밋된 것으로 보므로, 쓰다가 중단된 배치는 다시 임베딩됨
+    - 재개 시에는 문서 해시로 벡터를 찾으므로 배치 크기나 문서 순서가 바뀌어도 재사용 가능
+    """
+
+    def __init__(self, directory: Path):
+        """
+        Args:
+            directory: 저널 디렉토리 (지역 인덱스 디렉토리 아래 journal/)
+        """
+        self.directory = directory
+        self.batch_count = 0
+
+    @property
+    def log_path(self) -> Path:
+        return self.directory / LOG_FILE
+
+    def exists(self) -> bool:
+        """중단된 빌드가 남긴 저널이 있는지 여부"""
+        return self.log_path.exists()
+
+    def reset(self):
+        """기존 저널을 지우고 새로 시작"""
+        self.clear()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.batch_count = 0
+
+    def clear(self):
+        """저널 삭제 (인덱스 저장이 끝난 뒤 호출)"""
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def load(self) -> Dict[str, List[float]]:
+        """
+        커밋된 배치의 벡터 로드
+
+        Returns:
+            문서 해시 -> 임베딩 벡터
+        """
+        vectors: Dict[str, List[float]] = {}
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.batch_count = 0
+        if not self.log_path.exists():
+            return vectors
+
+        valid_size = 0
+        with open(self.log_path, "rb") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    batch = np.load(self.directory / entry["file"])
+                except (ValueError, KeyError, OSError):
+                    # 기록 도중 중단된 마지막 줄 또는 유실된 벡터 파일
+                    break
+                if not line.endswith(b"\n") or len(batch) != len(entry["hashes"]):
+                    break
+                for doc_hash, vector in zip(entry["hashes"], batch):
+                    vectors[doc_hash] = vector.tolist()
+                self.batch_count = entry["batch"]
+                valid_size += len(line)
+
+        # 깨진 꼬리는 잘라내 이후 추가되는 배치가 유효한 줄 뒤에 이어지도록 함
+        if self.log_path.stat().st_size != valid_size:
+            with open(self.log_path, "r+b") as f:
+                f.truncate(valid_size)
+        return vectors
+
+    def append(self, hashes: List[str], vectors: List[List[float]]):
+        """
+        임베딩 배치 커밋
+
+        Args:
+            hashes: 문서 해시 목록
+            vectors: 해시와 같은 순서의 임베딩 벡터
+        """
+        self.batch_count += 1
+        file_name = f"batch_{self.batch_count:06d}.npy"
+        tmp_path = self.directory / f".{file_name}.tmp"
+
+        with open(tmp_path, "wb") as f:
+            np.save(f, np.asarray(vectors, dtype=np.float32))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.directory / file_name)
+
+        entry = {"batch": self.batch_count, "file": file_name, "hashes": hashes}
+        with open(self.log_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
@@ -26,3 +26,18 @@ class DocumentNotFoundError(ChatbotException):
 class APIError(ChatbotException):
     """API 호출 관련 예외"""
     pass
+
+
+class LLMTimeoutError(APIError):
+    """LLM 응답이 데드라인을 넘겼을 때 발생하는 예외"""
+    pass
+
+
+class CircuitOpenError(APIError):
+    """서킷 브레이커가 열려 LLM 호출이 차단되었을 때 발생하는 예외"""
+    pass
+
+
+class ShardUnavailableError(VectorStoreError):
+    """지역을 담당하는 샤드 노드(복제본 포함)에 모두 연결할 수 없을 때 발생하는 예외"""
+    pass
@@ -0,0 +1,42 @@
+"""
+경량 직접 실행기
+parse -> recycling/casual 고정 파이프라인을 LangGraph 없이 같은 노드 로직으로 실행
+(상태 리듀서, 체크포인트 저장, @tool 래퍼 검증을 생략)
+"""
+
+from typing import Any, Dict, Optional
+
+from .nodes import (
+    call_tool_directly,
+    run_parse_context,
+    run_handle_recycling,
+    run_handle_casual,
+    should_handle_recycling
+)
+
+
+class DirectExecutor:
+    """recycling_graph와 같은 invoke 인터페이스를 제공하는 직접 실행기
+
+    그래프의 모든 상태 키는 덮어쓰기 채널이고 매 턴 모든 노드 출력 키가 다시 쓰이므로,
+    입력 상태에 노드 출력을 순서대로 병합하면 그래프 실행 결과와 같아집니다.
+    """
+
+    def __init__(self):
+        self._handlers = {
+            "recycling": run_handle_recycling,
+            "casual": run_handle_casual
+        }
+
+    def invoke(self, state: Dict[str, Any], config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """한 턴 실행 (config는 그래프 인터페이스 호환용으로만 받음)"""
+        result = dict(state)
+        result.update(run_parse_context(result, call_tool_directly))
+
+        route = should_handle_recycling(result)
+        result.update(self._handlers[route](result, call_tool_directly))
+        return result
+
+
+# 실행기 인스턴스
+direct_executor = DirectExecutor()
@@ -0,0 +1,79 @@
+"""
+추출형 답변 모듈
+LLM 호출 없이 문서의 품목 필드로 버링이 말투 답변 구성
+"""
+
+from typing import Any, Dict, List
+
+from langchain_core.documents import Document
+
+from .document_loader import ITEM_FIELDS
+from .prompts import (
+    EXTRACTIVE_ITEM_TEMPLATE,
+    EXTRACTIVE_FIELD_TEMPLATES,
+    EXTRACTIVE_CLOSING
+)
+
+
+def _normalize(text: str) -> str:
+    return "".join(text.split())
+
+
+def get_item_fields(doc: Document) -> Dict[str, str]:
+    """문서에서 품목 필드 추출 (메타데이터 우선, 구버전 인덱스는 본문 파싱)"""
+    fields = {f: doc.metadata[f] for f in ITEM_FIELDS if doc.metadata.get(f)}
+    if fields:
+        return fields
+    for line in doc.page_content.split("\n"):
+        key, sep, value = line.partition(":")
+        if sep and key in ITEM_FIELDS and value.strip():
+            fields[key] = value.strip()
+    return fields
+
+
+def match_items(user_input: str, docs: List[Document]) -> List[Document]:
+    """품목명이 질문에 그대로 포함된 문서만 반환 (추출형 답변 신뢰 조건)"""
+    query = _normalize(user_input)
+    matched = []
+    seen = set()
+    for doc in docs:
+        item = _normalize(doc.metadata.get("품목", ""))
+        # 한 글자 품목명("병", "캔")은 오탐이 많아 제외
+        if len(item) < 2 or item not in query or doc.page_content in seen:
+            continue
+        seen.add(doc.page_content)
+        matched.append(doc)
+    return matched
+
+
+def render_extractive_answer(docs: List[Document]) -> str:
+    """품목별 필드와 출처를 템플릿으로 렌더링"""
+    parts: List[str] = []
+    sources: List[Any] = []
+    seen = set()
+    for doc in docs:
+        if doc.page_content in seen:
+            continue
+        seen.add(doc.page_content)
+        
+        lines = [EXTRACTIVE_ITEM_TEMPLATE.format(item=doc.metadata.get("품목", "해당 품목"))]
+        for field, value in get_item_fields(doc).items():
+            lines.append(EXTRACTIVE_FIELD_TEMPLATES[field].format(value=value))
+        parts.append("\n".join(lines))
+        
+        source_key = (doc.metadata.get("source"), doc.metadata.get("url"))
+        if any(source_key) and source_key not in sources:
+            sources.append(source_key)
+    
+    parts.append(EXTRACTIVE_CLOSING)
+    
+    citation = []
+    for source, url in sources:
+        if source:
+            citation.append(f"[출처] {source}")
+        if url:
+            citation.append(f"[URL] {url}")
+    if citation:
+        parts.append("\n".join(citation))
+    
+    return "\n\n".join(parts)
@@ -0,0 +1,66 @@
+"""
+오프라인 테스트용 가짜 임베딩
+문자 n-gram 해싱으로 결정적인 벡터를 만들어 어휘가 겹치는 문서끼리 가깝게 배치
+"""
+
+import hashlib
+import math
+import threading
+import time
+import random
+from typing import List, Optional
+
+from langchain_core.embeddings import Embeddings
+
+
+class FakeEmbeddings(Embeddings):
+    """지연을 주입할 수 있는 결정적 해싱 임베딩"""
+    
+    def __init__(
+        self,
+        dim: int = 256,
+        latency_ms: float = 0.0,
+        latency_sigma: float = 0.3,
+        seed: Optional[int] = None
+    ):
+        """
+        Args:
+            dim: 벡터 차원
+            latency_ms: 요청당 지연 시간 중앙값 (로그정규분포)
+            latency_sigma: 로그정규분포 표준편차
+            seed: 난수 시드
+        """
+        self.dim = dim
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.request_count = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+    
+    def _sleep(self):
+        with self._lock:
+            self.request_count += 1
+            delay = self._random.lognormvariate(0, self.latency_sigma) * self.latency_ms / 1000
+        if delay > 0:
+            time.sleep(delay)
+    
+    def _embed(self, text: str) -> List[float]:
+        vector = [0.0] * self.dim
+        body = "".join(text.split())
+        grams = [body[i:i + 2] for i in range(max(1, len(body) - 1))]
+        for gram in grams:
+            digest = hashlib.md5(gram.encode("utf-8")).digest()
+            index = int.from_bytes(digest[:4], "little") % self.dim
+            vector[index] += 1.0 if digest[4] & 1 else -1.0
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+    
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """배치 임베딩 (요청 1회로 계산)"""
+        self._sleep()
+        return [self._embed(text) for text in texts]
+    
+    def embed_query(self, text: str) -> List[float]:
+        """단일 질의 임베딩"""
+        self._sleep()
+        return self._embed(text)
@@ -0,0 +1,123 @@
+"""
+오프라인 테스트용 가짜 LLM
+지연 시간과 오류를 주입할 수 있는 ChatGoogleGenerativeAI 대체품
+"""
+
+import json
+import random
+import re
+import threading
+import time
+from typing import Any, List, Optional
+
+from langchain_core.messages import AIMessage, BaseMessage
+
+from .config import Config
+
+
+def _message_text(message: Any) -> str:
+    """BaseMessage 또는 (role, content) 튜플에서 본문 추출"""
+    if isinstance(message, BaseMessage):
+        return str(message.content)
+    if isinstance(message, tuple) and len(message) == 2:
+        return str(message[1])
+    return str(message)
+
+
+class FakeLLM:
+    """지연/오류를 주입하는 가짜 채팅 모델
+
+    프롬프트 종류(의도 분석, 재활용 답변, 일상 대화)를 구분해 그럴듯한 응답을 돌려줍니다.
+    """
+    
+    RECYCLING_KEYWORDS = ["버리", "배출", "분리", "재활용", "수거", "쓰레기", "어떻게"]
+    
+    def __init__(
+        self,
+        latency_ms: float = 300.0,
+        latency_sigma: float = 0.5,
+        error_rate: float = 0.0,
+        hang_rate: float = 0.0,
+        hang_seconds: float = 30.0,
+        cpu_ms: float = 0.0,
+        seed: Optional[int] = None
+    ):
+        """
+        Args:
+            latency_ms: 지연 시간 중앙값 (로그정규분포)
+            latency_sigma: 로그정규분포 표준편차 (클수록 꼬리가 김)
+            error_rate: 예외를 던질 확률
+            hang_rate: 매우 오래(hang_seconds) 응답하지 않을 확률
+            hang_seconds: 응답하지 않는 시간 (초)
+            cpu_ms: 응답마다 수행할 CPU 작업 시간 (응답 파싱 등 GIL을 잡는 작업 모사)
+            seed: 난수 시드
+        """
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.hang_rate = hang_rate
+        self.hang_seconds = hang_seconds
+        self.cpu_ms = cpu_ms
+        self.call_count = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+    
+    def invoke(self, messages: List[Any], **kwargs) -> AIMessage:
+        """가짜 응답 생성"""
+        with self._lock:
+            self.call_count += 1
+            roll = self._random.random()
+            delay = self._random.lognormvariate(0, self.latency_sigma) * self.latency_ms / 1000
+        
+        if roll < self.hang_rate:
+            time.sleep(self.hang_seconds)
+        else:
+            time.sleep(delay)
+        
+        if self.hang_rate <= roll < self.hang_rate + self.error_rate:
+            raise RuntimeError("FakeLLM 주입 오류: 503 Service Unavailable")
+        
+        if self.cpu_ms > 0:
+            end = time.thread_time() + self.cpu_ms / 1000
+            while time.thread_time() < end:
+                pass
+        
+        texts = [_message_text(m) for m in messages]
+        system = texts[0] if texts else ""
+        human = texts[-1] if texts else ""
+        
+        if "의도 분석기" in system:
+            return AIMessage(content=self._intent(human))
+        if "재활용 정보:" in human:
+            return AIMessage(content=self._answer(human))
+        return AIMessage(content="안녕하세요! 분리왕들의 든든한 조력자, 버링이에요. 궁금한 쓰레기가 있다면 편하게 물어봐주세요!")
+    
+    def _intent(self, human: str) -> str:
+        match = re.search(r"현재 입력: '(.*)'", human, re.S)
+        user_input = match.group(1) if match else human
+        region = next((r for r in Config.get_supported_regions() if r in user_input), None)
+        is_recycling = region is not None or any(k in user_input for k in self.RECYCLING_KEYWORDS)
+        # 지역만 입력하거나 "~은요?"로 이어 묻는 후속 질문은 직전 맥락이 있으면 재활용으로 판단
+        if region and user_input.strip() == region:
+            is_recycling = "최근 대화" in human
+        elif re.search(r"[은는]요\??$", user_input.strip()) and "최근 대화" in human:
+            is_recycling = True
+        return json.dumps({"is_recycling": is_recycling, "region": region}, ensure_ascii=False)
+    
+    def _answer(self, human: str) -> str:
+        # 컨텍스트의 품목마다 한 줄씩 (여러 품목 질문은 품목별로 나눠 답하라는 지시를 흉내냄)
+        lines = human.split("\n")
+        answers = {}
+        item = None
+        for line in lines:
+            key, _, value = line.partition(":")
+            if key == "품목":
+                item = value.strip()
+            elif key == "배출방법" and item and item not in answers:
+                answers[item] = value.strip()
+        if not answers:
+            answers["해당 품목"] = "지역 기준에 따라 배출해주시면 돼요."
+        source = next((l.split(":", 1)[1].strip() for l in lines if l.startswith("출처:")), "")
+        url = next((l.split(":", 1)[1].strip() for l in lines if l.startswith("URL:")), "")
+        body = "\n".join(f"'{item}'은(는) 이렇게 버려주시면 돼요! {method}" for item, method in answers.items())
+        return f"{body}\n[출처] {source}\n[URL] {url}"
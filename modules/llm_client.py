@@ -0,0 +1,243 @@
+"""
+장애 내성 LLM 호출 계층
+용도별 데드라인, 헤지 요청, 서킷 브레이커
+"""
+
+import threading
+import time
+import weakref
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from typing import Any, Dict, Hashable, List, Optional
+
+from .config import Config
+from .exceptions import APIError, CircuitOpenError, LLMTimeoutError
+from .metrics import LatencyWindow
+from .scheduler import get_scheduler
+
+
+def _coalesce_key(purpose: str, messages: List[Any]) -> Hashable:
+    """같은 프롬프트의 동시 요청을 하나로 합치기 위한 키"""
+    parts = []
+    for message in messages:
+        if isinstance(message, tuple):
+            parts.append((str(message[0]), str(message[1])))
+        else:
+            parts.append((message.type, str(message.content)))
+    return (purpose, tuple(parts))
+
+
+class CircuitBreaker:
+    """연속 실패 시 호출을 차단하고, 일정 시간 후 한 번의 시험 호출로 복구 여부 확인"""
+    
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._probe_started = 0.0
+        self._lock = threading.Lock()
+    
+    def allow(self) -> bool:
+        """호출 허용 여부 (half-open 상태에서는 시험 호출 하나만 허용)"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    return False
+                self.state = self.HALF_OPEN
+                self._probe_in_flight = False
+            # 시험 호출 결과가 반영되지 않은 채 오래 지나면 (이미 반영된 요청에 병합된 경우 등) 다시 시험
+            if self._probe_in_flight and time.monotonic() - self._probe_started < self.reset_timeout:
+                return False
+            self._probe_in_flight = True
+            self._probe_started = time.monotonic()
+            return True
+    
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+    
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+
+class ResilientLLM:
+    """데드라인/헤지/서킷 브레이커를 적용한 LLM 호출 래퍼"""
+    
+    def __init__(
+        self,
+        purpose: str,
+        client: Any,
+        deadline: float,
+        hedge: bool = False,
+        breaker: Optional[CircuitBreaker] = None
+    ):
+        """
+        Args:
+            purpose: 호출 용도 (intent, recycling, casual)
+            client: invoke(messages)를 제공하는 LLM 클라이언트
+            deadline: 호출 전체 제한 시간 (초)
+            hedge: p95 지연 이후 중복 요청을 보낼지 여부
+            breaker: 서킷 브레이커 (기본값: Config 기준으로 생성)
+        """
+        self.purpose = purpose
+        self.client = client
+        self.deadline = deadline
+        self.hedge = hedge
+        self.breaker = breaker or CircuitBreaker(
+            Config.LLM_BREAKER_FAILURE_THRESHOLD,
+            Config.LLM_BREAKER_RESET_TIMEOUT
+        )
+        self.latencies = LatencyWindow()
+        self.counters = {"calls": 0, "timeouts": 0, "errors": 0, "hedges": 0, "rejected": 0}
+        self._lock = threading.Lock()
+        # 업스트림 요청(Future) -> 브레이커에 결과를 반영했는지 여부
+        # 병합된 호출자들은 같은 Future를 받으므로, 요청 하나의 결과는 한 번만 반영됨
+        self._attempts: "weakref.WeakKeyDictionary[Future, bool]" = weakref.WeakKeyDictionary()
+    
+    def _count(self, key: str):
+        with self._lock:
+            self.counters[key] += 1
+    
+    def _track(self, future: Future) -> Future:
+        """업스트림 요청 등록 (처음 본 Future만 완료 시 브레이커에 반영)"""
+        with self._lock:
+            if future in self._attempts:
+                return future
+            self._attempts[future] = False
+        future.add_done_callback(self._settle)
+        return future
+    
+    def _settle(self, future: Future, timed_out: bool = False):
+        """업스트림 요청 결과를 브레이커에 한 번만 반영 (데드라인까지 응답이 없으면 실패로 처리)"""
+        with self._lock:
+            if self._attempts.get(future, True):
+                return
+            self._attempts[future] = True
+        if not timed_out and not future.cancelled() and future.exception() is None:
+            self.breaker.record_success()
+        else:
+            self.breaker.record_failure()
+    
+    def hedge_delay(self) -> float:
+        """헤지 요청을 보낼 시점 (표본이 충분하면 최근 p95)"""
+        if len(self.latencies) < Config.LLM_HEDGE_MIN_SAMPLES:
+            return Config.LLM_HEDGE_DEFAULT_DELAY
+        return self.latencies.percentile(95)
+    
+    def invoke(self, messages: List[Any]) -> Any:
+        """
+        LLM 호출
+        
+        Raises:
+            CircuitOpenError: 서킷이 열려 호출이 차단된 경우
+            LLMTimeoutError: 데드라인 안에 응답이 없는 경우
+            APIError: 모든 요청이 실패한 경우
+        """
+        if not self.breaker.allow():
+            self._count("rejected")
+            raise CircuitOpenError(f"{self.purpose} LLM 호출이 일시 차단되었습니다.")
+        
+        self._count("calls")
+        start = time.monotonic()
+        deadline_at = start + self.deadline
+        hedge_at = start + self.hedge_delay() if self.hedge else None
+        # 전역 스케줄러 경유 (우선순위 = 용도, 동일 프롬프트는 병합)
+        scheduler = get_scheduler()
+        futures = [self._track(scheduler.submit(
+            self.client.invoke, messages,
+            priority=self.purpose,
+            key=_coalesce_key(self.purpose, messages),
+            deadline=deadline_at
+        ))]
+        last_error = None
+        
+        while futures:
+            now = time.monotonic()
+            if now >= deadline_at:
+                break
+            wait_until = deadline_at if hedge_at is None else min(deadline_at, hedge_at)
+            done, _ = wait(futures, timeout=max(0.0, wait_until - now), return_when=FIRST_COMPLETED)
+            
+            for future in done:
+                futures.remove(future)
+                # 완료 콜백보다 먼저 깨어날 수 있으므로 여기서도 반영 (중복 반영은 무시됨)
+                self._settle(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    last_error = e
+                    continue
+                self.latencies.record(time.monotonic() - start)
+                return result
+            
+            # 응답이 p95보다 늦으면 같은 요청을 한 번 더 보냄
+            if futures and hedge_at is not None and time.monotonic() >= hedge_at:
+                hedge_at = None
+                self._count("hedges")
+                # 헤지 요청은 병합하면 의미가 없으므로 키 없이 보냄
+                futures.append(self._track(scheduler.submit(
+                    self.client.invoke, messages,
+                    priority=self.purpose,
+                    deadline=deadline_at
+                )))
+        
+        # 데드라인까지 응답이 없는 요청은 실패로 반영 (나중에 도착한 결과는 무시)
+        for future in futures:
+            self._settle(future, timed_out=True)
+        if futures:
+            self._count("timeouts")
+            raise LLMTimeoutError(f"{self.purpose} LLM 응답이 {self.deadline:.1f}초 안에 오지 않았습니다.")
+        self._count("errors")
+        raise APIError(f"{self.purpose} LLM 호출 실패: {last_error}")
+    
+    def stats(self) -> Dict[str, Any]:
+        """호출 통계"""
+        return {
+            **self.counters,
+            "breaker": self.breaker.state,
+            "latency": self.latencies.summary()
+        }
+
+
+# 용도별 인스턴스 캐시
+_resilient_llms: Dict[str, ResilientLLM] = {}
+_resilient_lock = threading.Lock()
+
+
+def get_resilient_llm(purpose: str) -> ResilientLLM:
+    """용도별 ResilientLLM 반환 (싱글톤)
+    - intent: 의도 분석 (재활용용 클라이언트 사용)
+    - recycling: 재활용 답변
+    - casual: 일상 대화
+    - batch: 오프라인 일괄 생성 (build_answers.py, 재활용용 클라이언트, 스케줄러 batch 우선순위, 별도 브레이커)
+    """
+    with _resilient_lock:
+        if purpose not in _resilient_llms:
+            client = Config.get_llm("casual" if purpose == "casual" else "recycling")
+            _resilient_llms[purpose] = ResilientLLM(
+                purpose,
+                client,
+                deadline=Config.LLM_DEADLINES.get(purpose, Config.LLM_DEADLINES["recycling"]),
+                hedge=Config.LLM_HEDGE_ENABLED
+            )
+        return _resilient_llms[purpose]
+
+
+def get_llm_stats() -> Dict[str, Dict[str, Any]]:
+    """용도별 호출 통계"""
+    return {purpose: llm.stats() for purpose, llm in _resilient_llms.items()}
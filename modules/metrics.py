@@ -0,0 +1,74 @@
+"""
+경량 지표 수집 모듈
+최근 지연 시간 분포(백분위수)와 고정 구간 히스토그램 추적
+"""
+
+import math
+import threading
+from collections import deque
+from typing import Dict, Iterable, List
+
+
+def percentile(values: Iterable[float], p: float) -> float:
+    """정렬 후 최근접 순위 방식 백분위수 (값이 없으면 0.0)"""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    rank = max(0, min(len(ordered) - 1, math.ceil(p / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+class LatencyWindow:
+    """최근 N개 지연 시간을 보관하는 슬라이딩 윈도우 (스레드 안전)"""
+    
+    def __init__(self, maxlen: int = 200):
+        self._values = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+    
+    def record(self, seconds: float):
+        with self._lock:
+            self._values.append(seconds)
+    
+    def __len__(self) -> int:
+        return len(self._values)
+    
+    def snapshot(self) -> List[float]:
+        with self._lock:
+            return list(self._values)
+    
+    def percentile(self, p: float) -> float:
+        return percentile(self.snapshot(), p)
+    
+    def summary(self) -> Dict[str, float]:
+        values = self.snapshot()
+        return {
+            "count": len(values),
+            "p50": percentile(values, 50),
+            "p95": percentile(values, 95),
+            "p99": percentile(values, 99)
+        }
+
+
+class Histogram:
+    """고정 구간 히스토그램 (스레드 안전)"""
+    
+    def __init__(self, bounds: List[float]):
+        """
+        Args:
+            bounds: 구간 상한 목록 (오름차순, 마지막 구간은 상한 없음)
+        """
+        self.bounds = list(bounds)
+        self._counts = [0] * (len(self.bounds) + 1)
+        self._lock = threading.Lock()
+    
+    def record(self, value: float):
+        index = next((i for i, bound in enumerate(self.bounds) if value <= bound), len(self.bounds))
+        with self._lock:
+            self._counts[index] += 1
+    
+    def summary(self) -> Dict[str, int]:
+        """구간 라벨 -> 건수 ("<=5", ">20" 형식)"""
+        with self._lock:
+            counts = list(self._counts)
+        labels = [f"<={bound:g}" for bound in self.bounds] + [f">{self.bounds[-1]:g}"]
+        return dict(zip(labels, counts))
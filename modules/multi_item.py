@@ -0,0 +1,203 @@
+"""
+여러 품목 질문 분할 모듈
+인덱스 매니페스트의 품목명으로 질문 속 품목 언급을 찾아 품목별로 동시에 검색하고 결과를 합침
+(예: "페트병이랑 스티로폼, 건전지 어떻게 버려요?" -> 페트병 / 스티로폼 / 건전지)
+"""
+
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Set
+
+from langchain_core.documents import Document
+
+from .config import Config
+from .vector_store import VectorStoreManager
+
+
+# 품목명을 나누는 구분자와 괄호 안 내용
+_SPLIT_PATTERN = re.compile(r"[,·/]")
+_PAREN_PATTERN = re.compile(r"\(([^)]*)\)")
+_ETC_PATTERN = re.compile(r"\s+등$")
+
+
+def item_keys(item: str) -> Set[str]:
+    """
+    품목명 하나에서 질문과 비교할 조회 키 생성 (공백 제거)
+
+    - 전체 이름, 쉼표/가운뎃점으로 나눈 부분, 괄호 안 부분
+    - 각 부분의 ' 등', '류' 접미사와 '폐' 접두사를 뗀 형태 (폐건전지 -> 건전지, 스티로폼류 -> 스티로폼)
+    - 한 글자 키("병", "캔")는 오탐이 많아 제외
+    """
+    parts = [item, _PAREN_PATTERN.sub("", item)]
+    for inner in _PAREN_PATTERN.findall(item):
+        parts.extend(_SPLIT_PATTERN.split(inner))
+    for part in list(parts):
+        parts.extend(_SPLIT_PATTERN.split(_PAREN_PATTERN.sub("", part)))
+    return _part_keys(parts)
+
+
+def name_keys(item: str) -> Set[str]:
+    """
+    괄호 밖 품목명으로만 만든 조회 키 (item_keys의 부분집합)
+
+    "체온계(건전지, 디지털)"의 건전지처럼 괄호 안에서만 나오는 키는 제외
+    """
+    name = _PAREN_PATTERN.sub("", item)
+    return _part_keys([name, *_SPLIT_PATTERN.split(name)])
+
+
+def _part_keys(parts: List[str]) -> Set[str]:
+    keys = set()
+    for part in parts:
+        key = "".join(_ETC_PATTERN.sub("", part.strip()).split())
+        variants = {key, key[:-1] if key.endswith("류") else key}
+        variants |= {v[1:] for v in variants if v.startswith("폐")}
+        keys |= {v for v in variants if len(v) >= 2}
+    return keys
+
+
+def match_rank(mention: str, item: str) -> int:
+    """언급과 품목명의 일치 순위 (0: 괄호 밖 이름 일치, 1: 괄호 안 키만 일치, 2: 불일치)"""
+    if mention in name_keys(item):
+        return 0
+    if mention in item_keys(item):
+        return 1
+    return 2
+
+
+class ItemVocabulary:
+    """지역별 품목 조회 키 (현재 인덱스 매니페스트 기준, 지역별 캐시)"""
+
+    def __init__(self):
+        self._cache: Dict[str, Optional[Dict[str, List[str]]]] = {}
+        self._lock = threading.Lock()
+
+    def get_keys(self, region_name: str) -> Optional[Dict[str, List[str]]]:
+        """지역 품목 조회 키 -> 괄호 밖 이름이 그 키와 일치하는 품목명 목록 (매니페스트가 없으면 None)"""
+        with self._lock:
+            if region_name in self._cache:
+                return self._cache[region_name]
+
+        manifest = VectorStoreManager.load_manifest(region_name)
+        keys = None
+        if manifest:
+            keys = {}
+            for item in sorted(manifest["items"], key=len):
+                for key in item_keys(item):
+                    keys.setdefault(key, [])
+                for key in name_keys(item):
+                    keys[key].append(item)
+
+        with self._lock:
+            self._cache[region_name] = keys
+        return keys
+
+    def invalidate(self, region_name: Optional[str] = None):
+        """캐시 무효화 (인덱스가 바뀌었을 때)"""
+        with self._lock:
+            if region_name is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(region_name, None)
+
+    def search_query(self, region_name: str, mention: str) -> str:
+        """품목별 검색 질의 (이름이 일치하는 품목 중 가장 짧은 품목명, 없으면 언급 그대로: 건전지 -> 폐건전지)"""
+        names = (self.get_keys(region_name) or {}).get(mention)
+        return names[0] if names else mention
+
+    def find_mentions(self, region_name: str, text: str) -> List[str]:
+        """
+        질문에서 품목 언급 찾기 (왼쪽부터 가장 긴 키, 겹치지 않게)
+
+        Returns:
+            언급 순서대로 중복 없는 조회 키 목록
+        """
+        keys = self.get_keys(region_name)
+        if not keys:
+            return []
+
+        body = "".join(text.split())
+        lengths = sorted({len(key) for key in keys}, reverse=True)
+        mentions: List[str] = []
+        i = 0
+        while i < len(body):
+            match = next(
+                (body[i:i + n] for n in lengths if i + n <= len(body) and body[i:i + n] in keys),
+                None
+            )
+            if match is None:
+                i += 1
+                continue
+            if match not in mentions:
+                mentions.append(match)
+            i += len(match)
+        return mentions
+
+
+# 품목별 검색 스레드 풀 (fork된 자식에서는 새로 만듦)
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor, _executor_pid
+    with _executor_lock:
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ThreadPoolExecutor(max_workers=Config.MULTI_ITEM_SEARCH_WORKERS, thread_name_prefix="item-search")
+            _executor_pid = os.getpid()
+        return _executor
+
+
+def search_items(retriever: Any, region_name: str, mentions: List[str], k: int = None) -> List[Document]:
+    """
+    품목별 동시 검색 후 결과 병합
+
+    - 언급 대신 이름이 일치하는 품목명으로 검색 (ItemVocabulary.search_query)
+    - 품목마다 k개보다 조금 더 검색한 뒤, 품목명이 언급과 일치하는 문서를 앞으로 올려 k개만 사용
+      (괄호 밖 이름 일치 > 괄호 안 키만 일치: "건전지"는 "체온계(건전지, 디지털)"보다 "폐건전지"를 우선)
+    - 품목마다 상위 문서부터 번갈아 담아, 컨텍스트 토큰 예산에 걸려도 뒤쪽 품목이 통째로 빠지지 않게 함
+
+    Args:
+        retriever: 검색 백엔드 (LocalRetriever 또는 ShardRouter)
+        region_name: 지역명
+        mentions: 품목 조회 키 목록
+        k: 품목별 검색 문서 수 (기본값: Config에서 가져옴)
+
+    Returns:
+        중복을 제거한 문서 목록
+    """
+    k = k or Config.MULTI_ITEM_SEARCH_K
+    vocabulary = get_item_vocabulary()
+    executor = _get_executor()
+    futures = [
+        executor.submit(
+            retriever.search, region_name, vocabulary.search_query(region_name, mention),
+            k + Config.MULTI_ITEM_RERANK_EXTRA
+        )
+        for mention in mentions
+    ]
+    results = [
+        sorted(future.result(), key=lambda doc, m=mention: match_rank(m, doc.metadata.get("품목", "")))[:k]
+        for mention, future in zip(mentions, futures)
+    ]
+
+    docs: List[Document] = []
+    seen = set()
+    for rank in range(max((len(r) for r in results), default=0)):
+        for result in results:
+            if rank < len(result) and result[rank].page_content not in seen:
+                seen.add(result[rank].page_content)
+                docs.append(result[rank])
+    return docs
+
+
+# 전역 인스턴스
+_item_vocabulary = None
+
+def get_item_vocabulary() -> ItemVocabulary:
+    global _item_vocabulary
+    if not _item_vocabulary:
+        _item_vocabulary = ItemVocabulary()
+    return _item_vocabulary
@@ -3,8 +3,9 @@ LangGraph 노드들 - 간결한 컨트롤러
 상태를 받아 도구를 호출하고 다음 상태로 전달
 """
 
-from typing import Dict, Any
+from typing import Any, Callable, Dict
 from langchain_core.messages import HumanMessage, AIMessage
+from langchain_core.tools import BaseTool
 
 from .state import RecyclingState
 from .tools import (
@@ -14,74 +15,109 @@ from .tools import (
 )
 
 
-def parse_context_node(state: RecyclingState) -> Dict[str, Any]:
+# 도구 호출 방식: (도구, 인자) -> 결과
+ToolCaller = Callable[[BaseTool, Dict[str, Any]], Any]
+
+
+def invoke_tool(tool_obj: BaseTool, args: Dict[str, Any]) -> Any:
+    """@tool 래퍼로 호출 (인자 스키마 검증, 콜백 포함)"""
+    return tool_obj.invoke(args)
+
+
+def call_tool_directly(tool_obj: BaseTool, args: Dict[str, Any]) -> Any:
+    """래퍼 없이 원본 함수 직접 호출"""
+    return tool_obj.func(**args)
+
+
+def run_parse_context(state: RecyclingState, call_tool: ToolCaller) -> Dict[str, Any]:
     """Step 1: 대화 맥락 분석"""
     user_input = state.get("user_input", "")
     conversation_history = state.get("conversation_history", [])
-    
+
     # 의도 분석
-    intent_result = check_recycling_intent.invoke({
+    intent_result = call_tool(check_recycling_intent, {
         "user_input": user_input,
         "conversation_history": conversation_history
     })
-    
+
     # 대화 기록 업데이트
     updated_history = conversation_history + [HumanMessage(content=user_input)]
-    
+
     return {
         "is_recycling_query": intent_result.get("is_recycling", False),
         "current_region": intent_result.get("region"),
+        "intent_mode": intent_result.get("intent_mode"),
         "conversation_history": updated_history,
         "total_turns": state.get("total_turns", 0) + 1
     }
 
 
-def handle_recycling_node(state: RecyclingState) -> Dict[str, Any]:
+def run_handle_recycling(state: RecyclingState, call_tool: ToolCaller) -> Dict[str, Any]:
     """Step 2A: 재활용 질문 처리"""
     user_input = state.get("user_input", "")
     current_region = state.get("current_region")
     conversation_history = state.get("conversation_history", [])
-    
+
     # 재활용 처리
-    result = process_recycling_query.invoke({
+    result = call_tool(process_recycling_query, {
         "user_input": user_input,
         "current_region": current_region,
         "conversation_history": conversation_history
     })
-    
+
     # 대화 기록 업데이트
     answer = result["answer"]
     updated_history = conversation_history + [AIMessage(content=answer)]
-    
+
     return {
         "final_answer": answer,
         "conversation_history": updated_history,
-        "casual_count": 0
+        "casual_count": 0,
+        "context_stats": result.get("context_stats"),
+        "answer_mode": result.get("answer_mode")
     }
 
 
-def handle_casual_node(state: RecyclingState) -> Dict[str, Any]:
+def run_handle_casual(state: RecyclingState, call_tool: ToolCaller) -> Dict[str, Any]:
     """Step 2B: 일반 대화 처리"""
     user_input = state.get("user_input", "")
     casual_count = state.get("casual_count", 0)
     conversation_history = state.get("conversation_history", [])
-    
+
     # 일반 대화 응답
-    response = generate_casual_response.invoke({
+    result = call_tool(generate_casual_response, {
         "user_input": user_input,
         "casual_count": casual_count
     })
-    
+
     # 대화 기록 업데이트
-    updated_history = conversation_history + [AIMessage(content=response)]
-    
+    answer = result["answer"]
+    updated_history = conversation_history + [AIMessage(content=answer)]
+
     return {
-        "final_answer": response,
+        "final_answer": answer,
         "casual_count": casual_count + 1,
-        "conversation_history": updated_history
+        "conversation_history": updated_history,
+        "context_stats": None,
+        "answer_mode": result.get("answer_mode")
     }
 
 
+def parse_context_node(state: RecyclingState) -> Dict[str, Any]:
+    """Step 1: 대화 맥락 분석"""
+    return run_parse_context(state, invoke_tool)
+
+
+def handle_recycling_node(state: RecyclingState) -> Dict[str, Any]:
+    """Step 2A: 재활용 질문 처리"""
+    return run_handle_recycling(state, invoke_tool)
+
+
+def handle_casual_node(state: RecyclingState) -> Dict[str, Any]:
+    """Step 2B: 일반 대화 처리"""
+    return run_handle_casual(state, invoke_tool)
+
+
 def should_handle_recycling(state: RecyclingState) -> str:
     """라우팅 결정"""
     return "recycling" if state.get("is_recycling_query", False) else "casual"
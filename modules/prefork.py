@@ -0,0 +1,269 @@
+"""
+프리포크 멀티 프로세스 서빙 모듈
+부모 프로세스에서 인덱스와 그래프를 한 번 로드한 뒤 워커를 fork해 copy-on-write로 공유
+"""
+
+import gc
+import itertools
+import os
+import threading
+import time
+import zlib
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from multiprocessing import Pipe
+from multiprocessing.connection import Connection
+from typing import Deque, Dict, List, Optional, Tuple
+
+from .config import Config
+from .exceptions import ChatbotException
+
+
+def preload():
+    """지역 인덱스 로드 + 그래프 컴파일 (fork 전에 부모에서 한 번만 실행)
+
+    샤드 모드(RETRIEVAL_BACKEND=sharded)에서는 검색을 샤드 노드가 담당하므로 인덱스를 로드하지 않습니다.
+    """
+    from .graph import recycling_graph  # noqa: F401 - import 시점에 컴파일됨
+    from .tools import get_vector_store_manager
+
+    if Config.RETRIEVAL_BACKEND == "local":
+        manager = get_vector_store_manager()
+        for region_name in Config.get_supported_regions():
+            if manager.get_vector_store(region_name) is None:
+                print(f"{region_name} 인덱스가 없습니다.")
+
+        # 새 버전 감시는 워커가 각자 수행 (fork 시점에 스레드가 락을 잡고 있지 않도록 중지)
+        manager.stop_watcher()
+
+    # 이후 생성되는 객체만 GC 대상으로 두어 공유 페이지가 복사되지 않게 함
+    gc.collect()
+    gc.freeze()
+
+
+class _Session:
+    """워커 안의 세션 하나 (에이전트 + 처리 대기 중인 턴)"""
+
+    __slots__ = ("agent", "queue", "running", "last_used")
+
+    def __init__(self, agent):
+        self.agent = agent
+        self.queue: Deque[Tuple[int, str]] = deque()
+        self.running = False
+        self.last_used = time.monotonic()
+
+
+def _worker_loop(conn: Connection):
+    """
+    워커 프로세스: 세션별 RecyclingAgent를 보관하며 요청 처리
+
+    - 턴은 워커 안의 스레드 풀(SERVE_WORKER_THREADS)에서 실행해 LLM 응답 대기를 겹침
+    - 같은 세션의 턴은 한 번에 하나씩 도착 순서대로 처리 (대화 상태 순서 보장)
+    - SERVE_SESSION_IDLE_TIMEOUT 동안 요청이 없는 세션은 에이전트와 체크포인트 기록을 정리
+    """
+    from .agent import RecyclingAgent
+    from .tools import get_vector_store_manager
+
+    # 워커는 프로세스 단위로 병렬화하므로 FAISS 내부 OpenMP 스레드는 1개로 제한
+    import faiss
+    faiss.omp_set_num_threads(1)
+
+    # 부모는 감시 스레드를 멈춘 상태로 fork하므로 워커에서 다시 시작
+    if Config.RETRIEVAL_BACKEND == "local":
+        get_vector_store_manager().start_watcher()
+
+    executor = ThreadPoolExecutor(max_workers=max(1, Config.SERVE_WORKER_THREADS), thread_name_prefix="prefork-turn")
+    sessions: Dict[str, _Session] = {}
+    sessions_lock = threading.Lock()
+    send_lock = threading.Lock()
+
+    def reply(message: Tuple[int, Optional[str], Optional[str]]):
+        with send_lock:
+            try:
+                conn.send(message)
+            except OSError:
+                pass
+
+    def drain(session: _Session):
+        """세션의 대기 턴을 도착 순서대로 처리 (세션당 스레드 하나만 실행)"""
+        while True:
+            with sessions_lock:
+                if not session.queue:
+                    session.running = False
+                    session.last_used = time.monotonic()
+                    return
+                request_id, user_input = session.queue.popleft()
+            try:
+                reply((request_id, session.agent.get_response(user_input), None))
+            except Exception as e:
+                reply((request_id, None, str(e)))
+
+    def sweep():
+        """유휴 세션 정리"""
+        cutoff = time.monotonic() - Config.SERVE_SESSION_IDLE_TIMEOUT
+        with sessions_lock:
+            idle = [
+                session_id for session_id, session in sessions.items()
+                if not session.running and session.last_used < cutoff
+            ]
+            evicted = [sessions.pop(session_id) for session_id in idle]
+        for session in evicted:
+            session.agent.close()
+
+    last_sweep = time.monotonic()
+    while True:
+        if time.monotonic() - last_sweep >= Config.SERVE_SWEEP_INTERVAL:
+            sweep()
+            last_sweep = time.monotonic()
+        try:
+            if not conn.poll(Config.SERVE_SWEEP_INTERVAL):
+                continue
+            message = conn.recv()
+        except (EOFError, OSError):
+            break
+        if message is None:
+            break
+
+        request_id, session_id, user_input = message
+        with sessions_lock:
+            session = sessions.get(session_id)
+            if session is None:
+                session = sessions[session_id] = _Session(RecyclingAgent())
+            session.queue.append((request_id, user_input))
+            session.last_used = time.monotonic()
+            start = not session.running
+            session.running = True
+        if start:
+            executor.submit(drain, session)
+
+    # 받아 둔 턴은 마저 처리한 뒤 종료
+    executor.shutdown(wait=True)
+
+
+class PreforkServer:
+    """세션 고정 라우팅을 하는 프리포크 워커 풀"""
+
+    def __init__(self, workers: Optional[int] = None):
+        """
+        Args:
+            workers: 워커 프로세스 수 (기본값: Config에서 가져옴)
+        """
+        if not hasattr(os, "fork"):
+            raise ChatbotException("프리포크 모드는 fork를 지원하는 OS에서만 사용할 수 있습니다.")
+
+        self.workers = workers or Config.SERVE_WORKERS
+        self._conns: List[Connection] = []
+        self._pids: List[int] = []
+        self._send_locks: List[threading.Lock] = []
+        self._readers: List[threading.Thread] = []
+        self._pending: List[Dict[int, Future]] = []
+        self._pending_lock = threading.Lock()
+        self._request_ids = itertools.count()
+
+    def start(self):
+        """워커 fork (preload 이후 호출)"""
+        for _ in range(self.workers):
+            parent_conn, child_conn = Pipe()
+            pid = os.fork()
+            if pid == 0:
+                # 자식: 다른 워커의 파이프는 닫고 요청 루프 실행
+                parent_conn.close()
+                for conn in self._conns:
+                    conn.close()
+                try:
+                    _worker_loop(child_conn)
+                finally:
+                    os._exit(0)
+
+            child_conn.close()
+            self._conns.append(parent_conn)
+            self._pids.append(pid)
+            self._send_locks.append(threading.Lock())
+            self._pending.append({})
+
+        for index in range(self.workers):
+            reader = threading.Thread(
+                target=self._read_responses,
+                args=(index,),
+                name=f"prefork-reader-{index}",
+                daemon=True
+            )
+            reader.start()
+            self._readers.append(reader)
+
+    def _read_responses(self, index: int):
+        """워커 응답을 요청 Future에 전달"""
+        conn = self._conns[index]
+        pending = self._pending[index]
+        while True:
+            try:
+                request_id, answer, error = conn.recv()
+            except (EOFError, OSError):
+                break
+            with self._pending_lock:
+                future = pending.pop(request_id, None)
+            if future is None:
+                continue
+            if error:
+                future.set_exception(ChatbotException(error))
+            else:
+                future.set_result(answer)
+
+        # 워커가 종료되면 남은 요청 실패 처리
+        with self._pending_lock:
+            orphaned = list(pending.values())
+            pending.clear()
+        for future in orphaned:
+            future.set_exception(ChatbotException("워커 프로세스가 종료되었습니다."))
+
+    def route(self, session_id: str) -> int:
+        """세션 ID로 워커 선택 (같은 세션은 항상 같은 워커)"""
+        return zlib.crc32(session_id.encode("utf-8")) % self.workers
+
+    def submit(self, session_id: str, user_input: str) -> Future:
+        """요청을 세션 담당 워커로 전달하고 Future 반환"""
+        index = self.route(session_id)
+        conn = self._conns[index]
+        request_id = next(self._request_ids)
+
+        future: Future = Future()
+        with self._pending_lock:
+            self._pending[index][request_id] = future
+        with self._send_locks[index]:
+            conn.send((request_id, session_id, user_input))
+        return future
+
+    def get_response(self, session_id: str, user_input: str, timeout: Optional[float] = None) -> str:
+        """동기 요청"""
+        return self.submit(session_id, user_input).result(timeout)
+
+    def shutdown(self):
+        """워커 종료 및 회수"""
+        for index, conn in enumerate(self._conns):
+            try:
+                with self._send_locks[index]:
+                    conn.send(None)
+            except OSError:
+                pass
+        for pid in self._pids:
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
+        # 워커가 종료 전에 보낸 응답을 다 읽을 때까지 기다린 뒤 파이프를 닫음
+        for reader in self._readers:
+            reader.join(timeout=1)
+        for conn in self._conns:
+            conn.close()
+        self._conns.clear()
+        self._pids.clear()
+        self._send_locks.clear()
+        self._readers.clear()
+        self._pending.clear()
+
+    def __enter__(self) -> "PreforkServer":
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
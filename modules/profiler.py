@@ -0,0 +1,331 @@
+"""
+실행 프로파일링 모듈
+스택 샘플링으로 벽시계/CPU 시간을, tracemalloc으로 할당 위치를 수집해
+flamegraph 호환 folded 파일과 상위 N개 요약을 저장 (외부 서비스 불필요)
+"""
+
+import inspect
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .config import Config
+
+
+# 할당 위치 구분: 영역명 -> [(파일 경로 일부, 시작 줄, 끝 줄)] (줄 범위가 None이면 파일 전체)
+AllocArea = Tuple[str, Optional[int], Optional[int]]
+
+
+def _function_range(func) -> AllocArea:
+    lines, first = inspect.getsourcelines(func)
+    return inspect.getsourcefile(func), first, first + len(lines) - 1
+
+
+def _alloc_areas() -> Dict[str, List[AllocArea]]:
+    """할당을 따로 집계할 영역 (문서 로딩, FAISS 로드, 프롬프트 포맷)"""
+    from langchain_community.vectorstores import FAISS
+    from . import context_builder, document_loader
+
+    return {
+        "DocumentLoader": [(document_loader.__file__, None, None)],
+        "FAISS 로드": [_function_range(FAISS.load_local)],
+        "프롬프트 포맷": [
+            ("langchain_core/prompts/", None, None),
+            (context_builder.__file__, None, None)
+        ]
+    }
+
+
+def _short_path(path: str) -> str:
+    """프로젝트 상대 경로 또는 site-packages 이하 경로"""
+    base = str(Config.BASE_DIR) + "/"
+    if path.startswith(base):
+        return path[len(base):]
+    if "site-packages/" in path:
+        return path.split("site-packages/", 1)[1]
+    return Path(path).name
+
+
+def _thread_group(name: str) -> str:
+    """스레드 풀 번호 제거 (gemini_3 -> gemini)"""
+    return re.sub(r"[-_]\d+$", "", name)
+
+
+class Profiler:
+    """with 블록 실행 구간을 프로파일링
+
+    - wall: 모든 스레드의 스택을 주기적으로 샘플링해 경과 시간을 누적 (대기 포함)
+    - cpu: 샘플 사이 각 스레드가 실제로 쓴 CPU 시간을 그 스레드의 스택에 누적
+    - alloc: 주기적인 tracemalloc 스냅샷에서 할당 스택별 최대 보유량을 기록
+      (스냅샷 사이에 생겼다 사라진 짧은 할당은 잡히지 않을 수 있음)
+
+    샘플러와 tracemalloc은 현재 프로세스만 봅니다. 그래서 PROFILE_IN_PROCESS가 켜져 있으면
+    프로파일 동안 문서 파싱을 파싱 프로세스 풀 대신 현재 프로세스에서 직렬로, 스냅샷 없이 실행합니다.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        output_dir: Optional[Path] = None,
+        interval: Optional[float] = None,
+        trace_alloc: Optional[bool] = None
+    ):
+        """
+        Args:
+            name: 출력 디렉토리 접두어 (main, build_index 등)
+            output_dir: 결과 저장 위치 (기본값: Config.PROFILE_DIR)
+            interval: 샘플링 간격 (초, 기본값: Config에서 가져옴)
+            trace_alloc: 할당 추적 여부 (기본값: Config에서 가져옴, Python 할당마다 오버헤드가 있어 wall/cpu 시간이 늘어남)
+        """
+        self.name = name
+        self.output_dir = output_dir or Config.PROFILE_DIR
+        self.interval = interval or Config.PROFILE_INTERVAL_MS / 1000
+        self.trace_alloc = Config.PROFILE_TRACE_ALLOC if trace_alloc is None else trace_alloc
+
+        self.wall: Counter = Counter()
+        self.cpu: Counter = Counter()
+        self.samples = 0
+        self.alloc: Dict[tracemalloc.Traceback, Tuple[int, int]] = {}
+        self._labels: Dict[object, str] = {}
+        self._stop_event = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+        self._started_at = 0.0
+        self._cpu_started_at = 0.0
+        self.in_process = Config.PROFILE_IN_PROCESS
+        self._loader_settings: Tuple[int, bool] = (Config.LOADER_WORKERS, Config.LOADER_USE_SNAPSHOT)
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = f"{_short_path(code.co_filename)}:{code.co_name}"
+        return label
+
+    def _fold(self, frame, thread_name: str) -> str:
+        labels = []
+        while frame is not None:
+            labels.append(self._label(frame.f_code))
+            frame = frame.f_back
+        labels.append(f"thread:{_thread_group(thread_name)}")
+        return ";".join(reversed(labels))
+
+    @staticmethod
+    def _thread_cpu(ident: int) -> Optional[float]:
+        """스레드별 CPU 시간 (지원하지 않는 OS에서는 None)"""
+        try:
+            return time.clock_gettime(time.pthread_getcpuclockid(ident))
+        except (AttributeError, OSError):
+            return None
+
+    def _sample_loop(self):
+        me = threading.get_ident()
+        cpu_last = {t.ident: self._thread_cpu(t.ident) for t in threading.enumerate() if t.ident}
+        last = last_snapshot = time.perf_counter()
+
+        while not self._stop_event.wait(self.interval):
+            now = time.perf_counter()
+            elapsed, last = now - last, now
+            names = {t.ident: t.name for t in threading.enumerate()}
+
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                stack = self._fold(frame, names.get(ident, "unknown"))
+                self.wall[stack] += elapsed
+
+                cpu = self._thread_cpu(ident)
+                if cpu is not None:
+                    previous = cpu_last.get(ident)
+                    cpu_last[ident] = cpu
+                    if previous is not None and cpu > previous:
+                        self.cpu[stack] += cpu - previous
+            self.samples += 1
+
+            if self.trace_alloc and now - last_snapshot >= Config.PROFILE_ALLOC_SNAPSHOT_SEC:
+                self._record_alloc()
+                # 스냅샷 동안 멈춰 있던 시간은 다른 스레드 스택에 더하지 않음
+                last = last_snapshot = time.perf_counter()
+
+    def _record_alloc(self):
+        """현재 할당 스냅샷을 스택별 최대 보유량에 병합"""
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__)
+        ])
+        for stat in snapshot.statistics("traceback"):
+            previous = self.alloc.get(stat.traceback)
+            if previous is None or stat.size > previous[0]:
+                self.alloc[stat.traceback] = (stat.size, stat.count)
+
+    def start(self):
+        if self.in_process:
+            # 파싱을 자식 프로세스로 보내거나 스냅샷으로 건너뛰면 프로파일에 나타나지 않음
+            self._loader_settings = (Config.LOADER_WORKERS, Config.LOADER_USE_SNAPSHOT)
+            Config.LOADER_WORKERS = 1
+            Config.LOADER_USE_SNAPSHOT = False
+        if self.trace_alloc:
+            tracemalloc.start(Config.PROFILE_ALLOC_FRAMES)
+        self._started_at = time.perf_counter()
+        self._cpu_started_at = time.process_time()
+        self._sampler = threading.Thread(target=self._sample_loop, name="profiler", daemon=True)
+        self._sampler.start()
+
+    def stop(self) -> Path:
+        """샘플링 종료 후 결과 저장
+
+        Returns:
+            결과 디렉토리 경로
+        """
+        self._stop_event.set()
+        self._sampler.join()
+        elapsed = time.perf_counter() - self._started_at
+        cpu_elapsed = time.process_time() - self._cpu_started_at
+
+        if self.trace_alloc:
+            self._record_alloc()
+            tracemalloc.stop()
+        if self.in_process:
+            Config.LOADER_WORKERS, Config.LOADER_USE_SNAPSHOT = self._loader_settings
+
+        run_dir = self.output_dir / f"{self.name}-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
+        run_dir.mkdir(parents=True, exist_ok=True)
+
+        self._write_folded(run_dir / "wall.folded", self.wall)
+        self._write_folded(run_dir / "cpu.folded", self.cpu)
+        alloc_sites: Dict[str, List[Tuple[str, int, int]]] = {}
+        if self.trace_alloc:
+            self._write_folded(run_dir / "alloc.folded", self._alloc_stacks(), scale=1)
+            alloc_sites = self._alloc_sites()
+
+        summary = self._summary(elapsed, cpu_elapsed, alloc_sites)
+        (run_dir / "summary.txt").write_text(summary, encoding="utf-8")
+        print(summary)
+        print(f"프로파일 저장: {run_dir}")
+        return run_dir
+
+    def __enter__(self) -> "Profiler":
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    @staticmethod
+    def _write_folded(path: Path, stacks: Counter, scale: float = 1_000_000):
+        """folded 형식 ("a;b;c 값") 저장 - 시간은 마이크로초, 할당은 바이트"""
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, value in stacks.most_common():
+                weight = int(value * scale)
+                if weight > 0:
+                    f.write(f"{stack} {weight}\n")
+
+    def _alloc_stacks(self) -> Counter:
+        stacks: Counter = Counter()
+        for traceback, (size, _) in self.alloc.items():
+            labels = [f"{_short_path(frame.filename)}:{frame.lineno}" for frame in traceback]
+            stacks[";".join(labels)] += size
+        return stacks
+
+    def _alloc_sites(self) -> Dict[str, List[Tuple[str, int, int]]]:
+        """
+        할당 위치 집계
+
+        Returns:
+            영역명 -> [(위치, 바이트, 블록 수)]
+            ("전체"는 실제 할당 줄, 각 영역은 스택에서 가장 안쪽에 있는 영역 내 프레임 기준)
+        """
+        areas = _alloc_areas()
+        sizes: Dict[str, Counter] = {area: Counter() for area in ["전체", *areas]}
+        counts: Dict[str, Counter] = {area: Counter() for area in sizes}
+        matches: Dict[Tuple[str, int], List[str]] = {}
+
+        def areas_of(frame: tracemalloc.Frame) -> List[str]:
+            key = (frame.filename, frame.lineno)
+            if key not in matches:
+                matches[key] = [
+                    area for area, ranges in areas.items()
+                    if any(
+                        pattern in frame.filename
+                        and (first is None or first <= frame.lineno <= last)
+                        for pattern, first, last in ranges
+                    )
+                ]
+            return matches[key]
+
+        for traceback, (size, count) in self.alloc.items():
+            # 전체는 실제 할당 줄(가장 안쪽 프레임) 기준
+            site = f"{_short_path(traceback[-1].filename)}:{traceback[-1].lineno}"
+            sizes["전체"][site] += size
+            counts["전체"][site] += count
+
+            # 각 영역은 스택에서 가장 안쪽 프레임 하나에만 집계
+            seen = set()
+            for frame in reversed(traceback):
+                for area in areas_of(frame):
+                    if area not in seen:
+                        seen.add(area)
+                        site = f"{_short_path(frame.filename)}:{frame.lineno}"
+                        sizes[area][site] += size
+                        counts[area][site] += count
+
+        n = Config.PROFILE_TOP_N
+        return {
+            area: [(site, size, counts[area][site]) for site, size in counter.most_common(n)]
+            for area, counter in sizes.items()
+        }
+
+    def _top(self, stacks: Counter) -> Tuple[List[Tuple[str, float]], List[Tuple[str, float]]]:
+        """(자기 시간 상위, 누적 시간 상위)"""
+        self_time: Counter = Counter()
+        total_time: Counter = Counter()
+        for stack, value in stacks.items():
+            frames = stack.split(";")
+            self_time[frames[-1]] += value
+            for frame in set(frames[1:]):
+                total_time[frame] += value
+        n = Config.PROFILE_TOP_N
+        return self_time.most_common(n), total_time.most_common(n)
+
+    def _summary(self, elapsed: float, cpu_elapsed: float, alloc_sites: Dict[str, List[Tuple[str, int, int]]]) -> str:
+        lines = [
+            f"{'='*70}",
+            f"프로파일 요약: {self.name} (경과 {elapsed:.2f}초, 프로세스 CPU {cpu_elapsed:.2f}초, 샘플 {self.samples}회)",
+        ]
+        if self.trace_alloc:
+            lines.append("  * 할당 추적 오버헤드가 시간에 포함됨 (PROFILE_TRACE_ALLOC=false로 시간만 측정)")
+        if self.in_process:
+            lines.append("  * 문서 파싱을 현재 프로세스에서 직렬로, 스냅샷 없이 실행함 (평소보다 느릴 수 있음)")
+        else:
+            lines.append("  * 파싱 프로세스 풀의 시간/할당은 포함되지 않고, 스냅샷에서 읽은 파일은 파싱되지 않음 (PROFILE_IN_PROCESS=true로 포함)")
+        lines.append("  * 현재 프로세스만 측정함 (프리포크 워커, 샤드 노드 등 다른 프로세스는 제외)")
+        # 벽시계 시간은 사용자가 기다리는 메인 스레드 기준 (풀 스레드의 유휴 대기는 folded 파일에만 포함)
+        by_thread: Counter = Counter()
+        for stack, value in self.wall.items():
+            by_thread[stack.split(";", 1)[0]] += value
+        lines.append("스레드별 벽시계 합계: " + ", ".join(
+            f"{thread[len('thread:'):]} {value:.2f}s" for thread, value in by_thread.most_common()
+        ))
+        main_wall = Counter({stack: value for stack, value in self.wall.items() if stack.startswith("thread:MainThread;")})
+
+        for title, stacks in (("벽시계 시간 (메인 스레드, 대기 포함)", main_wall), ("CPU 시간 (전체 스레드)", self.cpu)):
+            self_top, total_top = self._top(stacks)
+            lines.append(f"{'-'*70}")
+            lines.append(f"[{title}] 합계 {sum(stacks.values()):.2f}초")
+            lines.append("  자기 시간 상위:")
+            lines.extend(f"    {value:8.3f}s  {frame}" for frame, value in self_top)
+            lines.append("  누적 시간 상위:")
+            lines.extend(f"    {value:8.3f}s  {frame}" for frame, value in total_top)
+
+        for area, sites in alloc_sites.items():
+            lines.append(f"{'-'*70}")
+            lines.append(f"[할당 - {area}] 상위 위치 (스냅샷 중 최대 보유량 기준)")
+            if not sites:
+                lines.append("    (없음)")
+            lines.extend(f"    {size/1024:10.1f}KB {count:8d}블록  {site}" for site, size, count in sites)
+        lines.append(f"{'='*70}")
+        return "\n".join(lines)
@@ -0,0 +1,129 @@
+"""
+프롬프트 토큰 집계 모듈
+LLM 호출마다 프롬프트를 구역(고정 접두부, 대화 맥락, 검색 문서, 사용자 입력 등)별 근사 토큰으로 나눠 기록하고,
+고정 접두부가 호출 간 바이트 단위로 같은지(프로바이더 측 접두부 캐시 적용 가능 여부) 확인
+"""
+
+import hashlib
+import threading
+from contextvars import ContextVar
+from typing import Any, Dict, Sequence, Set, Tuple
+
+from langchain_core.messages import BaseMessage
+
+from .config import Config
+from .tokens import estimate_tokens
+
+
+# 현재 턴 유형 (부하 테스트 등 호출자가 지정, 집계를 턴 유형별로 나눌 때 사용)
+turn_label: ContextVar[str] = ContextVar("prompt_turn_label", default="-")
+
+# 목적별로 기억할 접두부 해시 수 (정상이라면 목적당 1개)
+MAX_PREFIX_VARIANTS = 32
+
+
+class PromptLedger:
+    """호출 목적별 프롬프트 토큰 집계 (스레드 안전)
+
+    - 구역: prefix(첫 시스템 메시지), 호출자가 넘긴 가변 구역들, template(나머지 고정 문구)
+    - 목적별 접두부 해시가 한 가지여야 접두부 캐시가 적용됨 (prefix_variants로 확인)
+    - 절감 토큰: 이전 프롬프트 구성 대비 제거된 토큰 + 캐시 재사용 가능한 접두부 토큰
+      (접두부가 PROMPT_CACHE_MIN_TOKENS 미만이면 프로바이더가 캐시하지 않으므로 제외)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rows: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._prefixes: Dict[str, Set[str]] = {}
+
+    def record(
+        self,
+        purpose: str,
+        messages: Sequence[BaseMessage],
+        sections: Dict[str, str],
+        removed_tokens: int = 0
+    ) -> Dict[str, int]:
+        """
+        호출 1회 기록
+
+        Args:
+            purpose: 호출 목적 (intent | recycling | casual)
+            messages: LLM에 보낼 메시지 목록 (첫 메시지가 고정 접두부)
+            sections: 구역 이름 -> 프롬프트에 들어간 가변 텍스트
+            removed_tokens: 이전 구성에서 매 호출 보내던 토큰 중 제거된 양
+
+        Returns:
+            구역 -> 토큰 수 (prefix, 가변 구역들, template, total)
+        """
+        prefix = messages[0].content if messages else ""
+        counts = {"prefix": estimate_tokens(prefix)}
+        for name, text in sections.items():
+            counts[name] = estimate_tokens(text)
+        total = sum(estimate_tokens(message.content) for message in messages)
+        counts["template"] = max(0, total - sum(counts.values()))
+        counts["total"] = total
+
+        digest = hashlib.sha1(prefix.encode("utf-8")).hexdigest()
+        with self._lock:
+            variants = self._prefixes.setdefault(purpose, set())
+            warm = digest in variants
+            if len(variants) < MAX_PREFIX_VARIANTS:
+                variants.add(digest)
+
+            row = self._rows.get((turn_label.get(), purpose))
+            if row is None:
+                row = self._rows[(turn_label.get(), purpose)] = {
+                    "calls": 0, "tokens": {}, "removed": 0, "reused_prefix": 0
+                }
+            row["calls"] += 1
+            for name, value in counts.items():
+                row["tokens"][name] = row["tokens"].get(name, 0) + value
+            row["removed"] += removed_tokens
+            if warm:
+                row["reused_prefix"] += counts["prefix"]
+        return counts
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        턴 유형 -> 목적 -> 호출당 평균 구역별 토큰, 절감 토큰, 추정 절감 지연(ms)
+
+        cacheable은 접두부가 캐시 최소 크기 이상인지 여부이며,
+        saved_tokens/saved_ms 합계는 캐시 가능할 때만 재사용 접두부를 포함
+        """
+        with self._lock:
+            rows = {key: {**row, "tokens": dict(row["tokens"])} for key, row in self._rows.items()}
+            variants = {purpose: len(hashes) for purpose, hashes in self._prefixes.items()}
+
+        ms_per_token = Config.PROMPT_PREFILL_MS_PER_1K_TOKENS / 1000
+        by_label: Dict[str, Dict[str, Any]] = {}
+        for (label, purpose), row in sorted(rows.items()):
+            calls = row["calls"]
+            avg = {name: value / calls for name, value in row["tokens"].items()}
+            cacheable = avg["prefix"] >= Config.PROMPT_CACHE_MIN_TOKENS
+            saved_tokens = row["removed"] + (row["reused_prefix"] if cacheable else 0)
+            by_label.setdefault(label, {})[purpose] = {
+                "calls": calls,
+                "tokens": avg,
+                "total_tokens": row["tokens"]["total"],
+                "removed_tokens": row["removed"],
+                "reused_prefix_tokens": row["reused_prefix"],
+                "cacheable": cacheable,
+                "saved_tokens": saved_tokens,
+                "saved_ms": saved_tokens * ms_per_token
+            }
+        return {"by_label": by_label, "prefix_variants": variants}
+
+    def reset(self):
+        with self._lock:
+            self._rows.clear()
+            self._prefixes.clear()
+
+
+# 전역 인스턴스
+_ledger = None
+
+def get_prompt_ledger() -> PromptLedger:
+    global _ledger
+    if not _ledger:
+        _ledger = PromptLedger()
+    return _ledger
@@ -5,9 +5,10 @@
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 
 
-# 시스템 프롬프트
-SYSTEM_PROMPT = """
-당신은 '버링이'라는 이름의 분리배출 안내 챗봇입니다.  
+# 시스템 프롬프트 (답변/일상 대화 호출의 공통 접두부)
+# 고정 내용은 메시지 앞쪽에, 호출마다 달라지는 내용은 뒤쪽에 두어 접두부가 호출마다 바이트 단위로 같도록 유지
+# (프로바이더 측 접두부/컨텍스트 캐시가 적용될 수 있도록 여기에 가변 값을 넣지 마세요)
+SYSTEM_PROMPT = """당신은 '버링이'라는 이름의 분리배출 안내 챗봇입니다.
 사용자에게 따뜻하고 정확한 정보를 제공하며, 아래 예시들을 참고해 항상 버링이의 말투로 응답해야 합니다.
 
 [말투 지침]
@@ -26,13 +27,30 @@ SYSTEM_PROMPT = """
 [내용 지침]
 - 질문에 대한 답은 실제 분리배출 정책, 일반적인 쓰레기 분류 기준 등을 바탕으로 구성하세요.
 - 모호하거나 기준이 다른 경우에는 “조금 애매할 수 있어요.” 같은 표현으로 부드럽게 설명하세요.
-- 혼자 판단하기 어려운 경우에는 “지역 기준에 따라 다를 수 있어요. 가까운 주민센터에 확인해보시는 것도 좋아요.” 등의 안내로 연결하세요.
-"""
+- 혼자 판단하기 어려운 경우에는 “지역 기준에 따라 다를 수 있어요. 가까운 주민센터에 확인해보시는 것도 좋아요.” 등의 안내로 연결하세요."""
+
+# 답변 생성 지침 (SYSTEM_PROMPT 뒤에 붙는 고정 부분)
+ANSWER_INSTRUCTIONS = """[답변 지침]
+- 함께 제공되는 지역 재활용 정보를 바탕으로 질문에 답변해주세요.
+- 질문에 여러 품목이 있으면 품목별로 나눠서 빠짐없이 답변해주세요.
+- 답변 마지막에 제공된 출처와 URL 정보를 다음 형식으로 포함해주세요:
+[출처] (출처 정보)
+[URL] (URL 주소)"""
+
+# 일상 대화 지침 (SYSTEM_PROMPT 뒤에 붙는 고정 부분)
+CASUAL_INSTRUCTIONS = """[일상 대화 지침]
+- 사용자 말에 1-2문장으로 답하세요."""
 
-# 의도 분석 프롬프트
+ANSWER_SYSTEM_PROMPT = SYSTEM_PROMPT + "\n\n" + ANSWER_INSTRUCTIONS
+CASUAL_SYSTEM_PROMPT = SYSTEM_PROMPT + "\n\n" + CASUAL_INSTRUCTIONS
+
+# 의도 분석 출력 형식 (JsonOutputParser의 JSON 스키마 설명 대신 쓰는 짧은 고정 지침)
+INTENT_FORMAT_INSTRUCTIONS = """반드시 JSON 객체 하나로만 답하세요: {"is_recycling": true 또는 false, "region": 지역명 문자열 또는 null}"""
+
+# 의도 분석 프롬프트 (시스템 메시지는 지원 지역 목록까지 포함해 모든 호출에서 동일)
 INTENT_ANALYSIS_PROMPT = ChatPromptTemplate.from_messages([
     ("system", """재활용 도우미 의도 분석기.
-        
+
 대화 맥락을 보고 현재 입력이 재활용/분리수거 관련 질문인지 판단하세요.
 
 재활용 질문으로 판단하는 경우:
@@ -46,25 +64,50 @@ INTENT_ANALYSIS_PROMPT = ChatPromptTemplate.from_messages([
 
 지역명이 있다면 추출하세요. (지원 지역: {regions})
 
-{format_instructions}"""),
+""" + INTENT_FORMAT_INSTRUCTIONS.replace("{", "{{").replace("}", "}}")),
     ("human", "{context}\n현재 입력: '{input}'")
 ])
 
-# 답변 생성 프롬프트
+# 답변 생성 프롬프트 (고정 지침은 시스템 메시지, 지역 정보와 질문은 마지막 메시지)
 ANSWER_PROMPT = ChatPromptTemplate.from_messages([
-    ("system", SYSTEM_PROMPT),
-    ("human", """
-{region} 재활용 정보:
+    ("system", ANSWER_SYSTEM_PROMPT),
+    ("human", """{region} 재활용 정보:
 {context}
 
-질문: {question}
+질문: {question}""")
+])
 
-위 정보를 바탕으로 답변해주세요. 
-답변 마지막에 제공된 출처와 URL 정보를 다음 형식으로 포함해주세요:
-[출처] (출처 정보)
-[URL] (URL 주소)""")
+# 일상 대화 프롬프트 (대화 유도 문구만 매번 달라짐)
+CASUAL_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", CASUAL_SYSTEM_PROMPT),
+    ("human", "사용자: '{input}'\n\n{guide}")
 ])
 
+# 추출형 답변 템플릿 (LLM 없이 품목 필드로 바로 구성)
+EXTRACTIVE_ITEM_TEMPLATE = "'{item}'은(는) 이렇게 배출해주시면 돼요!"
+EXTRACTIVE_FIELD_TEMPLATES = {
+    "배출방법": "- 배출방법: {value}",
+    "배출요일": "- 배출요일: {value}",
+    "세척여부": "- 세척여부: {value}",
+    "주의사항": "- 헷갈릴 수 있어요! {value}"
+}
+EXTRACTIVE_CLOSING = "정확하게 분리해주시는 당신은 진정한 지구 지킴이!"
+
+# 사전 생성 답변용 질문 표현 (첫 번째 표현으로 답변을 생성하고 나머지는 조회 별칭으로 사용)
+PRECOMPUTE_QUESTION_TEMPLATES = [
+    "{item} 어떻게 버려요?",
+    "{item} 어떻게 버리나요?",
+    "{item} 어떻게 버려야 해요?",
+    "{item} 어떻게 배출하나요?",
+    "{item} 분리수거 어떻게 해요?",
+    "{item} 분리수거 방법",
+    "{item} 분리배출 방법",
+    "{item} 버리는 법",
+    "{item} 버리는 방법",
+    "{item}은 어떻게 버려요?",
+    "{item}는 어떻게 버려요?",
+]
+
 # 지역 미포함 시 안내 메시지
 NO_REGION_MESSAGE = """지원하는 지역명을 포함해주세요.
 
@@ -89,6 +132,13 @@ NO_DOCUMENTS_MESSAGE = """죄송합니다. 해당 질문에 대한 재활용 정
 다른 방식으로 질문해보시거나, 구체적인 품목명을 포함해서 질문해주세요.
 """
 
+# LLM 장애 시 검색 결과를 그대로 안내할 때 머리말
+DEGRADED_ANSWER_HEADER = """지금은 답변 생성이 조금 늦어지고 있어서, {region} 공식 안내 내용을 그대로 정리해드릴게요!
+"""
+
+# LLM 장애 시 일상 대화 응답
+CASUAL_FALLBACK_MESSAGE = "버링이가 잠깐 숨을 고르고 있어요. 궁금한 쓰레기가 있다면 지역명과 함께 물어봐주세요!"
+
 # 오류 메시지
 ERROR_MESSAGES = {
     "no_api_key": "GOOGLE_API_KEY가 설정되지 않았습니다.",
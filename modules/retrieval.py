@@ -0,0 +1,26 @@
+"""
+검색 백엔드 모듈
+process_recycling_query가 사용하는 지역별 유사 문서 검색 인터페이스
+(local: 프로세스 내 FAISS, sharded: modules/sharding.py의 ShardRouter)
+"""
+
+from typing import List
+
+from langchain_core.documents import Document
+
+from .vector_store import VectorStoreManager
+
+
+class LocalRetriever:
+    """현재 프로세스에 로드한 FAISS 인덱스로 검색"""
+
+    def __init__(self, manager: VectorStoreManager):
+        self.manager = manager
+
+    def has_region(self, region_name: str) -> bool:
+        """지역 인덱스 사용 가능 여부 (처음 확인할 때 로드)"""
+        return self.manager.get_vector_store(region_name) is not None
+
+    def search(self, region_name: str, query: str, k: int = 3) -> List[Document]:
+        """지역 인덱스에서 유사 문서 검색"""
+        return self.manager.get_vector_store(region_name).similarity_search(query, k=k)
@@ -0,0 +1,269 @@
+"""
+프로세스 전역 Gemini 요청 스케줄러
+공유 토큰 버킷, 우선순위 큐(답변 > 의도 분석 > 일상 대화), 동일 요청 병합
+"""
+
+import heapq
+import itertools
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+from langchain_core.embeddings import Embeddings
+from langchain_google_genai import GoogleGenerativeAIEmbeddings
+
+from .config import Config
+from .embedding_batcher import MicroBatcher
+from .exceptions import LLMTimeoutError
+from .metrics import LatencyWindow
+
+
+class _Request:
+    """대기 중인 업스트림 요청"""
+
+    __slots__ = ("fn", "args", "future", "key", "priority", "enqueued_at", "deadline")
+
+    def __init__(self, fn, args, priority, key, deadline):
+        self.fn = fn
+        self.args = args
+        self.future: Future = Future()
+        self.key = key
+        self.priority = priority
+        self.enqueued_at = time.monotonic()
+        self.deadline = deadline
+
+
+class RequestScheduler:
+    """모든 LLM/임베딩 호출이 거치는 전역 스케줄러
+
+    - 토큰 버킷으로 초당 요청 수를 제한하고, 토큰이 생길 때마다 가장 우선순위가 높은 요청부터 보냄
+    - 같은 키의 요청이 이미 대기/실행 중이면 새로 보내지 않고 결과를 공유
+    - 데드라인이 지난 대기 요청은 토큰을 쓰지 않고 버림
+    """
+
+    def __init__(self, rate: float, burst: int, max_concurrency: int):
+        """
+        Args:
+            rate: 초당 허용 요청 수 (0 이하면 제한 없음)
+            burst: 순간적으로 허용할 최대 요청 수
+            max_concurrency: 동시에 실행할 업스트림 요청 수
+        """
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._last_refill = time.monotonic()
+
+        self._heap: List[Any] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._inflight: Dict[Hashable, _Request] = {}
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="gemini")
+        self._dispatcher: Optional[threading.Thread] = None
+
+        self.wait_times: Dict[str, LatencyWindow] = {}
+        self.queue_depth: Dict[str, int] = {}
+        self.counters = {"submitted": 0, "coalesced": 0, "dispatched": 0, "expired": 0}
+
+    def submit(
+        self,
+        fn: Callable[..., Any],
+        *args: Any,
+        priority: str = "recycling",
+        key: Optional[Hashable] = None,
+        deadline: Optional[float] = None
+    ) -> Future:
+        """
+        요청 등록
+
+        Args:
+            fn: 업스트림 호출 함수
+            priority: 우선순위 클래스 (Config.SCHEDULER_PRIORITIES의 키)
+            key: 병합 키 (None이면 병합하지 않음)
+            deadline: time.monotonic() 기준 결과가 더 이상 필요 없는 시각
+
+        Returns:
+            결과 Future (병합된 경우 먼저 등록된 요청과 같은 Future)
+        """
+        with self._cond:
+            self.counters["submitted"] += 1
+            if key is not None and key in self._inflight:
+                request = self._inflight[key]
+                self.counters["coalesced"] += 1
+                # 가장 늦게까지 기다리는 호출자 기준으로 데드라인 연장
+                if request.deadline is not None:
+                    request.deadline = None if deadline is None else max(request.deadline, deadline)
+                return request.future
+
+            request = _Request(fn, args, priority, key, deadline)
+            if key is not None:
+                self._inflight[key] = request
+            rank = Config.SCHEDULER_PRIORITIES.get(priority, max(Config.SCHEDULER_PRIORITIES.values()))
+            heapq.heappush(self._heap, (rank, next(self._seq), request))
+            self.queue_depth[priority] = self.queue_depth.get(priority, 0) + 1
+
+            if self._dispatcher is None:
+                self._dispatcher = threading.Thread(target=self._dispatch_loop, name="gemini-scheduler", daemon=True)
+                self._dispatcher.start()
+            self._cond.notify()
+        return request.future
+
+    def call(self, fn: Callable[..., Any], *args: Any, timeout: Optional[float] = None, **kwargs: Any) -> Any:
+        """동기 호출 (submit 후 결과 대기, 제한 시간을 넘기면 LLMTimeoutError)"""
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        future = self.submit(fn, *args, deadline=deadline, **kwargs)
+        try:
+            return future.result(timeout)
+        except FutureTimeoutError:
+            raise LLMTimeoutError(f"요청이 {timeout:.1f}초 안에 끝나지 않았습니다.")
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    def _pop(self) -> _Request:
+        _, _, request = heapq.heappop(self._heap)
+        self.queue_depth[request.priority] -= 1
+        return request
+
+    def _finish(self, request: _Request):
+        """병합 대상에서 제거 (결과 전달 전에 호출해 이후 요청은 새로 보냄)"""
+        with self._cond:
+            if request.key is not None and self._inflight.get(request.key) is request:
+                del self._inflight[request.key]
+
+    def _dispatch_loop(self):
+        while True:
+            with self._cond:
+                while not self._heap:
+                    self._cond.wait()
+
+                # 데드라인이 지난 요청은 토큰 없이 정리
+                request = self._heap[0][2]
+                if request.deadline is not None and time.monotonic() > request.deadline:
+                    self._pop()
+                    self.counters["expired"] += 1
+                    expired = request
+                else:
+                    expired = None
+                    if self.rate > 0:
+                        self._refill()
+                        if self._tokens < 1:
+                            # 토큰을 기다리는 동안 더 급한 요청이 들어올 수 있으므로 다시 확인
+                            self._cond.wait((1 - self._tokens) / self.rate)
+                            continue
+                        self._tokens -= 1
+                    request = self._pop()
+                    self.counters["dispatched"] += 1
+                    self.wait_times.setdefault(request.priority, LatencyWindow()).record(
+                        time.monotonic() - request.enqueued_at
+                    )
+
+            if expired is not None:
+                self._finish(expired)
+                expired.future.set_exception(LLMTimeoutError("대기 중 데드라인이 지났습니다."))
+                continue
+
+            upstream = self._executor.submit(request.fn, *request.args)
+            upstream.add_done_callback(lambda f, r=request: self._complete(r, f))
+
+    def _complete(self, request: _Request, upstream: Future):
+        self._finish(request)
+        error = upstream.exception()
+        if error is not None:
+            request.future.set_exception(error)
+        else:
+            request.future.set_result(upstream.result())
+
+    def metrics(self) -> Dict[str, Any]:
+        """대기열 깊이, 대기 시간, 병합/만료 통계"""
+        with self._cond:
+            self._refill()
+            return {
+                **self.counters,
+                "tokens": round(self._tokens, 2),
+                "inflight_keys": len(self._inflight),
+                "queue_depth": dict(self.queue_depth),
+                "wait_time": {cls: window.summary() for cls, window in self.wait_times.items()}
+            }
+
+
+# 전역 인스턴스
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+def get_scheduler() -> RequestScheduler:
+    global _scheduler
+    with _scheduler_lock:
+        if not _scheduler:
+            _scheduler = RequestScheduler(
+                rate=Config.GEMINI_RATE_LIMIT,
+                burst=Config.GEMINI_RATE_BURST,
+                max_concurrency=Config.LLM_CALL_WORKERS
+            )
+        return _scheduler
+
+
+def _reset_after_fork():
+    """fork된 자식에는 디스패처 스레드가 없으므로 새 스케줄러를 쓰도록 초기화"""
+    global _scheduler, _scheduler_lock
+    _scheduler = None
+    _scheduler_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+class ScheduledEmbeddings(Embeddings):
+    """임베딩 호출을 전역 스케줄러로 보내는 래퍼
+
+    - embed_query: 답변 경로이므로 embedding 우선순위, 같은 질의는 병합
+      (마이크로 배치를 켜면 짧은 시간 안에 들어온 질의를 배치 요청 1회로 보냄)
+    - embed_documents: 인덱스 빌드용 batch 우선순위
+    """
+
+    def __init__(self, embeddings: Embeddings):
+        self.embeddings = embeddings
+        self.batcher: Optional[MicroBatcher] = None
+        if Config.EMBEDDING_MICROBATCH_WAIT_MS > 0:
+            self.batcher = MicroBatcher(
+                self._submit_queries,
+                max_batch=Config.EMBEDDING_MICROBATCH_SIZE,
+                max_wait=Config.EMBEDDING_MICROBATCH_WAIT_MS / 1000
+            )
+
+    def _embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """질의 여러 개를 요청 1회로 임베딩 (Gemini는 질의용 task_type 유지)"""
+        if isinstance(self.embeddings, GoogleGenerativeAIEmbeddings):
+            return self.embeddings.embed_documents(
+                texts, task_type=self.embeddings.task_type or "RETRIEVAL_QUERY"
+            )
+        return self.embeddings.embed_documents(texts)
+
+    def _submit_queries(self, texts: List[str]) -> Future:
+        deadline = time.monotonic() + Config.EMBEDDING_QUERY_DEADLINE
+        return get_scheduler().submit(self._embed_queries, texts, priority="embedding", deadline=deadline)
+
+    def embed_query(self, text: str) -> List[float]:
+        """질의 임베딩 (EMBEDDING_QUERY_DEADLINE을 넘기면 LLMTimeoutError)"""
+        timeout = Config.EMBEDDING_QUERY_DEADLINE
+        if self.batcher is not None:
+            try:
+                return self.batcher.submit(text).result(timeout)
+            except FutureTimeoutError:
+                raise LLMTimeoutError(f"질의 임베딩이 {timeout:.1f}초 안에 끝나지 않았습니다.")
+        return get_scheduler().call(
+            self.embeddings.embed_query, text,
+            priority="embedding",
+            key=("embed_query", text),
+            timeout=timeout
+        )
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return get_scheduler().call(
+            self.embeddings.embed_documents, texts,
+            priority="batch"
+        )
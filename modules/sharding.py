@@ -0,0 +1,368 @@
+"""
+지역 샤딩 모듈
+각 노드 프로세스는 일부 지역의 인덱스만 로드해 검색을 제공하고,
+라우터는 지역을 담당하는 노드로 검색을 모아 보내며 실패 시 복제본으로 전환
+"""
+
+import ipaddress
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from multiprocessing.connection import Client, Connection, Listener
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+from .config import Config
+from .embedding_batcher import MicroBatcher
+from .exceptions import ShardUnavailableError, VectorStoreError
+from .vector_store import VectorStoreManager
+
+
+# 검색 요청: (지역명, 질의, k)
+SearchItem = Tuple[str, str, int]
+
+# SHARD_AUTHKEY 없이 루프백 주소끼리만 쓰는 인증 키
+LOOPBACK_AUTHKEY = b"recycling-shard-loopback"
+
+
+def parse_address(node: str) -> Tuple[str, int]:
+    """'host:port' -> (host, port)"""
+    host, _, port = node.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+def _is_loopback(host: str) -> bool:
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def resolve_authkey(addresses: List[Tuple[str, int]], authkey: Optional[bytes] = None) -> bytes:
+    """
+    연결 인증 키 결정 (인자 > SHARD_AUTHKEY)
+
+    노드와 라우터는 pickle로 메시지를 주고받으므로, 키가 없으면 루프백 주소에서만 로컬 기본 키를 허용합니다.
+
+    Raises:
+        VectorStoreError: 키 없이 루프백이 아닌 주소를 쓰려는 경우
+    """
+    key = authkey or Config.SHARD_AUTHKEY
+    if key:
+        return key
+    remote = [f"{host}:{port}" for host, port in addresses if not _is_loopback(host)]
+    if remote:
+        raise VectorStoreError(f"루프백이 아닌 주소({', '.join(remote)})를 쓰려면 SHARD_AUTHKEY를 지정해야 합니다.")
+    return LOOPBACK_AUTHKEY
+
+
+class ShardNode:
+    """일부 지역 인덱스만 로드해 검색 요청을 처리하는 노드
+
+    메시지 (multiprocessing.connection, authkey 인증), 응답은 모두 (상태, 내용):
+    - ("regions",) -> ("ok", 담당 지역 목록)
+    - ("search", [(지역명, 질의, k), ...]) -> ("ok", [("ok", 문서 목록) 또는 ("error", 메시지), ...])
+    - 그 밖의 메시지 -> ("error", 메시지)
+    """
+
+    def __init__(self, regions: List[str], address: Tuple[str, int], authkey: bytes = None):
+        """
+        Args:
+            regions: 담당 지역 목록 (Config.REGION_MAP의 지역명)
+            address: 수신 주소 (host, port)
+            authkey: 연결 인증 키 (기본값: Config에서 가져옴, 루프백이 아닌 주소는 필수)
+
+        Raises:
+            VectorStoreError: 인증 키 없이 루프백이 아닌 주소로 수신하려는 경우
+        """
+        self.regions = regions
+        self.address = address
+        self.authkey = resolve_authkey([address], authkey)
+        self.manager = VectorStoreManager()
+        # 배치 안의 검색을 동시에 실행해 질의 임베딩이 마이크로 배치로 묶이게 함
+        self._pool = ThreadPoolExecutor(max_workers=Config.SHARD_SEARCH_WORKERS, thread_name_prefix="shard-search")
+
+    def load(self) -> List[str]:
+        """
+        담당 지역 인덱스 로드
+
+        Returns:
+            로드에 성공한 지역 목록
+        """
+        loaded = [region for region in self.regions if self.manager.get_vector_store(region) is not None]
+        for region in self.regions:
+            if region not in loaded:
+                print(f"{region} 인덱스가 없습니다.")
+        self.regions = loaded
+        return loaded
+
+    def _search(self, item: SearchItem) -> Tuple[str, Any]:
+        region_name, query, k = item
+        if region_name not in self.regions:
+            return "error", f"이 노드는 {region_name}을(를) 담당하지 않습니다."
+        try:
+            return "ok", self.manager.get_vector_store(region_name).similarity_search(query, k=k)
+        except Exception as e:
+            return "error", str(e)
+
+    def _handle(self, conn: Connection):
+        """연결 하나의 요청 루프"""
+        with conn:
+            while True:
+                try:
+                    message = conn.recv()
+                except (EOFError, OSError):
+                    break
+
+                command = message[0] if isinstance(message, tuple) and message else None
+                if command == "regions":
+                    conn.send(("ok", list(self.regions)))
+                elif command == "search":
+                    conn.send(("ok", list(self._pool.map(self._search, message[1]))))
+                else:
+                    conn.send(("error", f"알 수 없는 명령: {command}"))
+
+    def serve_forever(self):
+        """인덱스 로드 후 요청 수신 (연결마다 스레드 하나)"""
+        self.load()
+        self.manager.start_watcher()
+
+        with Listener(self.address, authkey=self.authkey) as listener:
+            print(f"샤드 노드 시작: {self.address[0]}:{self.address[1]} ({', '.join(self.regions)})", flush=True)
+            while True:
+                try:
+                    conn = listener.accept()
+                except Exception as e:
+                    # 인증 실패 등 개별 연결 오류는 무시하고 계속 수신
+                    print(f"연결 수락 실패: {e}")
+                    continue
+                threading.Thread(target=self._handle, args=(conn,), name="shard-conn", daemon=True).start()
+
+
+class _NodeClient:
+    """노드 하나에 대한 연결 풀"""
+
+    def __init__(self, address: Tuple[str, int], authkey: bytes):
+        self.address = address
+        self.authkey = authkey
+        self._idle: List[Connection] = []
+        self._lock = threading.Lock()
+
+    def call(self, message: Any, timeout: float) -> Any:
+        """
+        요청 전송 후 응답 내용 반환
+
+        Raises:
+            OSError: 연결/응답 실패
+            VectorStoreError: 노드가 요청을 처리하지 못한 경우 ("error" 응답)
+        """
+        with self._lock:
+            conn = self._idle.pop() if self._idle else None
+        if conn is None:
+            conn = Client(self.address, authkey=self.authkey)
+
+        try:
+            conn.send(message)
+            if not conn.poll(timeout):
+                raise TimeoutError(f"노드 응답 시간 초과: {self.address}")
+            status, result = conn.recv()
+        except (OSError, EOFError) as e:
+            conn.close()
+            raise OSError(str(e)) from e
+
+        with self._lock:
+            self._idle.append(conn)
+        if status != "ok":
+            raise VectorStoreError(f"샤드 노드 오류 ({self.address[0]}:{self.address[1]}): {result}")
+        return result
+
+    def close(self):
+        with self._lock:
+            for conn in self._idle:
+                conn.close()
+            self._idle.clear()
+
+
+class ShardRouter:
+    """지역별 검색을 담당 노드로 전달하는 라우터
+
+    - 시작 시 각 노드에 담당 지역을 물어 지역 -> 노드 목록(설정 순서가 우선순위)을 구성
+      (주기적인 재조회는 한 스레드만 백그라운드로 수행하고, 검색은 기존 목록으로 계속 진행)
+    - 같은 노드 그룹으로 가는 검색은 짧은 시간 모아 요청 1회로 보냄
+    - 노드 연결/응답이 실패하면 같은 지역을 가진 다음 복제본으로 재전송하고,
+      실패한 노드는 SHARD_RETRY_INTERVAL 동안 뒤로 미룸
+    """
+
+    def __init__(self, nodes: Optional[List[str]] = None, authkey: bytes = None):
+        """
+        Args:
+            nodes: 노드 주소 목록 ("host:port", 기본값: Config.SHARD_NODES)
+            authkey: 연결 인증 키 (기본값: Config에서 가져옴, 루프백이 아닌 노드가 있으면 필수)
+        """
+        self.nodes = [parse_address(node) for node in (nodes or Config.SHARD_NODES)]
+        if not self.nodes:
+            raise VectorStoreError("SHARD_NODES가 설정되지 않았습니다.")
+        self.authkey = resolve_authkey(self.nodes, authkey)
+        self.counters = {"searches": 0, "batches": 0, "failovers": 0, "discoveries": 0}
+        self._init_state()
+
+    def _init_state(self):
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._discover_lock = threading.Lock()  # 담당 지역 조회는 한 번에 하나만
+        self._clients = {address: _NodeClient(address, self.authkey) for address in self.nodes}
+        self._owners: Dict[str, List[Tuple[str, int]]] = {}
+        self._failed_at: Dict[Tuple[str, int], float] = {}
+        self._batchers: Dict[Tuple[Tuple[str, int], ...], MicroBatcher] = {}
+        self._executor = ThreadPoolExecutor(max_workers=len(self.nodes) * 4, thread_name_prefix="shard-router")
+        self._discovered_at = 0.0
+
+    def _check_fork(self):
+        # fork된 자식은 부모의 연결/스레드를 쓸 수 없으므로 새로 구성
+        if self._pid != os.getpid():
+            self._init_state()
+
+    def discover(self) -> Dict[str, List[Tuple[str, int]]]:
+        """
+        각 노드의 담당 지역 조회
+
+        Returns:
+            지역명 -> 노드 주소 목록 (설정 순서)
+        """
+        # 응답하지 않은 노드는 직전에 알던 담당 지역을 유지 (복구되면 그대로 다시 사용)
+        previous: Dict[Tuple[str, int], List[str]] = {}
+        for region_name, addresses in self._owners.items():
+            for address in addresses:
+                previous.setdefault(address, []).append(region_name)
+
+        owners: Dict[str, List[Tuple[str, int]]] = {}
+        for address in self.nodes:
+            try:
+                regions = self._clients[address].call(("regions",), Config.SHARD_REQUEST_TIMEOUT)
+                self._failed_at.pop(address, None)
+            except (OSError, VectorStoreError):
+                self._failed_at[address] = time.monotonic()
+                regions = previous.get(address, [])
+            for region_name in regions:
+                owners.setdefault(region_name, []).append(address)
+
+        with self._lock:
+            self._owners = owners
+            self._discovered_at = time.monotonic()
+            self.counters["discoveries"] += 1
+        return owners
+
+    def _refresh(self):
+        """백그라운드 재조회 (_discover_lock을 잡은 스레드가 넘겨준 작업)"""
+        try:
+            self.discover()
+        finally:
+            self._discover_lock.release()
+
+    def _owners_of(self, region_name: str) -> List[Tuple[str, int]]:
+        owners = self._owners.get(region_name)
+        since = time.monotonic() - self._discovered_at
+
+        # 아는 지역: 조회 주기마다 한 스레드만 백그라운드로 재조회 (새로 뜬 복제본 반영), 검색은 기존 목록으로 진행
+        if owners is not None:
+            if since >= Config.SHARD_DISCOVERY_INTERVAL and self._discover_lock.acquire(blocking=False):
+                try:
+                    self._executor.submit(self._refresh)
+                except RuntimeError:
+                    self._discover_lock.release()
+            return owners
+
+        # 모르는 지역: 재시도 간격마다 조회하되, 진행 중인 조회가 있으면 끝나기를 기다려 결과를 같이 사용
+        if since >= Config.SHARD_RETRY_INTERVAL:
+            with self._discover_lock:
+                if time.monotonic() - self._discovered_at >= Config.SHARD_RETRY_INTERVAL:
+                    self.discover()
+        return self._owners.get(region_name) or []
+
+    def has_region(self, region_name: str) -> bool:
+        """지역을 담당하는 노드가 있는지 여부"""
+        self._check_fork()
+        return bool(self._owners_of(region_name))
+
+    def search(self, region_name: str, query: str, k: int = 3) -> List[Document]:
+        """
+        지역 담당 노드에서 유사 문서 검색
+
+        Raises:
+            ShardUnavailableError: 담당 노드(복제본 포함)에 모두 연결할 수 없는 경우
+            VectorStoreError: 노드에서 검색이 실패한 경우
+        """
+        self._check_fork()
+        group = tuple(self._owners_of(region_name))
+        if not group:
+            raise ShardUnavailableError(f"{region_name}을(를) 담당하는 샤드 노드가 없습니다.")
+
+        with self._lock:
+            self.counters["searches"] += 1
+            batcher = self._batchers.get(group)
+            if batcher is None:
+                batcher = self._batchers[group] = MicroBatcher(
+                    partial(self._send, group),
+                    max_batch=Config.SHARD_BATCH_SIZE,
+                    max_wait=Config.SHARD_BATCH_WAIT_MS / 1000,
+                    name="shard-batcher"
+                )
+
+        status, result = batcher.submit((region_name, query, k)).result()
+        if status != "ok":
+            raise VectorStoreError(result)
+        return result
+
+    def _send(self, group: Tuple[Tuple[str, int], ...], items: List[SearchItem]) -> Future:
+        return self._executor.submit(self._call_with_failover, group, items)
+
+    def _call_with_failover(self, group: Tuple[Tuple[str, int], ...], items: List[SearchItem]) -> List[Tuple[str, Any]]:
+        """정상 노드 우선(설정 순서), 최근 실패한 노드는 마지막에 시도"""
+        now = time.monotonic()
+        recently_failed = {
+            address for address, failed_at in list(self._failed_at.items())
+            if now - failed_at < Config.SHARD_RETRY_INTERVAL
+        }
+        ordered = sorted(group, key=lambda address: address in recently_failed)
+
+        with self._lock:
+            self.counters["batches"] += 1
+        last_error: Optional[Exception] = None
+        for attempt, address in enumerate(ordered):
+            if attempt:
+                with self._lock:
+                    self.counters["failovers"] += 1
+            try:
+                results = self._clients[address].call(("search", items), Config.SHARD_REQUEST_TIMEOUT)
+            except (OSError, VectorStoreError) as e:
+                self._failed_at[address] = time.monotonic()
+                last_error = e
+                continue
+            self._failed_at.pop(address, None)
+            return results
+
+        raise ShardUnavailableError(f"샤드 노드에 연결할 수 없습니다: {last_error}")
+
+    def metrics(self) -> Dict[str, Any]:
+        """검색/배치/복제본 전환 횟수와 노드 그룹별 배치 지표"""
+        with self._lock:
+            counters = dict(self.counters)
+            batchers = dict(self._batchers)
+        return {
+            **counters,
+            "owners": {region: [f"{h}:{p}" for h, p in nodes] for region, nodes in self._owners.items()},
+            "groups": {
+                ",".join(f"{h}:{p}" for h, p in group): batcher.metrics()
+                for group, batcher in batchers.items()
+            }
+        }
+
+    def close(self):
+        """노드 연결 정리"""
+        for client in self._clients.values():
+            client.close()
@@ -3,7 +3,7 @@ LangGraph 상태 정의
 챗봇의 상태 관리
 """
 
-from typing import TypedDict, List, Optional
+from typing import TypedDict, List, Optional, Dict, Any
 from langgraph.graph import MessagesState
 from langchain_core.messages import BaseMessage
 
@@ -16,12 +16,17 @@ class RecyclingState(MessagesState):
     # 분석 결과
     is_recycling_query: bool
     current_region: Optional[str]
+    intent_mode: Optional[str]  # llm | fallback(LLM 장애로 지역명 기반 추정) | error
     
     # 대화 맥락
     conversation_history: List[BaseMessage]
     
     # 최종 결과
     final_answer: Optional[str]
+    answer_mode: Optional[str]  # 답변 경로 (llm, extractive, precomputed, degraded, guide, no_documents, error)
+    
+    # 컨텍스트 구성 통계 (재활용 답변 턴에만 존재)
+    context_stats: Optional[Dict[str, Any]]
     
     # 대화 트래킹
     casual_count: int
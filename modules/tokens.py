@@ -0,0 +1,26 @@
+"""
+토큰 수 추정 모듈
+외부 토크나이저 없이 프롬프트 길이를 근사 계산
+"""
+
+import math
+
+
+def estimate_tokens(text: str) -> int:
+    """텍스트의 토큰 수 근사치 반환
+
+    - 한글/한자 등 비ASCII 문자: 1자당 1토큰
+    - ASCII 문자(공백 제외): 4자당 1토큰
+    """
+    if not text:
+        return 0
+    wide = 0
+    narrow = 0
+    for ch in text:
+        if ch.isspace():
+            continue
+        if ord(ch) > 127:
+            wide += 1
+        else:
+            narrow += 1
+    return wide + math.ceil(narrow / 4)
@@ -10,12 +10,24 @@ from pydantic import BaseModel, Field
 
 from .config import Config
 from .vector_store import VectorStoreManager
+from .retrieval import LocalRetriever
+from .context_builder import build_context
+from .exceptions import APIError
+from .llm_client import get_resilient_llm
+from .extractive import match_items, render_extractive_answer
+from .answer_store import get_answer_store
+from .multi_item import get_item_vocabulary, match_rank, search_items
+from .prompt_stats import get_prompt_ledger
+from .tokens import estimate_tokens
 from .prompts import (
     ANSWER_PROMPT,
-    SYSTEM_PROMPT,
+    CASUAL_PROMPT,
     NO_DOCUMENTS_MESSAGE,
     ERROR_MESSAGES,
-    INTENT_ANALYSIS_PROMPT
+    INTENT_ANALYSIS_PROMPT,
+    INTENT_FORMAT_INSTRUCTIONS,
+    DEGRADED_ANSWER_HEADER,
+    CASUAL_FALLBACK_MESSAGE
 )
 
 
@@ -26,20 +38,59 @@ def get_vector_store_manager():
     global _vector_store_manager
     if not _vector_store_manager:
         _vector_store_manager = VectorStoreManager()
+        # 새 인덱스 버전이 게시되면 백그라운드에서 교체
+        _vector_store_manager.add_swap_listener(
+            lambda region, version: get_answer_store().invalidate(region)
+        )
+        _vector_store_manager.add_swap_listener(
+            lambda region, version: get_item_vocabulary().invalidate(region)
+        )
+        _vector_store_manager.start_watcher()
     return _vector_store_manager
 
 
+_retriever = None
+
+def get_retriever():
+    """검색 백엔드 (Config.RETRIEVAL_BACKEND: local | sharded)"""
+    global _retriever
+    if not _retriever:
+        if Config.RETRIEVAL_BACKEND == "sharded":
+            from .sharding import ShardRouter
+            _retriever = ShardRouter()
+        else:
+            _retriever = LocalRetriever(get_vector_store_manager())
+    return _retriever
+
+
+def _fallback_intent(user_input: str) -> Dict[str, Any]:
+    """LLM 없이 지역명 포함 여부로 의도 추정"""
+    region = next((r for r in Config.get_supported_regions() if r in user_input), None)
+    return {"is_recycling": region is not None, "region": region}
+
+
+def format_documents_fallback(region: str, docs: List[Any]) -> str:
+    """LLM 장애 시 검색된 문서를 그대로 정리한 답변"""
+    return DEGRADED_ANSWER_HEADER.format(region=region) + "\n" + render_extractive_answer(docs)
+
+
 # 분석 결과 스키마
 class IntentAnalysis(BaseModel):
     is_recycling: bool = Field(description="재활용 관련 질문 여부")
     region: Optional[str] = Field(description="언급된 지역")
 
 
+# 응답 파싱용 (형식 지침은 프롬프트의 고정 문구를 쓰고, 파서의 긴 스키마 설명은 보내지 않음)
+_intent_parser = JsonOutputParser(pydantic_object=IntentAnalysis)
+INTENT_FORMAT_TOKENS_SAVED = max(
+    0, estimate_tokens(_intent_parser.get_format_instructions()) - estimate_tokens(INTENT_FORMAT_INSTRUCTIONS)
+)
+
+
 @tool
 def check_recycling_intent(user_input: str, conversation_history: List[Any] = []) -> Dict[str, Any]:
     """LLM으로 재활용 의도와 지역 파악"""
-    llm = Config.get_llm("recycling")
-    parser = JsonOutputParser(pydantic_object=IntentAnalysis)
+    llm = get_resilient_llm("intent")
     
     # 최근 대화 맥락 구성
     context = ""
@@ -54,22 +105,34 @@ def check_recycling_intent(user_input: str, conversation_history: List[Any] = []
                     context += f"AI: {msg.content}\n"
     
     try:
-        result = llm.invoke(
-            INTENT_ANALYSIS_PROMPT.format_prompt(
-                regions=", ".join(Config.get_supported_regions()),
-                context=context if context else "(대화 시작)",
-                input=user_input,
-                format_instructions=parser.get_format_instructions()
-            ).to_messages()
+        messages = INTENT_ANALYSIS_PROMPT.format_prompt(
+            regions=", ".join(Config.get_supported_regions()),
+            context=context if context else "(대화 시작)",
+            input=user_input
+        ).to_messages()
+        get_prompt_ledger().record(
+            "intent", messages, {"history": context, "input": user_input},
+            removed_tokens=INTENT_FORMAT_TOKENS_SAVED
         )
-        return parser.parse(result.content)
-    except:
-        return {"is_recycling": False, "region": None}
+        result = llm.invoke(messages)
+        return {**_intent_parser.parse(result.content), "intent_mode": "llm"}
+    except APIError:
+        # LLM 장애 시 지역명 기반으로 추정
+        return {**_fallback_intent(user_input), "intent_mode": "fallback"}
+    except Exception:
+        return {"is_recycling": False, "region": None, "intent_mode": "error"}
 
 
 @tool
-def process_recycling_query(user_input: str, current_region: Optional[str], conversation_history: List[Any] = []) -> Dict[str, Any]:
-    """재활용 질문 통합 처리"""
+def process_recycling_query(user_input: str, current_region: Optional[str], conversation_history: List[Any] = [], answer_mode: Optional[str] = None) -> Dict[str, Any]:
+    """재활용 질문 통합 처리
+    
+    answer_mode: llm(항상 LLM 생성), extractive(항상 템플릿), auto(품목명이 질문과 일치하면 템플릿)
+    기본값은 Config.ANSWER_MODE
+    
+    결과의 answer_mode: llm | extractive | precomputed | degraded(LLM 장애로 검색 결과 안내)
+    | guide(지역/품목 재질문) | no_documents | error
+    """
     # 1. 지역 확인 (현재 입력 또는 최근 대화에서)
     if not current_region:
         # 현재 입력에서 찾기
@@ -94,90 +157,123 @@ def process_recycling_query(user_input: str, current_region: Optional[str], conv
         # 잘못된 지역명이 언급된 경우
         supported = Config.get_supported_regions()
         return {
-            "answer": f"'{current_region}'은(는) 지원하지 않는 지역입니다.\n\n현재 지원하는 지역은 {', '.join(supported)}입니다.\n어느 지역의 분리배출 방법이 궁금하신가요?"
+            "answer": f"'{current_region}'은(는) 지원하지 않는 지역입니다.\n\n현재 지원하는 지역은 {', '.join(supported)}입니다.\n어느 지역의 분리배출 방법이 궁금하신가요?",
+            "answer_mode": "guide"
         }
     
     # 3. 지역이 없는 경우
     if not current_region:
         supported = Config.get_supported_regions()
         return {
-            "answer": f"재활용 방법을 알려드릴게요!\n\n현재 지원하는 지역은 {', '.join(supported)}입니다.\n어느 지역의 분리배출 방법이 궁금하신가요?"
+            "answer": f"재활용 방법을 알려드릴게요!\n\n현재 지원하는 지역은 {', '.join(supported)}입니다.\n어느 지역의 분리배출 방법이 궁금하신가요?",
+            "answer_mode": "guide"
         }
     
     # 4. 유효한 지역이 있는 경우 - 재활용 정보 검색 및 답변
     try:
-        vector_store = get_vector_store_manager().load_vector_store(current_region)
-        if not vector_store:
+        # 사전 생성 답변 (질문이 한 품목으로 확정되는 경우)
+        if Config.PRECOMPUTED_ANSWERS_ENABLED:
+            precomputed = get_answer_store().lookup(current_region, user_input)
+            if precomputed:
+                return {
+                    "answer": precomputed,
+                    "answer_mode": "precomputed"
+                }
+        
+        retriever = get_retriever()
+        if not retriever.has_region(current_region):
             return {
-                "answer": f"{current_region} 데이터를 찾을 수 없습니다."
+                "answer": f"{current_region} 데이터를 찾을 수 없습니다.",
+                "answer_mode": "error"
             }
         
         # 검색 쿼리가 없으면 물어보기
         if not user_input.strip():
             return {
-                "answer": f"{current_region}에서 어떤 품목의 재활용 방법이 궁금하신가요?"
+                "answer": f"{current_region}에서 어떤 품목의 재활용 방법이 궁금하신가요?",
+                "answer_mode": "guide"
             }
         
-        # 유사 문서 검색
-        docs = vector_store.similarity_search(user_input, k=3)
+        # 유사 문서 검색 (품목이 여러 개 언급되면 품목별로 동시에 검색해 합침)
+        mentions = []
+        if Config.MULTI_ITEM_ENABLED:
+            mentions = get_item_vocabulary().find_mentions(current_region, user_input)[:Config.MULTI_ITEM_MAX_ITEMS]
+        if len(mentions) > 1:
+            docs = search_items(retriever, current_region, mentions)
+        else:
+            mentions = []
+            docs = retriever.search(current_region, user_input, k=3)
         if not docs:
             return {
-                "answer": NO_DOCUMENTS_MESSAGE
+                "answer": NO_DOCUMENTS_MESSAGE,
+                "answer_mode": "no_documents"
             }
         
-        # 중복 제거
-        unique_docs = []
-        seen_contents = set()
-        for doc in docs:
-            content = doc.page_content
-            if content not in seen_contents:
-                seen_contents.add(content)
-                unique_docs.append(doc)
+        # 추출형 빠른 경로 (LLM 호출 없음)
+        mode = answer_mode or Config.ANSWER_MODE
+        if mode != "llm":
+            matched = match_items(user_input, docs)
+            # 여러 품목 질문은 모든 품목에 일치하는 문서가 있을 때만 (일부만 일치하면 나머지 품목이 답변에서 빠짐)
+            if mentions and not all(
+                any(match_rank(mention, doc.metadata.get("품목", "")) < 2 for doc in matched)
+                for mention in mentions
+            ):
+                matched = []
+            if matched or mode == "extractive":
+                return {
+                    "answer": render_extractive_answer(matched or docs),
+                    "answer_mode": "extractive"
+                }
         
-        # 답변 생성을 위한 컨텍스트 구성
-        context_parts = []
-        for i, doc in enumerate(unique_docs, 1):
-            context_parts.append(f"[{i}] {doc.page_content}")
-            # 메타데이터 정보 추가
-            if doc.metadata:
-                if 'source' in doc.metadata:
-                    context_parts.append(f"출처: {doc.metadata['source']}")
-                if 'url' in doc.metadata:
-                    context_parts.append(f"URL: {doc.metadata['url']}")
+        # 유사 중복 제거 + 출처 병합 + 토큰 예산 적용
+        context, context_stats = build_context(docs)
+        if mentions:
+            context_stats["items"] = mentions
         
-        context = "\n\n".join(context_parts)
-        
-        llm = Config.get_llm("recycling")
-        response = llm.invoke(
-            ANSWER_PROMPT.format_prompt(
-                region=current_region,
-                question=user_input,
-                context=context
-            ).to_messages()
+        messages = ANSWER_PROMPT.format_prompt(
+            region=current_region,
+            question=user_input,
+            context=context
+        ).to_messages()
+        get_prompt_ledger().record(
+            "recycling", messages, {"region": current_region, "context": context, "question": user_input}
         )
+        try:
+            response = get_resilient_llm("recycling").invoke(messages)
+        except APIError:
+            # LLM 장애 시 검색 결과를 그대로 안내
+            return {
+                "answer": format_documents_fallback(current_region, docs),
+                "context_stats": context_stats,
+                "answer_mode": "degraded"
+            }
         
         return {
-            "answer": response.content
+            "answer": response.content,
+            "context_stats": context_stats,
+            "answer_mode": "llm"
         }
         
     except Exception as e:
         return {
-            "answer": ERROR_MESSAGES["search_error"] + f": {str(e)}"
+            "answer": ERROR_MESSAGES["search_error"] + f": {str(e)}",
+            "answer_mode": "error"
         }
 
 
 @tool
-def generate_casual_response(user_input: str, casual_count: int = 0) -> str:
-    """일반 대화 응답 생성"""
-    llm = Config.get_llm("casual")
+def generate_casual_response(user_input: str, casual_count: int = 0) -> Dict[str, Any]:
+    """일반 대화 응답 생성 (answer_mode: llm | degraded)"""
+    llm = get_resilient_llm("casual")
     
     # 버링이 캐릭터 유지하면서 재활용 주제로 유도
     guide = "재활용 주제로 자연스럽게 유도하세요." if casual_count >= 4 else "친근하게 대화하세요."
     
-    messages = [
-        ("system", SYSTEM_PROMPT),
-        ("human", f"사용자: '{user_input}'\n\n{guide} 1-2문장으로 답하세요.")
-    ]
+    messages = CASUAL_PROMPT.format_prompt(input=user_input, guide=guide).to_messages()
+    get_prompt_ledger().record("casual", messages, {"input": user_input, "guide": guide})
     
-    response = llm.invoke(messages)
-    return response.content
+    try:
+        response = llm.invoke(messages)
+    except APIError:
+        return {"answer": CASUAL_FALLBACK_MESSAGE, "answer_mode": "degraded"}
+    return {"answer": response.content, "answer_mode": "llm"}
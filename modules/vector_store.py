@@ -3,16 +3,82 @@
 FAISS 벡터 데이터베이스 생성 및 관리
 """
 
+import hashlib
+import json
+import os
+import shutil
+import threading
 import time
+from datetime import datetime
+from itertools import islice
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 
 from langchain_community.vectorstores import FAISS
 from langchain_core.documents import Document
-from langchain_google_genai import GoogleGenerativeAIEmbeddings
 
 from .config import Config
+from .embedding_journal import EmbeddingJournal
 from .exceptions import VectorStoreError
+from .scheduler import ScheduledEmbeddings
+
+
+# 인덱스와 함께 저장되는 문서 매니페스트 파일명
+MANIFEST_FILE = "manifest.json"
+
+# 버전 디렉토리와 현재 버전 포인터
+VERSIONS_DIR = "versions"
+CURRENT_FILE = "CURRENT"
+
+# 빌드 중 임베딩 저널 디렉토리
+JOURNAL_DIR = "journal"
+
+
+def document_hash(doc: Document) -> str:
+    """문서 내용 + 메타데이터 해시"""
+    payload = json.dumps(
+        {"page_content": doc.page_content, "metadata": doc.metadata},
+        ensure_ascii=False,
+        sort_keys=True
+    )
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def build_manifest(documents: List[Document]) -> Dict[str, Any]:
+    """
+    인덱스 매니페스트 생성
+    
+    Returns:
+        version: 전체 문서 해시로 만든 인덱스 버전
+        items: 품목별 해시 (같은 품목명의 문서는 합쳐서 계산)
+    """
+    item_hashes: Dict[str, List[str]] = {}
+    for doc in documents:
+        item = doc.metadata.get("품목", "")
+        item_hashes.setdefault(item, []).append(document_hash(doc))
+    
+    items = {
+        item: hashlib.sha1("".join(sorted(hashes)).encode("utf-8")).hexdigest()
+        for item, hashes in sorted(item_hashes.items())
+    }
+    version = hashlib.sha1(
+        json.dumps(items, ensure_ascii=False, sort_keys=True).encode("utf-8")
+    ).hexdigest()[:12]
+    
+    return {
+        "version": version,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "document_count": len(documents),
+        "items": items
+    }
+
+
+def get_store_documents(vector_store: FAISS) -> List[Document]:
+    """FAISS 벡터 스토어에 저장된 문서 목록 (인덱스 순서)"""
+    return [
+        vector_store.docstore.search(doc_id)
+        for _, doc_id in sorted(vector_store.index_to_docstore_id.items())
+    ]
 
 
 class VectorStoreManager:
@@ -20,28 +86,40 @@ class VectorStoreManager:
     
     def __init__(self):
         """벡터 스토어 매니저 초기화"""
-        if not Config.GOOGLE_API_KEY:
+        if not Config.GOOGLE_API_KEY and Config.EMBEDDING_BACKEND != "fake":
             raise VectorStoreError("Google API 키가 설정되지 않았습니다.")
         
-        self.embeddings = GoogleGenerativeAIEmbeddings(
-            model=Config.EMBEDDING_MODEL,
-            google_api_key=Config.GOOGLE_API_KEY
-        )
+        # 임베딩 호출도 LLM과 같은 전역 스케줄러(요청 한도, 우선순위)를 거침
+        self.embeddings = ScheduledEmbeddings(Config.get_embeddings())
         
         # 인덱스 디렉토리 생성
         Config.INDEX_DIR.mkdir(exist_ok=True)
+        
+        # 로드된 스토어 캐시: 지역명 -> (버전 ID, FAISS)
+        self._stores: Dict[str, Tuple[Optional[str], FAISS]] = {}
+        self._load_lock = threading.Lock()
+        self._swap_listeners: List[Callable[[str, Optional[str]], None]] = []
+        self._watcher: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
     
     def create_vector_store(
         self, 
-        documents: List[Document],
-        batch_size: int = None
+        documents: Iterable[Document],
+        batch_size: int = None,
+        region_name: Optional[str] = None,
+        resume: bool = False
     ) -> FAISS:
         """
-        문서 리스트로부터 벡터 스토어 생성
+        문서 스트림으로부터 벡터 스토어 생성
+        
+        region_name을 주면 완료된 임베딩 배치를 지역 인덱스 디렉토리의 저널에 기록하고,
+        resume=True면 저널에 이미 있는 문서는 다시 임베딩하지 않습니다.
         
         Args:
-            documents: Document 객체 리스트
+            documents: Document 객체 리스트 또는 이터레이터 (배치 단위로 소비)
             batch_size: 배치 크기 (기본값: Config에서 가져옴)
+            region_name: 저널을 기록할 지역명 (None이면 저널 없이 메모리에서만 진행)
+            resume: 기존 저널을 이어서 사용할지 여부
             
         Returns:
             FAISS 벡터 스토어
@@ -49,83 +127,265 @@ class VectorStoreManager:
         Raises:
             VectorStoreError: 벡터 스토어 생성 실패 시
         """
-        if not documents:
-            raise VectorStoreError("문서가 비어있습니다.")
-        
         if batch_size is None:
             batch_size = Config.EMBEDDING_BATCH_SIZE
         
-        print(f"벡터 스토어 생성 중... (총 {len(documents)}개 문서)")
+        journal = self.get_journal(region_name) if region_name else None
+        journaled: Dict[str, List[float]] = {}
+        if journal and resume:
+            journaled = journal.load()
+            print(f"저널에서 임베딩 {len(journaled)}개를 이어서 사용합니다.")
+        elif journal:
+            journal.reset()
         
-        vector_store = None
-        total_batches = (len(documents) + batch_size - 1) // batch_size
+        print("벡터 스토어 생성 중...")
+        
+        texts: List[str] = []
+        metadatas: List[Dict[str, Any]] = []
+        vectors: List[List[float]] = []
+        doc_iter = iter(documents)
+        batch = list(islice(doc_iter, batch_size))
+        batch_num = 0
+        reused = 0
         
         # 배치 처리
-        for i in range(0, len(documents), batch_size):
-            batch = documents[i:i+batch_size]
-            batch_num = i // batch_size + 1
-            
-            print(f"  배치 {batch_num}/{total_batches} 처리 중...")
-            
-            try:
-                if vector_store is None:
-                    # 첫 배치로 벡터 스토어 생성
-                    vector_store = FAISS.from_documents(batch, self.embeddings)
-                else:
-                    # 이후 배치는 추가
-                    texts = [doc.page_content for doc in batch]
-                    metadatas = [doc.metadata for doc in batch]
-                    vector_store.add_texts(texts, metadatas)
+        while batch:
+            batch_num += 1
+            hashes = [document_hash(doc) for doc in batch]
+            
+            # 저널에 없는 문서만 임베딩
+            missing = [i for i, doc_hash in enumerate(hashes) if doc_hash not in journaled]
+            reused += len(batch) - len(missing)
+            
+            if missing:
+                print(f"  배치 {batch_num} 처리 중... (누적 {len(texts) + len(batch)}개 문서)")
+                try:
+                    embedded = self.embeddings.embed_documents([batch[i].page_content for i in missing])
+                except Exception as e:
+                    print(f"  배치 {batch_num} 처리 실패: {e}")
+                    time.sleep(Config.ERROR_SLEEP_TIME)
+                    hint = " (python build_index.py --resume 으로 이어서 빌드할 수 있습니다)" if journal else ""
+                    raise VectorStoreError(f"벡터 스토어 생성 실패: {e}{hint}")
                 
-                # API 속도 제한 대응
-                if batch_num < total_batches:
-                    time.sleep(Config.API_SLEEP_TIME)
-                    
-            except Exception as e:
-                print(f"  배치 {batch_num} 처리 실패: {e}")
-                time.sleep(Config.ERROR_SLEEP_TIME)
-                raise VectorStoreError(f"벡터 스토어 생성 실패: {e}")
+                new_hashes = [hashes[i] for i in missing]
+                if journal:
+                    journal.append(new_hashes, embedded)
+                journaled.update(zip(new_hashes, embedded))
+            
+            texts.extend(doc.page_content for doc in batch)
+            metadatas.extend(doc.metadata for doc in batch)
+            vectors.extend(journaled[doc_hash] for doc_hash in hashes)
+            
+            # 다음 배치 준비 (로딩은 스트림으로 계속 진행)
+            batch = list(islice(doc_iter, batch_size))
+            
+            # API 속도 제한 대응 (실제로 호출한 경우만)
+            if batch and missing:
+                time.sleep(Config.API_SLEEP_TIME)
         
+        if not texts:
+            raise VectorStoreError("문서가 비어있습니다.")
+        
+        vector_store = FAISS.from_embeddings(
+            text_embeddings=list(zip(texts, vectors)),
+            embedding=self.embeddings,
+            metadatas=metadatas
+        )
+        
+        print(f"총 {len(texts)}개 문서 임베딩 완료 (저널 재사용 {reused}개)")
         return vector_store
     
+    @staticmethod
+    def get_journal(region_name: str) -> EmbeddingJournal:
+        """지역의 임베딩 저널 (인덱스 디렉토리 아래 journal/)"""
+        return EmbeddingJournal(Config.get_index_path(region_name) / JOURNAL_DIR)
+    
+    @staticmethod
+    def get_current_index_path(region_name: str) -> Optional[Path]:
+        """
+        지역의 현재 인덱스 경로 반환
+        
+        CURRENT 포인터가 가리키는 버전 디렉토리를 우선 사용하고,
+        버전 관리 이전에 만든 인덱스(지역 디렉토리에 바로 저장)도 지원합니다.
+        """
+        region_path = Config.get_index_path(region_name)
+        if not region_path:
+            return None
+        
+        version = VectorStoreManager.get_current_version(region_name)
+        if version:
+            return region_path / VERSIONS_DIR / version
+        if (region_path / "index.faiss").exists():
+            return region_path
+        return None
+    
+    @staticmethod
+    def get_current_version(region_name: str) -> Optional[str]:
+        """CURRENT 포인터가 가리키는 버전 ID (없으면 None)"""
+        region_path = Config.get_index_path(region_name)
+        if not region_path:
+            return None
+        try:
+            version = (region_path / CURRENT_FILE).read_text(encoding="utf-8").strip()
+        except FileNotFoundError:
+            return None
+        return version or None
+    
+    @staticmethod
+    def list_versions(region_name: str) -> List[str]:
+        """게시된 버전 목록 (오래된 순)"""
+        region_path = Config.get_index_path(region_name)
+        versions_path = region_path / VERSIONS_DIR if region_path else None
+        if not versions_path or not versions_path.exists():
+            return []
+        return sorted(
+            p.name for p in versions_path.iterdir()
+            if p.is_dir() and not p.name.startswith(".")
+        )
+    
+    @staticmethod
+    def _publish(region_name: str, version: str):
+        """CURRENT 포인터를 원자적으로 교체"""
+        region_path = Config.get_index_path(region_name)
+        tmp_path = region_path / f"{CURRENT_FILE}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(version)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, region_path / CURRENT_FILE)
+    
     def save_vector_store(self, vector_store: FAISS, region_name: str) -> Path:
         """
-        벡터 스토어를 파일로 저장
+        벡터 스토어를 새 버전으로 저장하고 게시
+        
+        임시 디렉토리에 인덱스와 매니페스트를 모두 쓴 뒤 versions/<버전>으로 옮기고,
+        마지막에 CURRENT 포인터를 교체하므로 읽는 쪽은 항상 완성된 버전만 봅니다.
         
         Args:
             vector_store: FAISS 벡터 스토어
             region_name: 지역명
             
         Returns:
-            저장된 경로
+            저장된 버전 디렉토리 경로
             
         Raises:
             VectorStoreError: 저장 실패 시
         """
-        save_path = Config.get_index_path(region_name)
-        if not save_path:
+        region_path = Config.get_index_path(region_name)
+        if not region_path:
             raise VectorStoreError(f"지원하지 않는 지역: {region_name}")
         
         try:
-            save_path.mkdir(exist_ok=True, parents=True)
-            vector_store.save_local(str(save_path))
-            print(f"벡터 스토어 저장 완료: {save_path}")
+            manifest = build_manifest(get_store_documents(vector_store))
+            version = f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{manifest['version']}"
+            manifest["version_id"] = version
+            
+            versions_path = region_path / VERSIONS_DIR
+            versions_path.mkdir(exist_ok=True, parents=True)
+            tmp_path = versions_path / f".tmp-{version}"
+            if tmp_path.exists():
+                shutil.rmtree(tmp_path)
+            
+            vector_store.save_local(str(tmp_path))
+            
+            # 문서 매니페스트 (인덱스 버전, 품목별 해시)
+            with open(tmp_path / MANIFEST_FILE, "w", encoding="utf-8") as f:
+                json.dump(manifest, f, ensure_ascii=False, indent=2)
+            
+            save_path = versions_path / version
+            os.replace(tmp_path, save_path)
+            self._publish(region_name, version)
+            
+            print(f"벡터 스토어 저장 완료: {save_path} (버전 {manifest['version']})")
+            
+            self.gc_versions(region_name)
             return save_path
             
         except Exception as e:
             raise VectorStoreError(f"벡터 스토어 저장 실패: {e}")
     
-    def load_vector_store(self, region_name: str) -> Optional[FAISS]:
+    def gc_versions(self, region_name: str, keep: int = None) -> List[str]:
+        """
+        오래된 버전 삭제 (현재 버전과 직전 버전은 항상 보존)
+        
+        Returns:
+            삭제된 버전 목록
+        """
+        if keep is None:
+            keep = Config.INDEX_KEEP_VERSIONS
+        keep = max(keep, 2)
+        
+        versions = self.list_versions(region_name)
+        current = self.get_current_version(region_name)
+        region_path = Config.get_index_path(region_name)
+        
+        protected = set(versions[-keep:])
+        if current in versions:
+            index = versions.index(current)
+            protected.update(versions[max(0, index - 1):index + 1])
+        
+        removed = []
+        for version in versions:
+            if version not in protected:
+                shutil.rmtree(region_path / VERSIONS_DIR / version, ignore_errors=True)
+                removed.append(version)
+        return removed
+    
+    def rollback(self, region_name: str) -> Optional[str]:
+        """
+        현재 버전 직전 버전으로 CURRENT 포인터 되돌리기
+        
+        Returns:
+            되돌린 버전 ID 또는 None (이전 버전이 없는 경우)
+        """
+        versions = self.list_versions(region_name)
+        current = self.get_current_version(region_name)
+        if current not in versions:
+            return None
+        index = versions.index(current)
+        if index == 0:
+            return None
+        previous = versions[index - 1]
+        self._publish(region_name, previous)
+        return previous
+    
+    @staticmethod
+    def load_manifest(region_name: str) -> Optional[Dict[str, Any]]:
         """
-        저장된 벡터 스토어 로드
+        현재 인덱스의 매니페스트 로드
         
         Args:
             region_name: 지역명
             
+        Returns:
+            매니페스트 dict 또는 None (매니페스트 없이 만든 구버전 인덱스)
+        """
+        index_path = VectorStoreManager.get_current_index_path(region_name)
+        if not index_path or not (index_path / MANIFEST_FILE).exists():
+            return None
+        
+        try:
+            with open(index_path / MANIFEST_FILE, encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"매니페스트 로드 실패: {e}")
+            return None
+    
+    def load_vector_store(self, region_name: str, version: Optional[str] = None) -> Optional[FAISS]:
+        """
+        벡터 스토어를 디스크에서 로드
+        
+        Args:
+            region_name: 지역명
+            version: 버전 ID (기본값: 현재 버전)
+            
         Returns:
             FAISS 벡터 스토어 또는 None
         """
-        index_path = Config.get_index_path(region_name)
+        if version:
+            index_path = Config.get_index_path(region_name) / VERSIONS_DIR / version
+        else:
+            index_path = self.get_current_index_path(region_name)
         if not index_path or not index_path.exists():
             return None
         
@@ -138,3 +398,82 @@ class VectorStoreManager:
         except Exception as e:
             print(f"벡터 스토어 로드 실패: {e}")
             return None
+    
+    def get_vector_store(self, region_name: str) -> Optional[FAISS]:
+        """
+        메모리에 올라간 현재 벡터 스토어 반환 (처음 요청 시 로드)
+        
+        새 버전으로 교체되더라도 이미 반환된 스토어 객체는 그대로 유효하므로
+        진행 중인 검색은 영향을 받지 않습니다.
+        """
+        entry = self._stores.get(region_name)
+        if entry:
+            return entry[1]
+        
+        with self._load_lock:
+            entry = self._stores.get(region_name)
+            if entry:
+                return entry[1]
+            version = self.get_current_version(region_name)
+            vector_store = self.load_vector_store(region_name, version)
+            if vector_store is not None:
+                self._stores[region_name] = (version, vector_store)
+            return vector_store
+    
+    def add_swap_listener(self, listener: Callable[[str, Optional[str]], None]):
+        """버전 교체 시 호출될 콜백 등록 (지역명, 새 버전)"""
+        self._swap_listeners.append(listener)
+    
+    def refresh(self) -> List[str]:
+        """
+        로드된 지역의 CURRENT 포인터를 확인하고 바뀐 지역만 새 버전으로 교체
+        
+        Returns:
+            교체된 지역 목록
+        """
+        swapped = []
+        for region_name, (loaded_version, _) in list(self._stores.items()):
+            version = self.get_current_version(region_name)
+            if version == loaded_version:
+                continue
+            
+            # 새 버전을 먼저 완전히 로드한 뒤 참조만 교체
+            vector_store = self.load_vector_store(region_name, version)
+            if vector_store is None:
+                continue
+            with self._load_lock:
+                self._stores[region_name] = (version, vector_store)
+            swapped.append(region_name)
+            print(f"벡터 스토어 교체: {region_name} {loaded_version} -> {version}")
+            
+            for listener in self._swap_listeners:
+                try:
+                    listener(region_name, version)
+                except Exception as e:
+                    print(f"교체 콜백 실패: {e}")
+        return swapped
+    
+    def start_watcher(self, interval: float = None):
+        """백그라운드에서 주기적으로 새 버전을 확인하는 스레드 시작"""
+        if interval is None:
+            interval = Config.INDEX_WATCH_INTERVAL
+        if interval <= 0 or self._watcher is not None:
+            return
+        self._stop_event = threading.Event()
+        
+        def watch():
+            while not self._stop_event.wait(interval):
+                try:
+                    self.refresh()
+                except Exception as e:
+                    print(f"인덱스 확인 실패: {e}")
+        
+        self._watcher = threading.Thread(target=watch, name="index-watcher", daemon=True)
+        self._watcher.start()
+    
+    def stop_watcher(self):
+        """감시 스레드 종료"""
+        self._stop_event.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
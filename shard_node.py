@@ -0,0 +1,53 @@
+"""
+샤드 노드 실행 스크립트
+지정한 지역의 인덱스만 로드해 라우터(RETRIEVAL_BACKEND=sharded)의 검색 요청을 처리
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# 프로젝트 루트 경로 추가
+sys.path.append(str(Path(__file__).parent))
+
+from modules import Config
+from modules.exceptions import VectorStoreError
+from modules.sharding import ShardNode, parse_address
+
+
+def parse_args():
+    """명령행 인자 파싱"""
+    parser = argparse.ArgumentParser(description="지역 샤드 노드")
+    parser.add_argument("--regions", required=True, help="담당 지역 목록 (예: 관악구,성동구)")
+    parser.add_argument("--listen", default="127.0.0.1:7101", help="수신 주소 (host:port)")
+    return parser.parse_args()
+
+
+def main():
+    """메인 실행 함수"""
+    args = parse_args()
+
+    regions = [region.strip() for region in args.regions.split(",") if region.strip()]
+    unknown = [region for region in regions if not Config.get_region_code(region)]
+    if unknown:
+        print(f"지원하지 않는 지역: {', '.join(unknown)}")
+        return
+
+    # 설정 검증
+    if not Config.validate():
+        return
+
+    try:
+        node = ShardNode(regions, parse_address(args.listen))
+    except VectorStoreError as e:
+        print(f"초기화 실패: {e}")
+        return
+
+    try:
+        node.serve_forever()
+    except KeyboardInterrupt:
+        print("\n샤드 노드를 종료합니다.")
+
+
+if __name__ == "__main__":
+    main()
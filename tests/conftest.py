@@ -0,0 +1,24 @@
+"""
+오프라인 테스트 공통 설정
+가짜 LLM/임베딩 백엔드와 오프라인 인덱스(.offline_index)를 사용
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# 프로젝트 루트 경로 추가
+sys.path.append(str(Path(__file__).parent.parent))
+
+from modules import Config
+
+# 오프라인 백엔드 (LLM/임베딩 인스턴스가 만들어지기 전에 호출, 지연은 없앰)
+Config.use_fake_backends(FAKE_LLM_LATENCY_MS=0, FAKE_EMBEDDING_LATENCY_MS=0)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def offline_indexes():
+    """지역별 오프라인 인덱스가 없으면 빌드"""
+    from build_index import ensure_indexes
+    assert ensure_indexes()
@@ -0,0 +1,37 @@
+"""
+사전 생성 답변 저장소 테스트
+다른 프로세스(build_answers.py)가 나중에 만든 저장소, 감시 스레드 없이 바뀐 인덱스 버전 반영
+"""
+
+from modules import Config
+from modules.answer_store import AnswerStore
+from modules.vector_store import VectorStoreManager
+
+
+def test_missing_store_is_rechecked(tmp_path, monkeypatch):
+    region = "관악구"
+    version = VectorStoreManager.load_manifest(region)["version"]
+    reader = AnswerStore(base_dir=tmp_path)
+    writer = AnswerStore(base_dir=tmp_path)
+
+    assert reader.lookup(region, "페트병") is None
+    writer.save(region, version, {"페트병": {"item_hash": "-", "answer": "페트병 답변"}})
+
+    # TTL 안에서는 캐시된 '없음' 결과 유지, 지나면 다시 확인
+    assert reader.lookup(region, "페트병") is None
+    monkeypatch.setattr(Config, "PRECOMPUTED_RECHECK_INTERVAL", 0)
+    assert reader.lookup(region, "페트병") == "페트병 답변"
+
+
+def test_stale_version_is_not_served(tmp_path, monkeypatch):
+    region = "관악구"
+    version = VectorStoreManager.load_manifest(region)["version"]
+    store = AnswerStore(base_dir=tmp_path)
+    store.save(region, version, {"페트병": {"item_hash": "-", "answer": "페트병 답변"}})
+    assert store.lookup(region, "페트병") == "페트병 답변"
+
+    # 감시 스레드 없이 인덱스가 새 버전으로 바뀜 (샤드 모드 등) -> 확인 주기가 지나면 이전 버전 답변을 쓰지 않음
+    monkeypatch.setattr(VectorStoreManager, "load_manifest", staticmethod(lambda name: {"version": "new-version"}))
+    assert store.lookup(region, "페트병") == "페트병 답변"
+    monkeypatch.setattr(Config, "PRECOMPUTED_RECHECK_INTERVAL", 0)
+    assert store.lookup(region, "페트병") is None
@@ -0,0 +1,46 @@
+"""
+실행기 동등성 테스트
+LangGraph 워크플로우(graph)와 경량 직접 실행기(direct)로 같은 대화를 진행해 매 턴 결과가 같은지 확인
+"""
+
+import pytest
+
+from modules import Config, RecyclingAgent
+
+
+MULTI_ITEM_QUESTION = "관악구에서 페트병이랑 건전지 어떻게 버려요?"
+
+CONVERSATION = [
+    "안녕하세요!",
+    "관악구에서 페트병 어떻게 버려요?",
+    "스티로폼은요?",
+    "건전지 어떻게 버려요?",
+    "성동구",
+    "고마워요",
+    "오늘 날씨 좋네요",
+    "성동구에서 폐형광등은 어떻게 버리나요?",
+    MULTI_ITEM_QUESTION,
+    "",
+]
+
+
+@pytest.mark.parametrize("answer_mode", ["llm", "auto"])
+def test_graph_and_direct_executors_match(monkeypatch, answer_mode):
+    monkeypatch.setattr(Config, "ANSWER_MODE", answer_mode)
+    graph_agent = RecyclingAgent(executor="graph")
+    direct_agent = RecyclingAgent(executor="direct")
+
+    for user_input in CONVERSATION:
+        graph_answer = graph_agent.get_response(user_input)
+        direct_answer = direct_agent.get_response(user_input)
+
+        assert graph_answer == direct_answer, user_input
+        assert graph_agent.state == direct_agent.state, user_input
+        assert graph_agent.last_context_stats == direct_agent.last_context_stats, user_input
+        assert graph_agent.last_answer_mode == direct_agent.last_answer_mode, user_input
+        assert graph_agent.last_intent_mode == direct_agent.last_intent_mode, user_input
+        if user_input == MULTI_ITEM_QUESTION:
+            # 한 품목만 일치해도 추출형으로 빠져 나머지 품목이 답변에서 사라지면 안 됨
+            assert "페트병" in graph_answer and "건전지" in graph_answer
+
+    assert graph_agent.get_conversation_summary() == direct_agent.get_conversation_summary()
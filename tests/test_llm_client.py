@@ -0,0 +1,125 @@
+"""
+장애 내성 LLM 호출 계층 테스트 (가짜 LLM)
+데드라인, 헤지, 서킷 브레이커 복구, 병합 호출의 브레이커 반영, LLM 장애 시 검색 결과 안내
+"""
+
+import threading
+import time
+
+import pytest
+
+from modules import Config
+from modules.exceptions import APIError, CircuitOpenError, LLMTimeoutError
+from modules.fake_llm import FakeLLM
+from modules.llm_client import CircuitBreaker, ResilientLLM
+from modules.prompts import DEGRADED_ANSWER_HEADER
+from modules import llm_client, tools
+
+
+def _messages(text):
+    """테스트마다 다른 프롬프트 (다른 테스트의 요청과 병합되지 않게)"""
+    return [("system", "테스트"), ("human", text)]
+
+
+class SlowFirstLLM(FakeLLM):
+    """첫 호출만 오래 걸리는 가짜 LLM (헤지 요청이 이기는 상황)"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._started = 0
+
+    def invoke(self, messages, **kwargs):
+        with self._lock:
+            self._started += 1
+            first = self._started == 1
+        if first:
+            time.sleep(1.0)
+        return super().invoke(messages, **kwargs)
+
+
+def test_deadline_expiry():
+    llm = ResilientLLM(
+        "intent",
+        FakeLLM(latency_ms=0, hang_rate=1.0, hang_seconds=1.0),
+        deadline=0.2,
+        breaker=CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    )
+    start = time.monotonic()
+    with pytest.raises(LLMTimeoutError):
+        llm.invoke(_messages("데드라인"))
+    assert time.monotonic() - start < 0.6
+    assert llm.stats()["timeouts"] == 1
+    assert llm.breaker.state == CircuitBreaker.OPEN
+
+
+def test_hedge_wins(monkeypatch):
+    monkeypatch.setattr(Config, "LLM_HEDGE_DEFAULT_DELAY", 0.05)
+    client = SlowFirstLLM(latency_ms=0)
+    llm = ResilientLLM("casual", client, deadline=2.0, hedge=True)
+
+    start = time.monotonic()
+    response = llm.invoke(_messages("헤지"))
+    assert time.monotonic() - start < 0.5
+    assert response.content
+    assert llm.stats()["hedges"] == 1
+    assert client._started == 2
+    assert llm.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_breaker_half_open_recovery():
+    client = FakeLLM(latency_ms=0, error_rate=1.0)
+    llm = ResilientLLM(
+        "casual", client, deadline=2.0,
+        breaker=CircuitBreaker(failure_threshold=1, reset_timeout=0.1)
+    )
+    with pytest.raises(APIError):
+        llm.invoke(_messages("복구 1"))
+    assert llm.breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        llm.invoke(_messages("복구 2"))
+
+    # 업스트림이 회복된 뒤 reset_timeout이 지나면 시험 호출 하나로 닫힘
+    client.error_rate = 0.0
+    time.sleep(0.15)
+    assert llm.invoke(_messages("복구 3")).content
+    assert llm.breaker.state == CircuitBreaker.CLOSED
+    assert llm.stats()["rejected"] == 1
+
+
+def test_coalesced_failure_recorded_once():
+    llm = ResilientLLM(
+        "casual",
+        FakeLLM(latency_ms=100, latency_sigma=0, error_rate=1.0),
+        deadline=2.0,
+        breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    )
+    errors = []
+
+    def call():
+        try:
+            llm.invoke(_messages("병합"))
+        except APIError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # 같은 업스트림 요청 하나를 기다린 호출자 4명 -> 브레이커에는 실패 1회
+    assert len(errors) == 4
+    assert llm.client.call_count == 1
+    assert llm.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_degraded_recycling_answer(monkeypatch):
+    monkeypatch.setattr(Config, "PRECOMPUTED_ANSWERS_ENABLED", False)
+    monkeypatch.setitem(llm_client._resilient_llms, "recycling", ResilientLLM(
+        "recycling", FakeLLM(latency_ms=0, error_rate=1.0), deadline=2.0
+    ))
+
+    result = tools.process_recycling_query.func("페트병 어떻게 버려요?", "관악구", [], answer_mode="llm")
+    assert result["answer_mode"] == "degraded"
+    assert result["answer"].startswith(DEGRADED_ANSWER_HEADER.format(region="관악구"))
+    assert result["context_stats"]
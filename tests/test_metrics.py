@@ -0,0 +1,17 @@
+"""
+지표 수집 테스트
+최근접 순위 백분위수
+"""
+
+from modules.metrics import percentile
+
+
+def test_percentile_nearest_rank():
+    values = list(range(1, 21))
+    assert percentile(values, 95) == 19
+    assert percentile(values, 50) == 10
+    assert percentile(values, 100) == 20
+    assert percentile(list(range(1, 11)), 50) == 5
+    assert percentile(list(range(1, 11)), 99) == 10
+    assert percentile([3.0], 0) == 3.0
+    assert percentile([], 95) == 0.0
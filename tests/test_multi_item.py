@@ -0,0 +1,41 @@
+"""
+여러 품목 질문 분할 테스트
+품목명 조회 키, 괄호 안 키보다 이름 일치를 우선하는 재정렬
+"""
+
+from langchain_core.documents import Document
+
+from modules.multi_item import item_keys, match_rank, name_keys, search_items
+
+
+class _StubRetriever:
+    """질의와 상관없이 정해진 순서로 문서를 돌려주는 검색 백엔드"""
+
+    def __init__(self, items):
+        self.docs = [Document(page_content=item, metadata={"품목": item}) for item in items]
+        self.queries = []
+
+    def search(self, region_name, query, k=3):
+        self.queries.append(query)
+        return self.docs[:k]
+
+
+def test_keys():
+    assert "건전지" in item_keys("체온계(건전지, 디지털)")
+    assert "건전지" not in name_keys("체온계(건전지, 디지털)")
+    assert "건전지" in name_keys("폐건전지")
+    assert "형광등" in name_keys("형광등")
+
+
+def test_match_rank():
+    assert match_rank("건전지", "폐건전지") == 0
+    assert match_rank("건전지", "체온계(건전지, 디지털)") == 1
+    assert match_rank("건전지", "사진인화지") == 2
+
+
+def test_name_match_outranks_parenthesised_key():
+    retriever = _StubRetriever(["체온계(건전지, 디지털)", "사진인화지", "폐건전지"])
+    docs = search_items(retriever, "관악구", ["건전지"], k=1)
+    assert [doc.metadata["품목"] for doc in docs] == ["폐건전지"]
+    # 언급 대신 이름이 일치하는 품목명으로 검색
+    assert retriever.queries == ["폐건전지"]
@@ -0,0 +1,41 @@
+"""
+전역 요청 스케줄러 / 마이크로 배처 테스트
+제한 시간 초과는 APIError로 전달되는지 확인
+"""
+
+import time
+from concurrent.futures import Future
+
+import pytest
+
+from modules import Config
+from modules.embedding_batcher import MicroBatcher
+from modules.exceptions import APIError
+from modules.fake_embeddings import FakeEmbeddings
+from modules.scheduler import RequestScheduler, ScheduledEmbeddings
+
+
+def test_call_timeout_raises_api_error():
+    scheduler = RequestScheduler(rate=100, burst=10, max_concurrency=2)
+    with pytest.raises(APIError):
+        scheduler.call(time.sleep, 0.5, priority="recycling", timeout=0.05)
+
+
+def test_batch_result_count_mismatch_fails_callers():
+    def send(keys):
+        future = Future()
+        future.set_result([[0.0]])  # 요청 수와 다른 결과 수
+        return future
+
+    batcher = MicroBatcher(send, max_batch=2, max_wait=0.05)
+    futures = [batcher.submit("페트병"), batcher.submit("건전지")]
+    for future in futures:
+        with pytest.raises(APIError):
+            future.result(timeout=1)
+
+
+def test_embed_query_deadline_raises_api_error(monkeypatch):
+    monkeypatch.setattr(Config, "EMBEDDING_QUERY_DEADLINE", 0.05)
+    embeddings = ScheduledEmbeddings(FakeEmbeddings(dim=8, latency_ms=500))
+    with pytest.raises(APIError):
+        embeddings.embed_query("마감 시간 테스트 질의")
@@ -0,0 +1,62 @@
+"""
+지역 샤딩 테스트
+노드 응답 형식(상태, 내용), 인증 키 요구, 라우터 검색
+"""
+
+import socket
+import threading
+import time
+
+import pytest
+
+from modules.exceptions import VectorStoreError
+from modules.sharding import ShardNode, ShardRouter, _NodeClient, resolve_authkey
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture(scope="module")
+def node_address():
+    address = ("127.0.0.1", _free_port())
+    node = ShardNode(["관악구"], address)
+    threading.Thread(target=node.serve_forever, daemon=True).start()
+    client = _NodeClient(address, node.authkey)
+    for _ in range(100):
+        try:
+            client.call(("regions",), 1.0)
+            break
+        except OSError:
+            time.sleep(0.05)
+    yield address
+    client.close()
+
+
+def test_node_replies(node_address):
+    client = _NodeClient(node_address, resolve_authkey([node_address]))
+    assert client.call(("regions",), 5.0) == ["관악구"]
+    with pytest.raises(VectorStoreError):
+        client.call(("unknown",), 5.0)
+    # 알 수 없는 명령 뒤에도 같은 연결로 계속 사용 가능
+    assert client.call(("regions",), 5.0) == ["관악구"]
+    client.close()
+
+
+def test_router_search(node_address):
+    router = ShardRouter([f"{node_address[0]}:{node_address[1]}"])
+    assert router.has_region("관악구")
+    assert not router.has_region("성동구")
+    assert router.search("관악구", "페트병", k=2)
+    router.close()
+
+
+def test_remote_address_requires_authkey(monkeypatch):
+    from modules import Config
+    monkeypatch.setattr(Config, "SHARD_AUTHKEY", b"")
+    with pytest.raises(VectorStoreError):
+        resolve_authkey([("10.0.0.5", 7101)])
+    assert resolve_authkey([("10.0.0.5", 7101)], b"secret") == b"secret"
+    assert resolve_authkey([("127.0.0.1", 7101)])